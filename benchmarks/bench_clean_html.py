@@ -0,0 +1,113 @@
+"""
+HTML 清洗微基准 - HTML Cleaning Benchmark
+
+在约 1MB 的合成页面上对比旧的清洗流程与当前流程：
+
+- clean: 旧的五次 re.sub 清洗 vs 预编译单次扫描清洗
+- pipeline: 一个抓取页面从 HTML 到进入摘要提示词的完整路径。旧流程清洗三次
+  （markdownify 之后、deduplicate_and_format_sources 中、summarize_sources 中），
+  当前流程在 markdownify 前去掉脚本/样式，转换后只清洗一次
+
+用法:
+    python benchmarks/bench_clean_html.py [--size-kb 1024] [--repeat 5]
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+# 添加 src 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from markdownify import markdownify
+
+from Langgraph_deep_researcher.utils import (
+    _html_to_markdown,
+    clean_html_content,
+    deduplicate_and_format_sources,
+)
+
+
+def legacy_clean_html_content(text: str) -> str:
+    """旧实现：五次独立的 re.sub"""
+    text = re.sub(r'<script[^>]*>.*?</script>', '', text, flags=re.DOTALL | re.IGNORECASE)
+    text = re.sub(r'<style[^>]*>.*?</style>', '', text, flags=re.DOTALL | re.IGNORECASE)
+    text = re.sub(r'<!--.*?-->', '', text, flags=re.DOTALL)
+    text = re.sub(r'<[^>]+>', '', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+def legacy_pipeline(html: str) -> str:
+    """旧流程：markdownify → 清洗 → 去重格式化时再清洗 → 摘要前再清洗整个块"""
+    raw_content = legacy_clean_html_content(markdownify(html))
+    source = {"title": "Page", "url": "https://example.com", "content": "snippet", "raw_content": raw_content}
+    formatted = deduplicate_and_format_sources(
+        {"results": [{**source, "raw_content": legacy_clean_html_content(raw_content)}]},
+        max_tokens_per_source=1000,
+        fetch_full_page=True,
+    )
+    return legacy_clean_html_content(formatted)
+
+
+def current_pipeline(html: str) -> str:
+    """当前流程：抓取阶段清洗一次，结果直接用于格式化和摘要"""
+    raw_content = _html_to_markdown("https://example.com", html)
+    source = {"title": "Page", "url": "https://example.com", "content": "snippet", "raw_content": raw_content}
+    return deduplicate_and_format_sources(
+        {"results": [source]}, max_tokens_per_source=1000, fetch_full_page=True
+    )
+
+
+def make_page(size_kb: int) -> str:
+    """生成约 ``size_kb`` KB、包含脚本、样式、注释和正文的 HTML 页面"""
+    style = "<style>" + ".item { color: #333; margin: 0 4px; }\n" * 50 + "</style>\n"
+    script = "<script>var data = [" + ",".join(str(i) for i in range(400)) + "]; if (a < b) { run(); }</script>\n"
+    article = (
+        "<div class='post'><h2>Section heading</h2>"
+        "<p>Some <a href='/docs/page'>linked text</a> with <b>bold</b> and <i>italic</i> words "
+        "describing the research topic in plain prose.</p>"
+        "<ul><li>First point</li><li>Second point</li></ul></div>\n"
+    )
+    block = style + script + "<!-- tracking comment -->\n" + article * 20
+    body = block * max(1, size_kb * 1024 // len(block))
+    return f"<html><head><title>Benchmark page</title></head><body>{body}</body></html>"
+
+
+def best_of(func, arg, repeat: int) -> float:
+    """返回 ``repeat`` 次运行中的最短耗时（秒）"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(arg)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML cleaning")
+    parser.add_argument("--size-kb", type=int, default=1024, help="页面大小 (KB)")
+    parser.add_argument("--repeat", type=int, default=5, help="每个用例重复次数")
+    args = parser.parse_args()
+
+    html = make_page(args.size_kb)
+    assert clean_html_content(html) == legacy_clean_html_content(html)
+    print(f"page size: {len(html) / 1024:,.0f} KB")
+
+    print(f"{'case':>10} {'legacy':>10} {'current':>10} {'speedup':>8}")
+    for name, legacy, current, arg in (
+        ("clean", legacy_clean_html_content, clean_html_content, html),
+        ("pipeline", legacy_pipeline, current_pipeline, html),
+    ):
+        legacy_time = best_of(legacy, arg, args.repeat)
+        current_time = best_of(current, arg, args.repeat)
+        print(
+            f"{name:>10} {legacy_time * 1000:>8.1f}ms {current_time * 1000:>8.1f}ms "
+            f"{legacy_time / current_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+导入耗时基准 - Import Time Benchmark
+
+在全新的子进程中用 ``python -X importtime`` 导入各入口模块，报告累计导入耗时、
+耗时最长的顶层包，并检查按需加载的后端（OpenAI、Ollama、Tavily、DuckDuckGo、markdownify）
+没有在导入阶段被加载。超过 --max-ms 或加载了后端时以非零状态退出，便于发现回归。
+
+用法:
+    python benchmarks/bench_import_time.py [--repeat 5] [--top 10] [--max-ms 0]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Tuple
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+# CLI、批量与服务入口
+ENTRY_MODULES = (
+    "Langgraph_deep_researcher.graph",
+    "Langgraph_deep_researcher.supervisory_architecture",
+    "Langgraph_deep_researcher.__main__",
+    "Langgraph_deep_researcher.server",
+)
+# 只有选中对应 provider 或搜索 API 时才应加载的模块
+LAZY_MODULES = ("openai", "langchain_openai", "langchain_ollama", "tavily", "duckduckgo_search", "markdownify")
+
+
+def import_times(module: str) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """在子进程中导入 ``module``，返回 (各模块自身耗时, 各模块累计耗时)，单位微秒"""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(SRC_DIR), os.environ.get("PYTHONPATH")]))}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+
+    self_times, cumulative_times = {}, {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        self_times[name] = int(self_us)
+        cumulative_times[name] = int(cumulative_us)
+    return self_times, cumulative_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark import time of the entry modules")
+    parser.add_argument("--repeat", type=int, default=5, help="每个模块导入次数，取最短耗时")
+    parser.add_argument("--top", type=int, default=10, help="列出导入耗时最长的顶层包数量")
+    parser.add_argument("--max-ms", type=float, default=0, help="单个入口模块的耗时上限（毫秒），0 表示不检查")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'module':<52} {'best':>10} {'median':>10}")
+    for module in ENTRY_MODULES:
+        runs = sorted((import_times(module) for _ in range(max(1, args.repeat))), key=lambda run: run[1][module])
+        best = runs[0][1][module] / 1000
+        median = runs[len(runs) // 2][1][module] / 1000
+        print(f"{module:<52} {best:>8.1f}ms {median:>8.1f}ms")
+
+        self_times, cumulative_times = runs[0]
+        loaded_lazy = sorted(name for name in LAZY_MODULES if name in cumulative_times)
+        if loaded_lazy:
+            print(f"    ❌ 导入时加载了按需模块: {', '.join(loaded_lazy)}")
+            failed = True
+        if args.max_ms and best > args.max_ms:
+            print(f"    ❌ 超过上限 {args.max_ms:.0f}ms")
+            failed = True
+        # 按顶层包汇总各模块自身耗时
+        packages: Dict[str, int] = {}
+        for name, self_us in self_times.items():
+            package = name.split(".")[0]
+            packages[package] = packages.get(package, 0) + self_us
+        for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"    {package:<48} {self_us / 1000:>8.1f}ms")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
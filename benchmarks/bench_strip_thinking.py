@@ -0,0 +1,79 @@
+"""
+strip_thinking_tokens 微基准 - Thinking Token Stripping Benchmark
+
+对比旧的循环切片实现与新的单次扫描实现（整段文本与分块流式两种用法）。
+
+用法:
+    python benchmarks/bench_strip_thinking.py [--blocks 2000] [--repeat 5]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# 添加 src 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from Langgraph_deep_researcher.utils import ThinkingTokenStripper, strip_thinking_tokens
+
+
+def legacy_strip_thinking_tokens(text: str) -> str:
+    """旧实现：每移除一个块都重新查找并重建整个字符串"""
+    while "<think>" in text and "</think>" in text:
+        start = text.find("<think>")
+        end = text.find("</think>") + len("</think>")
+        text = text[:start] + text[end:]
+    return text
+
+
+def streamed_strip(text: str, chunk_size: int = 4) -> str:
+    """按固定大小分块喂给 ThinkingTokenStripper，模拟 token 流"""
+    stripper = ThinkingTokenStripper()
+    parts = [stripper.feed(text[i:i + chunk_size]) for i in range(0, len(text), chunk_size)]
+    parts.append(stripper.flush())
+    return "".join(parts)
+
+
+def make_text(blocks: int, think_size: int = 400, answer_size: int = 100) -> str:
+    """生成包含 ``blocks`` 个思考块的模型输出"""
+    think = "<think>" + "reasoning " * (think_size // 10) + "</think>"
+    answer = "answer text " * (answer_size // 12)
+    return (think + answer) * blocks
+
+
+def best_of(func, text: str, repeat: int) -> float:
+    """返回 ``repeat`` 次运行中的最短耗时（秒）"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark <think> block stripping")
+    parser.add_argument("--blocks", type=int, default=2000, help="最大思考块数量")
+    parser.add_argument("--repeat", type=int, default=5, help="每个用例重复次数")
+    args = parser.parse_args()
+
+    print(f"{'blocks':>8} {'chars':>10} {'legacy':>10} {'single-pass':>12} {'streamed':>10} {'speedup':>8}")
+    sizes = sorted({size for size in (10, 100, 1000) if size < args.blocks} | {args.blocks})
+    for blocks in sizes:
+        text = make_text(blocks)
+        expected = legacy_strip_thinking_tokens(text)
+        assert strip_thinking_tokens(text) == expected
+        assert streamed_strip(text) == expected
+
+        legacy = best_of(legacy_strip_thinking_tokens, text, args.repeat)
+        single_pass = best_of(strip_thinking_tokens, text, args.repeat)
+        streamed = best_of(streamed_strip, text, args.repeat)
+        print(
+            f"{blocks:>8} {len(text):>10,} {legacy * 1000:>8.2f}ms {single_pass * 1000:>10.2f}ms "
+            f"{streamed * 1000:>8.2f}ms {legacy / single_pass:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
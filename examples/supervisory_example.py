@@ -12,7 +12,6 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from Langgraph_deep_researcher.supervisory_architecture import (
-    supervisory_graph,
     run_supervisory_research,
     SupervisoryStateInput
 )
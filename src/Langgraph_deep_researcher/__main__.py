@@ -1,4 +1,5 @@
 import argparse
+import asyncio
 import os
 import sys
 import time
@@ -10,14 +11,17 @@ try:
 except Exception:
     load_dotenv = None
 
-from langgraph.checkpoint.memory import MemorySaver
-
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from Langgraph_deep_researcher.graph import graph
+from Langgraph_deep_researcher.graph import build_graph, get_graph
+from Langgraph_deep_researcher.batch import load_topics, run_batch, write_manifest
+from Langgraph_deep_researcher.checkpointing import aopen_checkpointer, open_checkpointer, resume_input
 from Langgraph_deep_researcher.state import SummaryStateInput
 from Langgraph_deep_researcher.configuration import Configuration
+from Langgraph_deep_researcher import metrics
+from Langgraph_deep_researcher.clients import aclose_clients, close_clients
+from Langgraph_deep_researcher.http_client import aclose_http_clients, close_http_clients
 
 
 def print_progress(message: str, step: int = None, total: int = None):
@@ -35,7 +39,7 @@ def print_step_complete(step_name: str, duration: float):
     print(f"[{timestamp}] ✅ {step_name} 完成 (耗时: {duration:.1f}秒)")
 
 
-def print_research_progress(state, step_name: str):
+def print_research_progress(state, step_name: str, duration: float = None):
     """打印研究进度信息"""
     timestamp = time.strftime("%H:%M:%S")
     
@@ -52,10 +56,180 @@ def print_research_progress(state, step_name: str):
     sources_count = len(sources_gathered) if sources_gathered else 0
     summary_length = len(running_summary) if running_summary else 0
     
-    print(f"[{timestamp}] 🔍 {step_name}")
+    if duration is not None:
+        print(f"[{timestamp}] 🔍 {step_name} (耗时: {duration:.1f}秒)")
+    else:
+        print(f"[{timestamp}] 🔍 {step_name}")
     print(f"    📊 研究循环: {loop_count}, 来源数量: {sources_count}, 摘要长度: {summary_length} 字符")
 
 
+def print_node_timings(node_timings: dict, node_calls: dict):
+    """打印各节点累计耗时"""
+    if not node_timings:
+        return
+    total = sum(node_timings.values()) or 1.0
+    print_progress("⏱️ 各节点耗时:")
+    for node_name, seconds in sorted(node_timings.items(), key=lambda item: item[1], reverse=True):
+        calls = node_calls.get(node_name, 0)
+        print_progress(
+            f"   {node_name}: {seconds:.1f} 秒 ({seconds / total:.0%}, {calls} 次)"
+        )
+
+
+def print_run_metrics():
+    """打印运行指标（抓取、缓存等计数器）"""
+    snapshot = metrics.get_metrics()
+    if not snapshot:
+        return
+    print_progress("📈 运行指标:")
+    for line in metrics.format_metrics().splitlines():
+        print_progress(f"   {line}")
+
+
+def stream_research(input_state, config, on_node=None, on_token=None, research_graph=None):
+    """单次流式执行研究图，返回最终状态和各节点耗时。
+
+    同时订阅 ``updates`` 和 ``values`` 两种流模式：``updates`` 告诉我们哪个节点刚完成，
+    ``values`` 给出该步之后的完整状态。节点耗时按相邻两次更新之间的墙钟时间计算，
+    同一超步内并行执行的节点会把等待时间记在最先返回的节点上。
+    传入 ``on_token`` 时额外订阅 ``custom`` 模式，接收节点流式输出的 LLM token。
+
+    Args:
+        input_state: 图的输入状态
+        config: 传给图的 RunnableConfig
+        on_node: 可选回调 ``on_node(node_name, state, duration)``，在每个节点完成后调用
+        on_token: 可选回调 ``on_token(source, text)``，每收到一段 token 时调用
+        research_graph: 要执行的研究图，默认为未配置检查点的共享研究图
+
+    Returns:
+        (final_state, node_timings, node_calls) 三元组
+    """
+    final_state = {}
+    node_timings = {}
+    node_calls = {}
+    pending_nodes = []
+    last_event = time.perf_counter()
+
+    stream_mode = ["updates", "values"] + (["custom"] if on_token is not None else [])
+    research_graph = research_graph or get_graph()
+    for mode, chunk in research_graph.stream(input_state, config=config, stream_mode=stream_mode):
+        if mode == "custom":
+            if chunk.get("type") == "token":
+                on_token(chunk["source"], chunk["content"])
+        elif mode == "updates":
+            now = time.perf_counter()
+            duration = now - last_event
+            last_event = now
+            for node_name in chunk or {}:
+                node_timings[node_name] = node_timings.get(node_name, 0.0) + duration
+                node_calls[node_name] = node_calls.get(node_name, 0) + 1
+                pending_nodes.append((node_name, duration))
+                # Parallel nodes in the same step share the wait of the first one
+                duration = 0.0
+        elif mode == "values":
+            final_state = chunk
+            if on_node is not None:
+                for node_name, duration in pending_nodes:
+                    on_node(node_name, final_state, duration)
+            pending_nodes = []
+
+    return final_state, node_timings, node_calls
+
+
+def run_batch_mode(args, configurable_overrides: dict) -> int:
+    """批量模式：研究 --topics-file 中的所有主题，报告与 manifest.json 写入 --out 目录
+
+    所有主题共用一份配置；指定 --thread-id 时每个主题以 ``<thread_id>:<主题 ID>`` 保存检查点。
+
+    Returns:
+        进程退出码：所有主题成功为 0，否则为 1
+    """
+    try:
+        topics = load_topics(args.topics_file)
+    except (OSError, ValueError) as e:
+        print_progress(f"❌ 无法读取主题文件: {str(e)}")
+        return 1
+    if not topics:
+        print_progress(f"❌ 主题文件中没有主题: {args.topics_file}")
+        return 1
+
+    runnable_config = {"configurable": configurable_overrides} if configurable_overrides else {}
+    configuration = Configuration.from_runnable_config(runnable_config)
+    concurrency = args.concurrency or configuration.max_concurrent_topics
+    out_dir = os.path.abspath(args.out)
+    print_progress(f"🚀 批量研究 {len(topics)} 个主题 (并发: {concurrency})")
+    print_progress(f"📁 输出目录: {out_dir}")
+    if args.thread_id:
+        action = "恢复" if args.resume else "保存"
+        print_progress(f"🧷 检查点线程: {args.thread_id} ({action}，每个主题使用 <线程 ID>:<主题 ID>)")
+    if configurable_overrides:
+        print_progress(f"⚙️ 配置覆盖: {configurable_overrides}")
+
+    finished = 0
+
+    def report_topic(event, item, result):
+        nonlocal finished
+        if event == "start":
+            print_progress(f"▶️ [{item.id}] 开始: {item.topic}")
+            return
+        finished += 1
+        progress = f"({finished}/{len(topics)})"
+        if event == "completed":
+            reused = "，复用检查点" if result.resumed else ""
+            print_progress(
+                f"✅ [{item.id}] 完成 {progress}: {result.sources} 个来源, "
+                f"{result.summary_chars:,} 字符, 耗时 {result.duration:.1f} 秒{reused}"
+            )
+        else:
+            print_progress(f"❌ [{item.id}] 失败 {progress}: {result.error}")
+
+    async def run_all():
+        try:
+            if not args.thread_id:
+                return await run_batch(
+                    topics, out_dir, runnable_config, concurrency, on_event=report_topic
+                )
+            async with aopen_checkpointer(
+                configuration.checkpointer, configuration.checkpoint_path, configuration.cache_dir
+            ) as checkpointer:
+                return await run_batch(
+                    topics,
+                    out_dir,
+                    runnable_config,
+                    concurrency,
+                    on_event=report_topic,
+                    research_graph=build_graph(checkpointer),
+                    thread_id=args.thread_id,
+                    resume=args.resume,
+                )
+        finally:
+            # 所有主题共享同一事件循环上的 SDK 客户端与 HTTP 连接池，结束时统一关闭
+            await aclose_clients()
+            await aclose_http_clients()
+
+    start_time = time.time()
+    try:
+        results = asyncio.run(run_all())
+    finally:
+        close_http_clients()
+    total_time = time.time() - start_time
+
+    manifest_path = write_manifest(
+        out_dir, results, total_time, topics_file=args.topics_file, thread_id=args.thread_id
+    )
+    failed = [result for result in results if result.status != "completed"]
+    print_step_complete("批量研究", total_time)
+    print_progress("📊 批量研究统计:")
+    print_progress(f"   ✅ 成功: {len(results) - len(failed)} 个")
+    print_progress(f"   ❌ 失败: {len(failed)} 个")
+    for result in failed:
+        print_progress(f"      [{result.id}] {result.error}")
+    print_progress(f"   ⏱️ 总耗时: {total_time:.1f} 秒")
+    print_run_metrics()
+    print(f"✅ 汇总清单已保存至: {manifest_path}")
+    return 1 if failed else 0
+
+
 def main():
     # Load environment variables from nearest .env if python-dotenv is available
     # This allows LOCAL_LLM、LLM_PROVIDER 等在 CLI 模式下生效
@@ -77,13 +251,23 @@ def main():
     )
     parser.add_argument(
         "--topic",
-        required=True,
-        help="Research topic to investigate",
+        help="Research topic to investigate (not needed with --resume)",
+    )
+    parser.add_argument(
+        "--topics-file",
+        default=None,
+        help="Batch mode: JSONL or CSV file of topics researched in one process",
     )
     parser.add_argument(
         "--out",
         required=True,
-        help="Output file path for the final markdown summary",
+        help="Output file path for the final markdown summary (output directory in batch mode)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Batch mode: maximum number of topics researched at the same time (default: MAX_CONCURRENT_TOPICS)",
     )
     parser.add_argument(
         "--loops",
@@ -104,9 +288,8 @@ def main():
     )
     parser.add_argument(
         "--search",
-        choices=["duckduckgo", "tavily", "perplexity", "searxng"],
         default=None,
-        help="Override search API (optional)",
+        help="Override search API: duckduckgo, tavily, perplexity, searxng or package.module:factory (optional)",
     )
     parser.add_argument(
         "--tool-calling",
@@ -114,14 +297,42 @@ def main():
         default=None,
         help="Use tool calling instead of JSON mode",
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print summary tokens as they are generated",
+    )
     parser.add_argument(
         "--no-strip-think",
         action="store_true",
         default=None,
         help="Do not strip <think> tokens from model responses",
     )
+    parser.add_argument(
+        "--thread-id",
+        default=None,
+        help="Checkpoint the run under this thread id so it can be resumed (see CHECKPOINTER)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the interrupted run of --thread-id from its last completed node",
+    )
 
     args = parser.parse_args()
+    if args.resume and not args.thread_id:
+        parser.error("--resume requires --thread-id")
+    if args.topics_file:
+        if args.topic:
+            parser.error("--topic and --topics-file are mutually exclusive")
+        if args.stream:
+            parser.error("--stream is not supported with --topics-file")
+        if args.concurrency is not None and args.concurrency < 1:
+            parser.error("--concurrency must be at least 1")
+    elif args.concurrency is not None:
+        parser.error("--concurrency requires --topics-file")
+    elif not args.topic and not args.resume:
+        parser.error("--topic is required unless resuming")
 
     # Prepare configurable overrides. Only include keys explicitly set.
     configurable_overrides = {}
@@ -140,19 +351,26 @@ def main():
 
     # Build RunnableConfig expected by the graph
     runnable_config = {"configurable": configurable_overrides} if configurable_overrides else {}
+    if args.thread_id:
+        runnable_config = {"configurable": {**configurable_overrides, "thread_id": args.thread_id}}
 
-    # Optional in-memory checkpointer; not required but helpful for consistency
-    # Note: graph compiled in module already; we can use .invoke
+    if args.topics_file:
+        sys.exit(run_batch_mode(args, configurable_overrides))
 
     # 显示开始信息
-    print_progress(f"🚀 开始研究主题: {args.topic}")
+    if args.resume:
+        print_progress(f"♻️ 恢复研究线程: {args.thread_id}")
+    else:
+        print_progress(f"🚀 开始研究主题: {args.topic}")
     print_progress(f"📁 输出文件: {args.out}")
+    if args.thread_id and not args.resume:
+        print_progress(f"🧷 检查点线程: {args.thread_id} (中断后可使用 --resume 继续)")
     if configurable_overrides:
         print_progress(f"⚙️ 配置覆盖: {configurable_overrides}")
     
     start_time = time.time()
     
-    # Run the graph with streaming to show progress
+    # Run the graph once, streaming progress and collecting the final state
     input_state = SummaryStateInput(research_topic=args.topic)
     
     # 使用流式执行来显示进度
@@ -161,43 +379,70 @@ def main():
     # 跟踪步骤
     step_count = 0
     total_steps = 5  # generate_query, web_research, summarize_sources, reflect_on_summary, finalize_summary
-    
+
+    # 流式输出时记录是否有未换行的 token
+    streaming_line = False
+
+    def report_token(source, text):
+        nonlocal streaming_line
+        if not streaming_line:
+            print_progress("✍️ 正在生成摘要:")
+            streaming_line = True
+        print(text, end="", flush=True)
+
+    def report_node(node_name, state, duration):
+        nonlocal step_count, streaming_line
+        if streaming_line:
+            print()
+            streaming_line = False
+        step_count += 1
+        # 根据节点名称显示不同的进度信息
+        if node_name == "generate_query":
+            print_progress(f"📝 生成搜索查询 (耗时: {duration:.1f}秒)", step_count, total_steps)
+        elif node_name == "web_research":
+            print_research_progress(state, "🌐 执行网络搜索", duration)
+        elif node_name == "summarize_sources":
+            print_research_progress(state, "📋 总结信息来源", duration)
+        elif node_name == "reflect_on_summary":
+            print_research_progress(state, "🤔 反思研究进度", duration)
+        elif node_name == "finalize_summary":
+            print_progress(f"📄 生成最终报告 (耗时: {duration:.1f}秒)", step_count, total_steps)
+
+    def run(graph_input, research_graph=None):
+        # 单次流式执行：既显示进度，又拿到最终状态
+        return stream_research(
+            graph_input,
+            runnable_config,
+            on_node=report_node,
+            on_token=report_token if args.stream else None,
+            research_graph=research_graph,
+        )
+
     try:
-        # 使用 stream 方法来获取实时进度
-        for chunk in graph.stream(input_state, config=runnable_config):
-            step_count += 1
-            node_name = list(chunk.keys())[0] if chunk else "unknown"
-            state = list(chunk.values())[0] if chunk else None
-            
-            # 调试信息：显示状态类型和内容
-            if state:
-                print_progress(f"🔍 调试: 节点={node_name}, 状态类型={type(state)}")
-                if isinstance(state, dict):
-                    print_progress(f"    📋 状态字段: {list(state.keys())}")
+        if not args.thread_id:
+            result, node_timings, node_calls = run(input_state)
+        else:
+            configuration = Configuration.from_runnable_config(runnable_config)
+            with open_checkpointer(
+                configuration.checkpointer, configuration.checkpoint_path, configuration.cache_dir
+            ) as checkpointer:
+                research_graph = build_graph(checkpointer)
+                snapshot = research_graph.get_state(runnable_config)
+                resumed_input = resume_input(snapshot, input_state, args.resume, args.thread_id)
+                if args.resume and not snapshot.next:
+                    print_progress("✅ 该线程的研究已完成，直接使用检查点中的结果")
+                    result, node_timings, node_calls = snapshot.values, {}, {}
                 else:
-                    print_progress(f"    📋 状态属性: {dir(state)[:5]}...")
-            
-            # 根据节点名称显示不同的进度信息
-            if node_name == "generate_query":
-                print_progress("📝 生成搜索查询", step_count, total_steps)
-            elif node_name == "web_research":
-                print_research_progress(state, "🌐 执行网络搜索")
-            elif node_name == "summarize_sources":
-                print_research_progress(state, "📋 总结信息来源")
-            elif node_name == "reflect_on_summary":
-                print_research_progress(state, "🤔 反思研究进度")
-            elif node_name == "finalize_summary":
-                print_progress("📄 生成最终报告", step_count, total_steps)
-            
-            # 短暂延迟以便用户看到进度
-            time.sleep(0.1)
-        
-        # 获取最终结果
-        result = graph.invoke(input_state, config=runnable_config)
-        
+                    if args.resume:
+                        print_progress(f"⏭️ 从检查点继续，下一步: {', '.join(snapshot.next)}")
+                    result, node_timings, node_calls = run(resumed_input, research_graph)
     except Exception as e:
         print_progress(f"❌ 执行过程中出现错误: {str(e)}")
         sys.exit(1)
+    finally:
+        # 图执行结束后释放共享的 SDK 客户端与 HTTP 连接池
+        close_clients()
+        close_http_clients()
 
     summary = result.get("running_summary")
     if not summary:
@@ -225,6 +470,8 @@ def main():
     print_progress(f"   📄 报告长度: {summary_length:,} 字符")
     print_progress(f"   🔗 信息来源: {sources_count} 个")
     print_progress(f"   ⏱️ 总耗时: {total_time:.1f} 秒")
+    print_node_timings(node_timings, node_calls)
+    print_run_metrics()
     print(f"✅ 研究摘要已保存至: {out_path}")
 
 
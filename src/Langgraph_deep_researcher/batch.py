@@ -0,0 +1,263 @@
+"""
+批量研究 - Batch Research
+在同一个进程中研究多个主题：主题从 JSONL/CSV 文件读取，经有上限的并发池执行，
+共享 LLM/搜索客户端、HTTP 连接池与缓存；每个主题写出一份报告，最后写出汇总清单（manifest）。
+"""
+
+import asyncio
+import csv
+import json
+import os
+import re
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from Langgraph_deep_researcher import metrics
+from Langgraph_deep_researcher.graph import get_graph
+from Langgraph_deep_researcher.state import SummaryStateInput
+
+MANIFEST_FILE = "manifest.json"
+# Longest topic prefix used in generated report file names
+_SLUG_MAX_CHARS = 60
+_SLUG_PATTERN = re.compile(r"[^\w]+")
+
+
+@dataclass
+class BatchTopic:
+    """One topic of a batch run."""
+    id: str
+    topic: str
+    out: str
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one topic, as recorded in the manifest."""
+    id: str
+    topic: str
+    out: str
+    status: str  # "completed" or "failed"
+    duration: float = 0.0
+    sources: int = 0
+    summary_chars: int = 0
+    resumed: bool = False
+    error: Optional[str] = None
+
+
+def _slug(text: str) -> str:
+    """File-name friendly form of a topic; keeps CJK and other word characters."""
+    return _SLUG_PATTERN.sub("-", text.strip().lower()).strip("-")[:_SLUG_MAX_CHARS].strip("-") or "topic"
+
+
+def _read_rows(path: Path) -> List[Dict[str, str]]:
+    """Read raw topic rows from a JSONL or CSV file."""
+    text = path.read_text(encoding="utf-8-sig")
+    if path.suffix.lower() in (".jsonl", ".ndjson"):
+        rows = []
+        for line_number, line in enumerate(text.splitlines(), 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON: {e}") from e
+            # A line may also be a bare JSON string holding just the topic
+            rows.append({"topic": row} if isinstance(row, str) else row)
+        return rows
+    if path.suffix.lower() == ".csv":
+        records = [record for record in csv.reader(text.splitlines()) if any(cell.strip() for cell in record)]
+        if not records:
+            return []
+        header = [cell.strip().lower() for cell in records[0]]
+        if "topic" not in header:
+            # No header row: the first column is the topic
+            return [{"topic": record[0]} for record in records]
+        return [dict(zip(header, record)) for record in records[1:]]
+    raise ValueError(f"Unsupported topics file {path}: expected .jsonl or .csv")
+
+
+def load_topics(path: str) -> List[BatchTopic]:
+    """
+    Load the topics of a batch run.
+
+    JSONL files hold one object per line with a ``topic`` and optional ``id`` and
+    ``out`` keys (a bare JSON string is also accepted). CSV files need a header row
+    with a ``topic`` column and optional ``id`` and ``out`` columns; without a
+    header the first column is taken as the topic.
+
+    Topics without an id get ``<index>-<slug of the topic>``; reports default to
+    ``<id>.md`` inside the output directory.
+
+    Args:
+        path: The .jsonl or .csv topics file
+
+    Returns:
+        List[BatchTopic]: Topics in file order
+
+    Raises:
+        ValueError: For unsupported files, rows without a topic, or duplicate ids
+            or report paths
+    """
+    topics = []
+    seen_ids = set()
+    seen_outs = {}
+    for index, row in enumerate(_read_rows(Path(path)), 1):
+        if not isinstance(row, dict) or not str(row.get("topic") or "").strip():
+            raise ValueError(f"{path}: entry {index} has no topic")
+        topic = str(row["topic"]).strip()
+        topic_id = str(row.get("id") or "").strip() or f"{index:03d}-{_slug(topic)}"
+        if topic_id in seen_ids:
+            raise ValueError(f"{path}: duplicate topic id {topic_id}")
+        seen_ids.add(topic_id)
+        out = str(row.get("out") or "").strip() or f"{topic_id}.md"
+        # Two topics writing the same report would silently overwrite each other
+        out_key = os.path.normcase(os.path.normpath(out))
+        if out_key in seen_outs:
+            raise ValueError(f"{path}: topics {seen_outs[out_key]} and {topic_id} both write {out}")
+        seen_outs[out_key] = topic_id
+        topics.append(BatchTopic(id=topic_id, topic=topic, out=out))
+    return topics
+
+
+async def _final_state(research_graph, graph_input, config: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the graph and return its full final state, not just the output schema."""
+    final_state = {}
+    async for state in research_graph.astream(graph_input, config=config, stream_mode="values"):
+        final_state = state
+    return final_state
+
+
+async def _research_topic(
+    item: BatchTopic, config: Dict[str, Any], research_graph, thread_id: Optional[str], resume: bool
+) -> Tuple[Dict[str, Any], bool]:
+    """Run the research graph for one topic; returns (final state, resumed)."""
+    input_state = SummaryStateInput(research_topic=item.topic)
+    if not thread_id:
+        return await _final_state(research_graph, input_state, config), False
+
+    config = {**config, "configurable": {**config.get("configurable", {}), "thread_id": f"{thread_id}:{item.id}"}}
+    snapshot = await research_graph.aget_state(config)
+    if snapshot.values and not resume:
+        raise ValueError(f"Thread {thread_id}:{item.id} already has checkpoints; resume it or choose another thread id")
+    if snapshot.values and not snapshot.next:
+        return snapshot.values, True
+    # Topics the interrupted run never reached start fresh
+    return await _final_state(research_graph, None if snapshot.next else input_state, config), bool(snapshot.next)
+
+
+async def run_batch(
+    topics: List[BatchTopic],
+    out_dir: str,
+    config: Optional[Dict[str, Any]] = None,
+    max_concurrency: int = 4,
+    on_event: Optional[Callable[[str, BatchTopic, Optional[BatchResult]], None]] = None,
+    research_graph=None,
+    thread_id: Optional[str] = None,
+    resume: bool = False,
+) -> List[BatchResult]:
+    """
+    Research many topics concurrently in the running event loop.
+
+    At most ``max_concurrency`` topics run at the same time. They share the
+    process-wide client registry, the loop's HTTP connection pool and the page
+    and LLM caches. A failing topic is recorded and does not stop the others.
+
+    Args:
+        topics: Topics to research, see load_topics
+        out_dir: Directory for the reports; relative ``out`` paths resolve against it
+        config: RunnableConfig passed to the research graph for every topic
+        max_concurrency: Maximum number of topics researched at the same time
+        on_event: Optional callback ``on_event(event, topic, result)``; event is
+            "start", "completed" or "failed", result is None for "start"
+        research_graph: Graph to run, by default the shared uncheckpointed graph
+        thread_id: Checkpoint each topic under ``<thread_id>:<topic id>``; needs a
+            graph compiled with a checkpointer
+        resume: Reuse finished topics of ``thread_id`` and continue interrupted ones
+
+    Returns:
+        List[BatchResult]: One result per topic, in input order
+    """
+    research_graph = research_graph or get_graph()
+    config = config or {}
+    limit = asyncio.Semaphore(max(1, max_concurrency))
+    out_root = Path(out_dir)
+
+    async def run_one(item: BatchTopic) -> BatchResult:
+        async with limit:
+            out_path = out_root / item.out
+            if on_event:
+                on_event("start", item, None)
+            started = time.perf_counter()
+            try:
+                state, resumed = await _research_topic(item, config, research_graph, thread_id, resume)
+                summary = state.get("running_summary")
+                if not summary:
+                    raise ValueError("graph produced no running summary")
+                out_path.parent.mkdir(parents=True, exist_ok=True)
+                out_path.write_text(summary, encoding="utf-8")
+                result = BatchResult(
+                    id=item.id,
+                    topic=item.topic,
+                    out=str(out_path),
+                    status="completed",
+                    duration=round(time.perf_counter() - started, 3),
+                    sources=len(state.get("sources_gathered") or []),
+                    summary_chars=len(summary),
+                    resumed=resumed,
+                )
+                metrics.increment("batch.completed")
+            except Exception as e:
+                result = BatchResult(
+                    id=item.id,
+                    topic=item.topic,
+                    out=str(out_path),
+                    status="failed",
+                    duration=round(time.perf_counter() - started, 3),
+                    error=f"{type(e).__name__}: {e}",
+                )
+                metrics.increment("batch.failed")
+            if on_event:
+                on_event(result.status, item, result)
+            return result
+
+    return list(await asyncio.gather(*(run_one(item) for item in topics)))
+
+
+def write_manifest(
+    out_dir: str,
+    results: List[BatchResult],
+    duration: float,
+    topics_file: Optional[str] = None,
+    thread_id: Optional[str] = None,
+) -> str:
+    """
+    Write the summary manifest of a batch run as JSON.
+
+    Args:
+        out_dir: Output directory; the manifest is MANIFEST_FILE inside it
+        results: Results returned by run_batch
+        duration: Wall-clock duration of the whole batch in seconds
+        topics_file: The topics file the batch was read from
+        thread_id: Checkpoint thread of the batch, if any
+
+    Returns:
+        str: Path of the written manifest
+    """
+    manifest = {
+        "topics_file": topics_file,
+        "thread_id": thread_id,
+        "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "duration": round(duration, 3),
+        "total": len(results),
+        "completed": sum(1 for result in results if result.status == "completed"),
+        "failed": sum(1 for result in results if result.status == "failed"),
+        "topics": [asdict(result) for result in results],
+        "metrics": metrics.get_metrics(),
+    }
+    path = Path(out_dir) / MANIFEST_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    return str(path)
@@ -0,0 +1,395 @@
+"""
+缓存层 - Caches
+搜索结果缓存：内存 LRU + SQLite 磁盘两级，按搜索后端设置过期时间
+页面缓存：按内容哈希存储清洗后的 markdown，支持条件请求重新验证与 LRU 淘汰
+LLM 响应缓存：temperature=0 的确定性调用按请求哈希缓存，SQLite 存储并限制总大小
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from Langgraph_deep_researcher import metrics
+
+DEFAULT_CACHE_DIR = "~/.cache/langgraph-deep-researcher"
+
+# Seconds a cached search result stays valid, per search backend
+DEFAULT_SEARCH_CACHE_TTLS: Dict[str, float] = {
+    "duckduckgo": 24 * 3600,
+    "searxng": 24 * 3600,
+    "tavily": 24 * 3600,
+    "perplexity": 6 * 3600,
+}
+
+
+def resolve_cache_dir(cache_dir: Optional[str] = None) -> Optional[Path]:
+    """Return the cache directory, or None when on-disk caching is disabled.
+
+    An empty string disables the disk tier; None falls back to CACHE_DIR or the default.
+    """
+    if cache_dir is None:
+        cache_dir = os.environ.get("CACHE_DIR", DEFAULT_CACHE_DIR)
+    if not cache_dir:
+        return None
+    path = Path(cache_dir).expanduser()
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query so trivially different spellings share a cache entry."""
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+
+def search_ttl(backend: str) -> float:
+    """Return the TTL for ``backend``, overridable through SEARCH_CACHE_TTL_<BACKEND>."""
+    override = os.environ.get(f"SEARCH_CACHE_TTL_{backend.upper()}")
+    if override:
+        return float(override)
+    return DEFAULT_SEARCH_CACHE_TTLS.get(backend, 24 * 3600)
+
+
+# Bumped when the search cache table changes; older tables are dropped
+_SEARCH_CACHE_SCHEMA_VERSION = 2
+
+
+class SearchCache:
+    """Two-tier cache for search responses keyed by (backend, normalized query, search arguments)."""
+
+    def __init__(self, path: Optional[Path] = None, max_memory_entries: int = 256):
+        """Open the cache.
+
+        Args:
+            path: SQLite file of the disk tier; None keeps the cache in memory only
+            max_memory_entries: Size of the in-memory LRU tier
+        """
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        self._memory: OrderedDict[Tuple[Any, ...], Tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if path is not None:
+            self._conn = sqlite3.connect(str(path), check_same_thread=False)
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] != _SEARCH_CACHE_SCHEMA_VERSION:
+                self._conn.execute("DROP TABLE IF EXISTS search_cache")
+                self._conn.execute(f"PRAGMA user_version = {_SEARCH_CACHE_SCHEMA_VERSION}")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                "backend TEXT, query TEXT, arguments TEXT, expires_at REAL, response TEXT, "
+                "PRIMARY KEY (backend, query, arguments))"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def _key(backend: str, query: str, arguments: Dict[str, Any]) -> Tuple[Any, ...]:
+        # Every other search argument (max_results, fetch_full_page, loop counters, ...)
+        # can change the response, so all of them are part of the key
+        return (backend, normalize_query(query), json.dumps(arguments, sort_keys=True, default=str))
+
+    def _record(self, stat: str) -> None:
+        self.stats[stat] += 1
+        metrics.increment(f"search_cache.{stat}")
+
+    def get(self, backend: str, query: str, arguments: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return a cached response, or None on a miss or an expired entry.
+
+        Args:
+            backend: Search backend name
+            query: The search query; normalized before lookup
+            arguments: The search function's other arguments
+        """
+        key = self._key(backend, query, arguments)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] > now:
+                self._memory.move_to_end(key)
+                self._record("memory_hits")
+                return json.loads(entry[1])
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT expires_at, response FROM search_cache "
+                    "WHERE backend = ? AND query = ? AND arguments = ?",
+                    key,
+                ).fetchone()
+                if row is not None and row[0] > now:
+                    self._remember(key, row[0], row[1])
+                    self._record("disk_hits")
+                    return json.loads(row[1])
+            self._record("misses")
+            return None
+
+    def set(self, backend: str, query: str, arguments: Dict[str, Any], response: Dict[str, Any]) -> None:
+        """Store a response in both tiers with the backend's TTL."""
+        key = self._key(backend, query, arguments)
+        expires_at = time.time() + search_ttl(backend)
+        payload = json.dumps(response, ensure_ascii=False)
+        with self._lock:
+            self._remember(key, expires_at, payload)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?, ?, ?)",
+                    (*key, expires_at, payload),
+                )
+                self._conn.execute("DELETE FROM search_cache WHERE expires_at <= ?", (time.time(),))
+                self._conn.commit()
+
+    def _remember(self, key: Tuple[Any, ...], expires_at: float, payload: str) -> None:
+        self._memory[key] = (expires_at, payload)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+
+_search_caches: Dict[Optional[Path], SearchCache] = {}
+_search_caches_lock = threading.Lock()
+
+
+def get_search_cache(cache_dir: Optional[str] = None) -> SearchCache:
+    """Return the shared search cache for ``cache_dir``."""
+    directory = resolve_cache_dir(cache_dir)
+    with _search_caches_lock:
+        cache = _search_caches.get(directory)
+        if cache is None:
+            path = directory / "search_cache.sqlite3" if directory is not None else None
+            cache = SearchCache(path)
+            _search_caches[directory] = cache
+        return cache
+
+
+@dataclass
+class CachedPage:
+    """A cached page: cleaned markdown plus the validators needed to revalidate it."""
+    url: str
+    content: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0.0
+
+    def is_fresh(self, max_age: float) -> bool:
+        """Return True if the page can be served without contacting the server."""
+        return time.time() - self.fetched_at < max_age
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Return If-None-Match / If-Modified-Since headers for a conditional GET."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """Disk-backed, content-addressed cache of fetched pages.
+
+    Page bodies are stored once per SHA-256 of their cleaned markdown; URLs point
+    at a body and carry the ETag / Last-Modified validators. When the total size
+    of stored bodies exceeds ``max_bytes``, the least recently used URLs are
+    evicted together with bodies no other URL references.
+    """
+
+    def __init__(self, path: Path, max_bytes: int, max_age: float):
+        """Open or create the page cache database.
+
+        Args:
+            path: SQLite file holding the pages
+            max_bytes: Total size of stored bodies before LRU eviction starts
+            max_age: Seconds a page is served without revalidation
+        """
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS page_blobs ("
+            "  hash TEXT PRIMARY KEY, content TEXT, size INTEGER);"
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "  url TEXT PRIMARY KEY, hash TEXT, etag TEXT, last_modified TEXT,"
+            "  fetched_at REAL, accessed_at REAL);"
+            "CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at);"
+        )
+        self._conn.commit()
+
+    def lookup(self, url: str) -> Optional[CachedPage]:
+        """Return the cached page for ``url`` (fresh or stale), or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT b.content, p.etag, p.last_modified, p.fetched_at "
+                "FROM pages p JOIN page_blobs b ON b.hash = p.hash WHERE p.url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                metrics.increment("page_cache.misses")
+                return None
+            self._conn.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+        return CachedPage(url, row[0], row[1], row[2], row[3])
+
+    def touch(self, url: str) -> None:
+        """Mark ``url`` as revalidated (server answered 304 Not Modified)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, url)
+            )
+            self._conn.commit()
+        metrics.increment("page_cache.revalidated")
+
+    def store(self, url: str, content: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """Store the cleaned content of ``url``; empty content records a page not worth refetching."""
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO page_blobs VALUES (?, ?, ?)",
+                (digest, content, len(content.encode("utf-8"))),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+                (url, digest, etag, last_modified, now, now),
+            )
+            self._evict()
+            self._conn.commit()
+        metrics.increment("page_cache.stored")
+
+    def _evict(self) -> None:
+        """Drop least recently used pages until stored bodies fit in max_bytes."""
+        self._conn.execute("DELETE FROM page_blobs WHERE hash NOT IN (SELECT hash FROM pages)")
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM page_blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, digest in self._conn.execute(
+            "SELECT url, hash FROM pages ORDER BY accessed_at"
+        ).fetchall():
+            self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            metrics.increment("page_cache.evictions")
+            still_used = self._conn.execute(
+                "SELECT 1 FROM pages WHERE hash = ? LIMIT 1", (digest,)
+            ).fetchone()
+            if still_used is None:
+                size = self._conn.execute(
+                    "SELECT size FROM page_blobs WHERE hash = ?", (digest,)
+                ).fetchone()
+                self._conn.execute("DELETE FROM page_blobs WHERE hash = ?", (digest,))
+                total -= size[0] if size else 0
+            if total <= self.max_bytes:
+                break
+
+
+_page_caches: Dict[Path, PageCache] = {}
+_page_caches_lock = threading.Lock()
+
+
+def get_page_cache(cache_dir: Optional[str] = None) -> Optional[PageCache]:
+    """Return the shared page cache for ``cache_dir``, or None if the disk tier is disabled.
+
+    Size cap and freshness window come from PAGE_CACHE_MAX_BYTES (default 256 MB)
+    and PAGE_CACHE_MAX_AGE (default one hour, in seconds).
+    """
+    directory = resolve_cache_dir(cache_dir)
+    if directory is None:
+        return None
+    with _page_caches_lock:
+        cache = _page_caches.get(directory)
+        if cache is None:
+            cache = PageCache(
+                directory / "page_cache.sqlite3",
+                max_bytes=int(os.environ.get("PAGE_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+                max_age=float(os.environ.get("PAGE_CACHE_MAX_AGE", "3600")),
+            )
+            _page_caches[directory] = cache
+        return cache
+
+
+class LLMCache:
+    """SQLite cache of deterministic LLM responses, bounded by total size with LRU eviction."""
+
+    def __init__(self, path: Path, max_bytes: int):
+        """Open or create the LLM cache database.
+
+        Args:
+            path: SQLite file holding the responses
+            max_bytes: Total size of stored responses before LRU eviction starts
+        """
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "  key TEXT PRIMARY KEY, response TEXT, size INTEGER, accessed_at REAL);"
+            "CREATE INDEX IF NOT EXISTS llm_cache_accessed_at ON llm_cache (accessed_at);"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(provider: str, model: str, messages: Any, response_format: Any = None) -> str:
+        """Hash (provider, model, messages, response_format) into a cache key."""
+        payload = json.dumps(
+            [provider, model, messages, response_format], sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached response for ``key``, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                metrics.increment("llm_cache.misses")
+                return None
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        metrics.increment("llm_cache.hits")
+        return json.loads(row[0])
+
+    def set(self, key: str, response: Dict[str, Any]) -> None:
+        """Store ``response`` and evict least recently used entries beyond max_bytes."""
+        payload = json.dumps(response, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?)",
+                (key, payload, len(payload.encode("utf-8")), time.time()),
+            )
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+            if total > self.max_bytes:
+                for old_key, size in self._conn.execute(
+                    "SELECT key, size FROM llm_cache ORDER BY accessed_at"
+                ).fetchall():
+                    self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (old_key,))
+                    metrics.increment("llm_cache.evictions")
+                    total -= size
+                    if total <= self.max_bytes:
+                        break
+            self._conn.commit()
+
+
+_llm_caches: Dict[Path, LLMCache] = {}
+_llm_caches_lock = threading.Lock()
+
+
+def get_llm_cache(cache_dir: Optional[str] = None) -> Optional[LLMCache]:
+    """Return the shared LLM response cache for ``cache_dir``, or None if the disk tier is disabled.
+
+    The size cap comes from LLM_CACHE_MAX_BYTES (default 64 MB).
+    """
+    directory = resolve_cache_dir(cache_dir)
+    if directory is None:
+        return None
+    with _llm_caches_lock:
+        cache = _llm_caches.get(directory)
+        if cache is None:
+            cache = LLMCache(
+                directory / "llm_cache.sqlite3",
+                max_bytes=int(os.environ.get("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+            )
+            _llm_caches[directory] = cache
+        return cache
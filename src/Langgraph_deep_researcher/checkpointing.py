@@ -0,0 +1,151 @@
+"""
+检查点存储 - Checkpointing
+为研究图创建检查点存储，使中断的长时间研究可以按 thread_id 从最后完成的节点继续。
+默认使用本地 SQLite（需要安装 langgraph-checkpoint-sqlite），也可以选择内存存储，
+或通过 "package.module:factory" 接入自定义的存储实现。
+"""
+
+import importlib
+import logging
+import sqlite3
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import AsyncIterator, Iterator, List, Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from Langgraph_deep_researcher.cache import resolve_cache_dir
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = "checkpoints.sqlite"
+_SQLITE_INSTALL_HINT = "SQLite checkpoints need langgraph-checkpoint-sqlite: pip install 'langgraph-deep-researcher[checkpoint]'"
+
+# Custom types stored in graph state, allowed when checkpoints are deserialized
+_checkpoint_types: List[type] = []
+
+
+def register_checkpoint_types(*types: type) -> None:
+    """Allow instances of ``types`` (dataclasses, enums, models kept in graph state) in checkpoints."""
+    _checkpoint_types.extend(t for t in types if t not in _checkpoint_types)
+
+
+def _serializer() -> JsonPlusSerializer:
+    """Checkpoint serializer restricted to the built-in safe types plus the registered ones."""
+    try:
+        return JsonPlusSerializer(allowed_msgpack_modules=tuple(_checkpoint_types))
+    except TypeError:
+        # langgraph-checkpoint releases without msgpack allowlists
+        return JsonPlusSerializer()
+
+
+def resolve_checkpoint_path(checkpoint_path: str = "", cache_dir: Optional[str] = None) -> Optional[str]:
+    """Return the SQLite checkpoint file, by default inside the cache directory.
+
+    Returns None when neither a path nor a cache directory is configured.
+    """
+    if checkpoint_path:
+        path = Path(checkpoint_path).expanduser()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return str(path)
+    directory = resolve_cache_dir(cache_dir)
+    return str(directory / CHECKPOINT_FILE) if directory is not None else None
+
+
+def _custom_checkpointer(kind: str, path: Optional[str]) -> BaseCheckpointSaver:
+    """Build a checkpointer from a "package.module:factory" reference; the factory gets the path."""
+    module_name, _, factory_name = kind.partition(":")
+    factory = getattr(importlib.import_module(module_name), factory_name)
+    return factory(path)
+
+
+def _fallback_path(kind: str, path: Optional[str]) -> Optional[str]:
+    """Warn when SQLite checkpoints were requested without anywhere to put them."""
+    if kind == "sqlite" and path is None:
+        logger.warning("No checkpoint path or cache directory configured, keeping checkpoints in memory")
+    return path
+
+
+@contextmanager
+def open_checkpointer(
+    kind: str = "sqlite", checkpoint_path: str = "", cache_dir: Optional[str] = None
+) -> Iterator[BaseCheckpointSaver]:
+    """
+    Open a checkpointer for synchronous graph runs (graph.invoke / graph.stream).
+
+    Args:
+        kind: "sqlite", "memory" or a "package.module:factory" reference
+        checkpoint_path: SQLite file; defaults to CHECKPOINT_FILE in the cache directory
+        cache_dir: Cache directory, see cache.resolve_cache_dir
+
+    Yields:
+        BaseCheckpointSaver: The checkpointer, closed when the context exits
+    """
+    path = _fallback_path(kind, resolve_checkpoint_path(checkpoint_path, cache_dir))
+    if kind == "memory" or (kind == "sqlite" and path is None):
+        yield InMemorySaver(serde=_serializer())
+    elif kind == "sqlite":
+        try:
+            from langgraph.checkpoint.sqlite import SqliteSaver
+        except ImportError as e:
+            raise ImportError(_SQLITE_INSTALL_HINT) from e
+        # Parallel nodes of a sync run execute in worker threads
+        conn = sqlite3.connect(path, check_same_thread=False)
+        try:
+            yield SqliteSaver(conn, serde=_serializer())
+        finally:
+            conn.close()
+    elif ":" in kind:
+        yield _custom_checkpointer(kind, path)
+    else:
+        raise ValueError(f"Unknown checkpointer: {kind}")
+
+
+@asynccontextmanager
+async def aopen_checkpointer(
+    kind: str = "sqlite", checkpoint_path: str = "", cache_dir: Optional[str] = None
+) -> AsyncIterator[BaseCheckpointSaver]:
+    """Async variant of open_checkpointer for graph.ainvoke / graph.astream runs."""
+    path = _fallback_path(kind, resolve_checkpoint_path(checkpoint_path, cache_dir))
+    if kind == "memory" or (kind == "sqlite" and path is None):
+        yield InMemorySaver(serde=_serializer())
+    elif kind == "sqlite":
+        try:
+            import aiosqlite
+            from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+        except ImportError as e:
+            raise ImportError(_SQLITE_INSTALL_HINT) from e
+        async with aiosqlite.connect(path) as conn:
+            yield AsyncSqliteSaver(conn, serde=_serializer())
+    elif ":" in kind:
+        yield _custom_checkpointer(kind, path)
+    else:
+        raise ValueError(f"Unknown checkpointer: {kind}")
+
+
+def resume_input(snapshot, input_state, resume: bool, thread_id: str):
+    """
+    Return the graph input for a run on a checkpointed thread.
+
+    Args:
+        snapshot: The thread's current StateSnapshot (graph.get_state)
+        input_state: Input for a fresh run
+        resume: Whether to continue the thread's interrupted run
+        thread_id: The thread id, for error messages
+
+    Returns:
+        ``input_state`` for a new thread, None to continue from the last checkpoint
+
+    Raises:
+        ValueError: When resuming a thread without checkpoints, or starting a fresh
+            run on a thread that already has some
+    """
+    if resume:
+        if not snapshot.values:
+            raise ValueError(f"No checkpoint found for thread {thread_id}")
+        return None
+    if snapshot.values:
+        raise ValueError(f"Thread {thread_id} already has checkpoints; resume it or choose another thread id")
+    return input_state
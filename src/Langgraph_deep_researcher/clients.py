@@ -0,0 +1,160 @@
+"""
+客户端注册表 - Client Registry
+按 (provider, base_url, model, options) 缓存 LLM 与搜索 API 客户端，
+在进程生命周期内复用它们及其连接池。
+各 SDK 在第一次创建对应客户端时才导入，只用到 Ollama 的进程不会加载 OpenAI 或 Tavily。
+"""
+
+import asyncio
+import inspect
+import threading
+import weakref
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Tuple
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
+    from tavily import AsyncTavilyClient, TavilyClient
+
+_lock = threading.Lock()
+_clients: Dict[Tuple[Hashable, ...], Any] = {}
+# Async SDK clients own an httpx.AsyncClient bound to the loop that created it,
+# so they are cached per event loop.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[Hashable, ...], Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_or_create(key: Tuple[Hashable, ...], factory: Callable[[], Any]) -> Any:
+    """Return the cached client for ``key``, building it with ``factory`` on first use."""
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = factory()
+            _clients[key] = client
+        return client
+
+
+def _get_or_create_async(key: Tuple[Hashable, ...], factory: Callable[[], Any]) -> Any:
+    """Like _get_or_create, but scoped to the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            client = factory()
+            clients[key] = client
+        return client
+
+
+def _options_key(options: Dict[str, Any]) -> Tuple[Tuple[str, Any], ...]:
+    """Turn keyword options into a hashable, order-independent key."""
+    return tuple(sorted(options.items()))
+
+
+def _openai_client(base_url: str) -> "OpenAI":
+    from openai import OpenAI
+
+    return OpenAI(base_url=base_url)
+
+
+def _async_openai_client(base_url: str) -> "AsyncOpenAI":
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI(base_url=base_url)
+
+
+def _chat_model(provider: str, model: str, base_url: str, options: Dict[str, Any]):
+    if provider == "openai":
+        from langchain_openai import ChatOpenAI
+
+        return ChatOpenAI(base_url=base_url, model=model, **options)
+    # Default to Ollama
+    from langchain_ollama import ChatOllama
+
+    return ChatOllama(base_url=base_url, model=model, **options)
+
+
+def get_openai_client(base_url: str) -> "OpenAI":
+    """Return the shared OpenAI SDK client for ``base_url``."""
+    return _get_or_create(("openai-sdk", base_url), lambda: _openai_client(base_url))
+
+
+def get_async_openai_client(base_url: str) -> "AsyncOpenAI":
+    """Return the AsyncOpenAI SDK client for ``base_url`` on the running event loop."""
+    return _get_or_create_async(("openai-sdk", base_url), lambda: _async_openai_client(base_url))
+
+
+def get_chat_model(provider: str, model: str, base_url: str, **options: Any):
+    """
+    Return a shared LangChain chat model.
+
+    Args:
+        provider: "openai" or "ollama"
+        model: Model name
+        base_url: Base URL of the provider API
+        **options: Extra constructor options such as temperature or format
+
+    Returns:
+        A cached ChatOpenAI or ChatOllama instance
+    """
+    key = (provider, base_url, model, _options_key(options))
+    return _get_or_create(key, lambda: _chat_model(provider, model, base_url, options))
+
+
+def _tavily_client(api_key: str) -> "TavilyClient":
+    from tavily import TavilyClient
+
+    return TavilyClient(api_key=api_key)
+
+
+def _async_tavily_client(api_key: str) -> "AsyncTavilyClient":
+    from tavily import AsyncTavilyClient
+
+    return AsyncTavilyClient(api_key=api_key)
+
+
+def get_tavily_client(api_key: str) -> "TavilyClient":
+    """Return the shared Tavily client for ``api_key``."""
+    return _get_or_create(("tavily", api_key), lambda: _tavily_client(api_key))
+
+
+def get_async_tavily_client(api_key: str) -> "AsyncTavilyClient":
+    """Return the AsyncTavilyClient for ``api_key`` on the running event loop."""
+    return _get_or_create_async(("tavily", api_key), lambda: _async_tavily_client(api_key))
+
+
+async def aclose_clients() -> None:
+    """Close the async SDK clients bound to the running event loop.
+
+    Safe to call more than once; clients are recreated on next use.
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _async_clients.pop(loop, {})
+    for client in clients.values():
+        close = getattr(client, "close", None)
+        if close is not None:
+            result = close()
+            if inspect.isawaitable(result):
+                await result
+
+
+def close_clients() -> None:
+    """Close the shared sync SDK clients; LangChain chat models have nothing to close and are dropped.
+
+    Safe to call more than once; clients are recreated on next use.
+    """
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        close = getattr(client, "close", None)
+        if callable(close):
+            close()
+
+
+def clear_clients() -> None:
+    """Drop all cached clients; they are rebuilt on next use."""
+    with _lock:
+        _clients.clear()
+        _async_clients.clear()
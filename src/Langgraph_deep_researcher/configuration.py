@@ -21,6 +21,11 @@ class Configuration(BaseModel):
         title="Research Depth",
         description="Number of research iterations to perform",
     )
+    queries_per_loop: int = Field(
+        default_factory=lambda: int(os.environ.get("QUERIES_PER_LOOP", "1")),
+        title="Queries Per Loop",
+        description="Number of search queries generated and searched in parallel in each research loop",
+    )
     local_llm: str = Field(
         default_factory=lambda: os.environ.get("LOCAL_LLM", "llama3"),
         title="LLM Model Name",
@@ -31,16 +36,111 @@ class Configuration(BaseModel):
         title="LLM Provider",
         description="Provider for the LLM (ollama or openAI)",
     )
-    search_api: Literal["perplexity", "tavily", "duckduckgo", "searxng"] = Field(
+    search_api: str = Field(
         default_factory=lambda: os.environ.get("SEARCH_API", "duckduckgo"),
         title="Search API", 
-        description="Web search API to use"
+        description="Web search backend to use: a registered name (perplexity, tavily, duckduckgo, searxng) or a package.module:factory reference"
     )
     fetch_full_page: bool = Field(
         default_factory=lambda: os.environ.get("FETCH_FULL_PAGE", "true").lower() == "true",
         title="Fetch Full Page",
         description="Include the full page content in the search results",
     )
+    fetch_max_concurrency: int = Field(
+        default_factory=lambda: int(os.environ.get("FETCH_MAX_CONCURRENCY", "8")),
+        title="Fetch Max Concurrency",
+        description="Maximum number of full-page fetches in flight at once",
+    )
+    fetch_per_host_limit: int = Field(
+        default_factory=lambda: int(os.environ.get("FETCH_PER_HOST_LIMIT", "2")),
+        title="Fetch Per-Host Limit",
+        description="Maximum number of concurrent full-page fetches against one host",
+    )
+    fetch_deadline: float = Field(
+        default_factory=lambda: float(os.environ.get("FETCH_DEADLINE", "15")),
+        title="Fetch Deadline",
+        description="Overall time budget in seconds for fetching the full pages of one search",
+    )
+    fetch_max_bytes: int = Field(
+        default_factory=lambda: int(os.environ.get("FETCH_MAX_BYTES", str(2 * 1024 * 1024))),
+        title="Fetch Max Bytes",
+        description="Maximum number of bytes downloaded per page; larger pages are truncated",
+    )
+    search_cache: bool = Field(
+        default_factory=lambda: os.environ.get("SEARCH_CACHE", "false").lower() == "true",
+        title="Search Cache",
+        description="Reuse cached search results for repeated queries instead of calling the search API again",
+    )
+    page_cache: bool = Field(
+        default_factory=lambda: os.environ.get("PAGE_CACHE", "false").lower() == "true",
+        title="Page Cache",
+        description="Keep fetched pages on disk and revalidate them with conditional requests",
+    )
+    llm_cache: bool = Field(
+        default_factory=lambda: os.environ.get("LLM_CACHE", "false").lower() == "true",
+        title="LLM Response Cache",
+        description="Reuse cached responses for identical temperature=0 LLM calls",
+    )
+    cache_dir: str = Field(
+        default_factory=lambda: os.environ.get("CACHE_DIR", "~/.cache/langgraph-deep-researcher"),
+        title="Cache Directory",
+        description="Directory for on-disk caches; empty to keep caches in memory only",
+    )
+    context_window: int = Field(
+        default_factory=lambda: int(os.environ.get("CONTEXT_WINDOW", "0")),
+        title="Context Window",
+        description="Context window of the model in tokens; 0 looks it up from the model name",
+    )
+    response_token_reserve: int = Field(
+        default_factory=lambda: int(os.environ.get("RESPONSE_TOKEN_RESERVE", "1024")),
+        title="Response Token Reserve",
+        description="Tokens of the context window kept free for the model's answer",
+    )
+    max_tokens_per_source: int = Field(
+        default_factory=lambda: int(os.environ.get("MAX_TOKENS_PER_SOURCE", "1000")),
+        title="Max Tokens Per Source",
+        description="Cap on each source's full page content in tokens, lowered further to fit the context window; 0 uses the whole window-derived share",
+    )
+    token_counter: str = Field(
+        default_factory=lambda: os.environ.get("TOKEN_COUNTER", "auto"),
+        title="Token Counter",
+        description="Token counter used for budgeting: auto, tiktoken, approximate or a registered name",
+    )
+    checkpointer: str = Field(
+        default_factory=lambda: os.environ.get("CHECKPOINTER", "sqlite"),
+        title="Checkpointer",
+        description="Checkpoint store for resumable runs: sqlite, memory or package.module:factory",
+    )
+    checkpoint_path: str = Field(
+        default_factory=lambda: os.environ.get("CHECKPOINT_PATH", ""),
+        title="Checkpoint Path",
+        description="SQLite checkpoint file; empty to use checkpoints.sqlite in the cache directory",
+    )
+    max_concurrent_research_tasks: int = Field(
+        default_factory=lambda: int(os.environ.get("MAX_CONCURRENT_RESEARCH_TASKS", "3")),
+        title="Max Concurrent Research Tasks",
+        description="Maximum number of tasks the supervisory scheduler runs at the same time",
+    )
+    max_concurrent_topics: int = Field(
+        default_factory=lambda: int(os.environ.get("MAX_CONCURRENT_TOPICS", "4")),
+        title="Max Concurrent Topics",
+        description="Maximum number of topics researched at the same time in batch mode",
+    )
+    max_concurrent_jobs: int = Field(
+        default_factory=lambda: int(os.environ.get("MAX_CONCURRENT_JOBS", "2")),
+        title="Max Concurrent Jobs",
+        description="Maximum number of research jobs the HTTP server runs at the same time",
+    )
+    max_queued_jobs: int = Field(
+        default_factory=lambda: int(os.environ.get("MAX_QUEUED_JOBS", "100")),
+        title="Max Queued Jobs",
+        description="Jobs waiting for a worker beyond this are rejected by the HTTP server",
+    )
+    max_stored_jobs: int = Field(
+        default_factory=lambda: int(os.environ.get("MAX_STORED_JOBS", "1000")),
+        title="Max Stored Jobs",
+        description="Finished jobs kept in server memory; older ones remain in the cache directory",
+    )
     ollama_base_url: str = Field(
         default_factory=lambda: os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434/"),
         title="Ollama Base URL",
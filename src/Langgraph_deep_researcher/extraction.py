@@ -0,0 +1,287 @@
+"""
+正文提取 - Main Content Extraction
+在 markdown 转换之前去掉导航、页脚、侧边栏和广告等模板内容，只保留页面正文。
+安装 lxml 时使用类 readability 的段落打分算法，否则退化为基于正则的提取。
+同时提供单页应用（SPA）检测：只依赖服务端渲染 HTML 无法得到正文的页面直接跳过。
+"""
+
+import copy
+import importlib.util
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+
+from Langgraph_deep_researcher import metrics
+
+_HAS_LXML = importlib.util.find_spec("lxml") is not None
+if _HAS_LXML:
+    import lxml.html
+
+# Extracted content shorter than this (in visible characters) is not trusted;
+# the whole page minus boilerplate is used instead
+MIN_CONTENT_CHARS = 250
+
+# Elements that never hold the main content
+_BOILERPLATE_TAGS = ("nav", "footer", "aside", "form", "noscript", "iframe", "svg", "button", "select")
+# class/id hints, as in Readability
+_NEGATIVE_HINTS = re.compile(
+    r"nav|menu|footer|sidebar|side-bar|comment|banner|advert|\bads?\b|sponsor|promo|share|social|"
+    r"cookie|consent|popup|modal|newsletter|subscribe|related|recommend|breadcrumb|masthead|widget",
+    re.IGNORECASE,
+)
+_POSITIVE_HINTS = re.compile(r"article|body|content|entry|main|post|story|text", re.IGNORECASE)
+_PARAGRAPH_TAGS = ("p", "pre", "td", "blockquote", "li")
+_MIN_PARAGRAPH_CHARS = 25
+
+_BOILERPLATE_BLOCK_PATTERN = re.compile(
+    rf"<({'|'.join(_BOILERPLATE_TAGS)})\b[^>]*>.*?</\1\s*>", re.DOTALL | re.IGNORECASE
+)
+_MAIN_BLOCK_PATTERN = re.compile(r"<(article|main)\b[^>]*>(.*?)</\1\s*>", re.DOTALL | re.IGNORECASE)
+_TAG_PATTERN = re.compile(r"<[^>]+>")
+_XML_DECLARATION_PATTERN = re.compile(r"^\s*<\?xml[^>]*\?>")
+
+# SPA detection only looks at this many leading characters of a page
+SPA_SCAN_CHARS = 64 * 1024
+# An SPA shell has almost no server-rendered text
+SPA_MAX_VISIBLE_CHARS = 200
+SPA_MAX_TEXT_RATIO = 0.02
+SPA_RATIO_MAX_VISIBLE_CHARS = 1000
+# An empty framework mount point is strong evidence, so a higher text ratio is tolerated
+SPA_MOUNT_POINT_MAX_TEXT_RATIO = 0.1
+_BODY_START_PATTERN = re.compile(r"<body\b[^>]*>", re.IGNORECASE)
+_SCRIPT_TAG_PATTERN = re.compile(r"<script\b", re.IGNORECASE)
+_INVISIBLE_MARKUP_PATTERN = re.compile(
+    r"<(?:script[^>]*>.*?</script|style[^>]*>.*?</style|noscript[^>]*>.*?</noscript|!--.*?--|template[^>]*>.*?</template|[^>]+)>",
+    re.DOTALL | re.IGNORECASE,
+)
+# A script or style cut off by the end of the scanned prefix
+_UNCLOSED_INVISIBLE_PATTERN = re.compile(
+    r"<(script|style|noscript|template)\b[^>]*>(?:(?!</\1).)*\Z", re.DOTALL | re.IGNORECASE
+)
+# Empty client-side mount points of React, Vue, Next.js, Nuxt, Gatsby, Svelte and Angular apps
+_EMPTY_MOUNT_POINT_PATTERN = re.compile(
+    r"<div\b[^>]*\bid=[\"']?(?:root|app|__next|__nuxt|___gatsby|svelte)[\"']?[^>]*>\s*</div>"
+    r"|<app-root\b[^>]*>\s*</app-root>",
+    re.IGNORECASE,
+)
+
+
+def detect_javascript_page(html_content: str) -> Optional[str]:
+    """
+    Decide whether a page is a client-rendered shell with no usable server HTML.
+
+    Only the first SPA_SCAN_CHARS characters are inspected, starting at <body>.
+    A page counts as an SPA when it carries scripts and has little visible text:
+    an empty framework mount point (e.g. ``<div id="root"></div>``) with a
+    visible-text ratio under SPA_MOUNT_POINT_MAX_TEXT_RATIO, fewer than
+    SPA_MAX_VISIBLE_CHARS visible characters, or a visible-text ratio under
+    SPA_MAX_TEXT_RATIO. Pages with SPA_RATIO_MAX_VISIBLE_CHARS visible characters
+    or more are always kept. When the <head> fills the whole scanned prefix the
+    result is inconclusive and the page is kept.
+
+    The decision reason is counted in metrics as ``spa_check.<reason>``.
+
+    Args:
+        html_content (str): The HTML document
+
+    Returns:
+        Optional[str]: "empty_mount_point" or "low_visible_text" for SPA pages, None otherwise
+    """
+    reason = _spa_reason(html_content[:SPA_SCAN_CHARS], truncated=len(html_content) > SPA_SCAN_CHARS)
+    metrics.increment(f"spa_check.{reason}")
+    return reason if reason in ("empty_mount_point", "low_visible_text") else None
+
+
+def _spa_reason(prefix: str, truncated: bool) -> str:
+    """Return the SPA decision reason for the scanned prefix of a page."""
+    if not _SCRIPT_TAG_PATTERN.search(prefix):
+        return "no_scripts"
+
+    body_start = _BODY_START_PATTERN.search(prefix)
+    if body_start is None and truncated:
+        return "inconclusive"
+    body = prefix[body_start.end():] if body_start else prefix
+    if truncated:
+        body = _UNCLOSED_INVISIBLE_PATTERN.sub("", body)
+
+    visible_chars = len(" ".join(_INVISIBLE_MARKUP_PATTERN.sub(" ", body).split()))
+    if visible_chars >= SPA_RATIO_MAX_VISIBLE_CHARS:
+        return "static"
+    text_ratio = visible_chars / max(1, len(body))
+    # An empty mount point next to real server-rendered text (e.g. a comment widget) is not a shell
+    if _EMPTY_MOUNT_POINT_PATTERN.search(body) and text_ratio < SPA_MOUNT_POINT_MAX_TEXT_RATIO:
+        return "empty_mount_point"
+    if visible_chars < SPA_MAX_VISIBLE_CHARS and not truncated:
+        return "low_visible_text"
+    if text_ratio < SPA_MAX_TEXT_RATIO:
+        return "low_visible_text"
+    return "static"
+
+
+def extract_main_content(html_content: str) -> str:
+    """
+    Isolate the main article body of an HTML document.
+
+    Boilerplate (navigation, footers, sidebars, ads, forms) is removed first.
+    Then an <article>/<main> element is used when it holds enough text, or
+    otherwise the best block found by Readability-style paragraph scoring. If no
+    candidate has at least MIN_CONTENT_CHARS of text, extraction is retried
+    without class/id pruning and finally the page minus boilerplate tags is
+    returned, so extraction never loses a page that has content. Elements that
+    wrap the best scoring paragraphs are never pruned.
+
+    The chosen path is counted in metrics under ``extract.*``.
+
+    Args:
+        html_content (str): The HTML document, ideally with scripts and styles removed
+
+    Returns:
+        str: HTML fragment holding the main content
+    """
+    if _HAS_LXML:
+        try:
+            return _extract_with_lxml(html_content)
+        except (ValueError, lxml.etree.ParserError):
+            pass
+    return _extract_with_regex(html_content)
+
+
+def _text_length(element) -> int:
+    """Length of the visible text of an lxml element, whitespace collapsed."""
+    return len(" ".join(element.text_content().split()))
+
+
+def _link_density(element) -> float:
+    """Share of an element's text that sits inside links."""
+    text_length = _text_length(element)
+    if not text_length:
+        return 1.0
+    link_length = sum(_text_length(link) for link in element.iter("a"))
+    return min(1.0, link_length / text_length)
+
+
+def _is_boilerplate(element) -> bool:
+    """Tell whether the element's class/id marks it as navigation, ads or similar."""
+    hints = f"{element.get('class', '')} {element.get('id', '')}"
+    return bool(_NEGATIVE_HINTS.search(hints)) and not _POSITIVE_HINTS.search(hints)
+
+
+def _score_paragraphs(document) -> Dict[object, float]:
+    """Readability paragraph scores of the containers of each paragraph."""
+    scores: Dict[object, float] = defaultdict(float)
+    for paragraph in document.iter(*_PARAGRAPH_TAGS):
+        text = " ".join(paragraph.text_content().split())
+        if len(text) < _MIN_PARAGRAPH_CHARS:
+            continue
+        score = 1 + text.count(",") + min(len(text) // 100, 3)
+        parent = paragraph.getparent()
+        if parent is not None:
+            scores[parent] += score
+            grandparent = parent.getparent()
+            if grandparent is not None:
+                scores[grandparent] += score / 2
+    return scores
+
+
+def _best_candidate(scores: Dict[object, float]):
+    """Return the top scoring container, penalized by its link density."""
+    # Link density only matters for the few top candidates
+    top = sorted(scores, key=scores.get, reverse=True)[:5]
+    return max(top, key=lambda element: scores[element] * (1 - _link_density(element)))
+
+
+def _drop_boilerplate(document, protected: Set[object], prune_hints: bool) -> None:
+    """
+    Remove boilerplate elements in place.
+
+    Elements in ``protected`` hold the best scoring paragraphs and are kept even
+    when their tag or class/id looks like boilerplate, as Readability does for
+    unlikely candidates (e.g. ``<div class="container has-sidebar">`` wrapping
+    the whole article).
+    """
+    for element in document.xpath(
+        "|".join(f"//{tag}" for tag in _BOILERPLATE_TAGS)
+        + "|//header[not(ancestor::article) and not(ancestor::main)]"
+    ):
+        if element not in protected:
+            element.drop_tree()
+    if not prune_hints:
+        return
+    for element in document.xpath("//body//*[@class or @id]"):
+        if element.tag not in ("article", "main") and element not in protected and _is_boilerplate(element):
+            element.drop_tree()
+
+
+def _select_content(document) -> Optional[str]:
+    """Return the main content of a boilerplate-free document, or None when no candidate is long enough."""
+    # An explicit main element wins when it holds enough text
+    main_elements = document.xpath("//article|//main|//*[@role='main']")
+    if main_elements:
+        best = max(main_elements, key=_text_length)
+        if _text_length(best) >= MIN_CONTENT_CHARS:
+            metrics.increment("extract.main_element")
+            return lxml.html.tostring(best, encoding="unicode")
+
+    # Otherwise score paragraph containers
+    scores = _score_paragraphs(document)
+    if scores:
+        best = _best_candidate(scores)
+        selected = _with_related_siblings(best, scores)
+        if sum(_text_length(element) for element in selected) >= MIN_CONTENT_CHARS:
+            metrics.increment("extract.scored")
+            return "".join(lxml.html.tostring(element, encoding="unicode") for element in selected)
+    return None
+
+
+def _extract_with_lxml(html_content: str) -> str:
+    """Readability-style extraction on an lxml tree."""
+    document = lxml.html.document_fromstring(_XML_DECLARATION_PATTERN.sub("", html_content))
+
+    # The best scoring container and its ancestors are never pruned
+    scores = _score_paragraphs(document)
+    protected: Set[object] = set()
+    if scores:
+        best = _best_candidate(scores)
+        protected.update([best, *best.iterancestors()])
+
+    _drop_boilerplate(document, protected, prune_hints=False)
+    unpruned = copy.deepcopy(document)
+    _drop_boilerplate(document, protected, prune_hints=True)
+
+    content = _select_content(document)
+    if content is not None:
+        return content
+    # class/id hints can be wrong; retry without them before giving up on extraction
+    content = _select_content(unpruned)
+    if content is not None:
+        metrics.increment("extract.unpruned")
+        return content
+
+    metrics.increment("extract.full_page")
+    body = unpruned.find("body")
+    return lxml.html.tostring(body if body is not None else unpruned, encoding="unicode")
+
+
+def _with_related_siblings(best, scores: Dict[object, float]) -> List[object]:
+    """Return ``best`` plus siblings that score close to it, in document order."""
+    parent = best.getparent()
+    if parent is None:
+        return [best]
+    threshold = max(10.0, scores[best] * 0.2)
+    return [
+        sibling for sibling in parent
+        if sibling is best or scores.get(sibling, 0.0) >= threshold
+    ]
+
+
+def _extract_with_regex(html_content: str) -> str:
+    """Fallback extraction without a parser: drop boilerplate blocks, prefer <article>/<main>."""
+    html_content = _BOILERPLATE_BLOCK_PATTERN.sub("", html_content)
+    blocks = [match.group(2) for match in _MAIN_BLOCK_PATTERN.finditer(html_content)]
+    if blocks:
+        best = max(blocks, key=lambda block: len(_TAG_PATTERN.sub("", block)))
+        if len(" ".join(_TAG_PATTERN.sub("", best).split())) >= MIN_CONTENT_CHARS:
+            metrics.increment("extract.main_element")
+            return best
+    metrics.increment("extract.full_page")
+    return html_content
@@ -1,27 +1,33 @@
+import asyncio
+import functools
 import json
+import logging
+
+from typing import List, Union
 
 from pydantic import BaseModel, Field
 from typing_extensions import Literal
 
-from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_core.runnables import RunnableConfig
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langchain_core.tools import tool
-from langchain_ollama import ChatOllama
-from langchain_openai import ChatOpenAI
-from openai import OpenAI
 from langgraph.graph import START, END, StateGraph
+from langgraph.types import Send
 
-from Langgraph_deep_researcher.configuration import Configuration, SearchAPI
+from Langgraph_deep_researcher.cache import get_llm_cache
+from Langgraph_deep_researcher.clients import (
+    get_async_openai_client,
+    get_chat_model,
+    get_openai_client,
+)
+from Langgraph_deep_researcher.configuration import Configuration
 from Langgraph_deep_researcher.utils import (
     deduplicate_and_format_sources,
-    tavily_search,
     format_sources,
-    perplexity_search,
-    duckduckgo_search,
-    searxng_search,
     strip_thinking_tokens,
-    clean_html_content,
+    TokenStream,
     get_config_value,
+    split_formatted_sources,
 )
 from Langgraph_deep_researcher.state import (
     SummaryState,
@@ -37,11 +43,285 @@ from Langgraph_deep_researcher.prompts import (
     tool_calling_query_instructions,
     json_mode_reflection_instructions,
     tool_calling_reflection_instructions,
+    multi_query_instructions,
+)
+from Langgraph_deep_researcher.packing import context_window_for, pack_sources
+from Langgraph_deep_researcher.search_backends import (
+    SearchCapabilities,
+    SearchOptions,
+    get_search_backend,
 )
+from Langgraph_deep_researcher.tokens import TokenCounter, get_token_counter
+
+logger = logging.getLogger(__name__)
 
 # Constants
-MAX_TOKENS_PER_SOURCE = 1000
-CHARS_PER_TOKEN = 4
+# Context tokens kept free for the summarizer instructions, running summary and answer
+SUMMARY_TOKEN_RESERVE = 2048
+MIN_TOKENS_PER_SOURCE = 250
+
+def message_dicts(messages: list) -> list:
+    """Convert LangChain messages to the role/content dicts used by the OpenAI SDK."""
+    roles = {"system": "system", "human": "user", "ai": "assistant"}
+    return [{"role": roles.get(m.type, m.type), "content": m.content} for m in messages]
+
+def get_response_cache(configurable: Configuration):
+    """Return the LLM response cache if enabled in the configuration, else None."""
+    return get_llm_cache(configurable.cache_dir) if configurable.llm_cache else None
+
+def cached_response(configurable: Configuration, provider: str, sdk_messages: list, response_format=None):
+    """Look a request up in the LLM response cache.
+
+    Args:
+        configurable: Configuration object
+        provider: Provider name used in the cache key
+        sdk_messages: Role/content message dicts (see message_dicts)
+        response_format: Description of the requested output format, part of the cache key
+
+    Returns:
+        Tuple of (cache, key, cached entry); cache and key are None when caching is disabled
+    """
+    cache = get_response_cache(configurable)
+    if cache is None:
+        return None, None, None
+    key = cache.make_key(provider, configurable.local_llm, sdk_messages, response_format)
+    return cache, key, cache.get(key)
+
+def completion_content(completion) -> str:
+    """Extract the text from an OpenAI SDK chat completion ("" if it has none)."""
+    # Handle different response formats
+    if hasattr(completion, 'choices') and completion.choices:
+        return completion.choices[0].message.content or ""
+    elif isinstance(completion, str):
+        return completion
+    else:
+        logger.warning("Unexpected completion format: %s", type(completion))
+        return ""
+
+def openai_completion_args(configurable: Configuration, sdk_messages: list, response_format=None) -> dict:
+    """Build the keyword arguments for a temperature=0 OpenAI SDK chat completion."""
+    extra_args = {"response_format": response_format} if response_format else {}
+    return {
+        "model": configurable.local_llm,
+        "messages": sdk_messages,
+        "temperature": 0,
+        **extra_args,
+    }
+
+def openai_chat_completion(configurable: Configuration, messages: list, response_format=None) -> str:
+    """Run a temperature=0 chat completion through the OpenAI SDK.
+
+    Identical requests are answered from the LLM response cache when it is enabled.
+
+    Args:
+        configurable: Configuration object
+        messages: LangChain messages to send
+        response_format: Optional OpenAI response_format, e.g. {"type": "json_object"}
+
+    Returns:
+        The completion text ("" if the response had no content)
+    """
+    sdk_messages = message_dicts(messages)
+    cache, key, cached = cached_response(configurable, "openai", sdk_messages, response_format)
+    if cached is not None:
+        return cached["content"]
+
+    client = get_openai_client(configurable.openai_base_url)
+    completion = client.chat.completions.create(
+        **openai_completion_args(configurable, sdk_messages, response_format)
+    )
+    content = completion_content(completion)
+
+    if cache is not None and content:
+        cache.set(key, {"content": content})
+    return content
+
+async def aopenai_chat_completion(configurable: Configuration, messages: list, response_format=None) -> str:
+    """Async variant of openai_chat_completion using the AsyncOpenAI client."""
+    sdk_messages = message_dicts(messages)
+    # The LLM cache is SQLite; keep its disk I/O off the event loop
+    cache, key, cached = await asyncio.to_thread(cached_response, configurable, "openai", sdk_messages, response_format)
+    if cached is not None:
+        return cached["content"]
+
+    client = get_async_openai_client(configurable.openai_base_url)
+    completion = await client.chat.completions.create(
+        **openai_completion_args(configurable, sdk_messages, response_format)
+    )
+    content = completion_content(completion)
+
+    if cache is not None and content:
+        await asyncio.to_thread(cache.set, key, {"content": content})
+    return content
+
+def invoke_chat_model(configurable: Configuration, llm, messages: list, response_format=None) -> AIMessage:
+    """Invoke a temperature=0 LangChain chat model, using the LLM response cache when enabled.
+
+    Args:
+        configurable: Configuration object
+        llm: The chat model (optionally bound to tools)
+        messages: LangChain messages to send
+        response_format: Description of the requested output format, part of the cache key
+
+    Returns:
+        The model's AIMessage (rebuilt from content and tool calls on a cache hit)
+    """
+    cache, key, cached = cached_response(
+        configurable, configurable.llm_provider, message_dicts(messages), response_format
+    )
+    if cached is not None:
+        return AIMessage(content=cached["content"], tool_calls=cached["tool_calls"])
+
+    result = llm.invoke(messages)
+
+    if cache is not None and (result.content or result.tool_calls):
+        cache.set(key, {"content": result.content, "tool_calls": result.tool_calls})
+    return result
+
+async def ainvoke_chat_model(configurable: Configuration, llm, messages: list, response_format=None) -> AIMessage:
+    """Async variant of invoke_chat_model using ``llm.ainvoke``."""
+    cache, key, cached = await asyncio.to_thread(
+        cached_response, configurable, configurable.llm_provider, message_dicts(messages), response_format
+    )
+    if cached is not None:
+        return AIMessage(content=cached["content"], tool_calls=cached["tool_calls"])
+
+    result = await llm.ainvoke(messages)
+
+    if cache is not None and (result.content or result.tool_calls):
+        await asyncio.to_thread(cache.set, key, {"content": result.content, "tool_calls": result.tool_calls})
+    return result
+
+def delta_content(chunk) -> str:
+    """Extract the text delta from an OpenAI SDK streaming chunk ("" if it has none)."""
+    if getattr(chunk, "choices", None):
+        return chunk.choices[0].delta.content or ""
+    return ""
+
+def stream_chat_completion(configurable: Configuration, messages: list, source: str) -> str:
+    """Generate a plain-text temperature=0 completion, streaming its tokens as they arrive.
+
+    Tokens are forwarded to the "custom" stream mode through TokenStream, with
+    thinking blocks removed incrementally when ``strip_thinking_tokens`` is set.
+    OpenAI goes through the SDK with ``stream=True``; Ollama through
+    ``ChatOllama.stream``, so its tokens also appear in the "messages" stream mode.
+    A cached response is streamed as a single chunk.
+
+    Args:
+        configurable: Configuration object
+        messages: LangChain messages to send
+        source: Node name attached to the streamed tokens
+
+    Returns:
+        The complete response text, including any thinking blocks
+    """
+    sdk_messages = message_dicts(messages)
+    cache, key, cached = cached_response(configurable, configurable.llm_provider, sdk_messages)
+    tokens = TokenStream(source, configurable.strip_thinking_tokens)
+    if cached is not None:
+        tokens.send(cached["content"])
+        return tokens.close()
+
+    if configurable.llm_provider == "openai":
+        client = get_openai_client(configurable.openai_base_url)
+        for chunk in client.chat.completions.create(
+            **openai_completion_args(configurable, sdk_messages), stream=True
+        ):
+            tokens.send(delta_content(chunk))
+    else:  # Default to Ollama
+        for chunk in get_summary_llm(configurable).stream(messages):
+            tokens.send(chunk.content)
+    content = tokens.close()
+
+    if cache is not None and content:
+        cache.set(key, {"content": content, "tool_calls": []})
+    return content
+
+async def astream_chat_completion(configurable: Configuration, messages: list, source: str) -> str:
+    """Async variant of stream_chat_completion."""
+    sdk_messages = message_dicts(messages)
+    cache, key, cached = await asyncio.to_thread(cached_response, configurable, configurable.llm_provider, sdk_messages)
+    tokens = TokenStream(source, configurable.strip_thinking_tokens)
+    if cached is not None:
+        tokens.send(cached["content"])
+        return tokens.close()
+
+    if configurable.llm_provider == "openai":
+        client = get_async_openai_client(configurable.openai_base_url)
+        stream = await client.chat.completions.create(
+            **openai_completion_args(configurable, sdk_messages), stream=True
+        )
+        async for chunk in stream:
+            tokens.send(delta_content(chunk))
+    else:  # Default to Ollama
+        async for chunk in get_summary_llm(configurable).astream(messages):
+            tokens.send(chunk.content)
+    content = tokens.close()
+
+    if cache is not None and content:
+        await asyncio.to_thread(cache.set, key, {"content": content, "tool_calls": []})
+    return content
+
+def search_query_update(
+    search_query: str, additional_queries, number_of_queries: int
+) -> dict:
+    """Build the state update for a generated query plus optional additional queries.
+
+    Args:
+        search_query: The main search query
+        additional_queries: Extra queries returned by the model (may be None or malformed)
+        number_of_queries: Total number of queries wanted for this loop
+
+    Returns:
+        Dictionary with "search_query" and "search_queries" keys
+    """
+    search_queries = [search_query]
+    if number_of_queries > 1 and isinstance(additional_queries, list):
+        for query in additional_queries:
+            if isinstance(query, str) and query.strip() and query not in search_queries:
+                search_queries.append(query)
+            if len(search_queries) >= number_of_queries:
+                break
+    return {"search_query": search_query, "search_queries": search_queries}
+
+def query_from_json(
+    configurable: Configuration, content: str, json_query_field: str, fallback: dict
+) -> dict:
+    """Parse a JSON mode response into a search query update, or return ``fallback``."""
+    try:
+        parsed_json = json.loads(content)
+        search_query = parsed_json.get(json_query_field)
+        if not search_query:
+            return fallback
+        return search_query_update(
+            search_query,
+            parsed_json.get("additional_queries"),
+            max(1, configurable.queries_per_loop),
+        )
+    except (json.JSONDecodeError, KeyError, AttributeError):
+        if configurable.strip_thinking_tokens:
+            content = strip_thinking_tokens(content)
+        return fallback
+
+def query_from_tool_calls(
+    configurable: Configuration, result: AIMessage, tool_query_field: str, fallback: dict
+) -> dict:
+    """Parse a tool calling response into a search query update, or return ``fallback``."""
+    if not result.tool_calls:
+        return fallback
+
+    try:
+        tool_data = result.tool_calls[0]["args"]
+        search_query = tool_data.get(tool_query_field)
+        if not search_query:
+            return fallback
+        return search_query_update(
+            search_query,
+            tool_data.get("additional_queries"),
+            max(1, configurable.queries_per_loop),
+        )
+    except (IndexError, KeyError):
+        return fallback
 
 def generate_search_query_with_structured_output(
     configurable: Configuration,
@@ -53,6 +333,9 @@ def generate_search_query_with_structured_output(
 ):
     """Helper function to generate search queries using either tool calling or JSON mode.
     
+    When ``configurable.queries_per_loop`` is above one, the model is also asked for
+    ``additional_queries``, which are returned in ``search_queries`` after the main query.
+
     Args:
         configurable: Configuration object
         messages: List of messages to send to LLM
@@ -62,72 +345,97 @@ def generate_search_query_with_structured_output(
         json_query_field: Field name in JSON response containing the query
         
     Returns:
-        Dictionary with "search_query" key
+        Dictionary with "search_query" and "search_queries" keys
     """
+    fallback = search_query_update(fallback_query, None, 1)
+
     # OpenAI path: call SDK directly to avoid LangChain response coercion issues
     if configurable.llm_provider == "openai":
-        client = OpenAI(base_url=configurable.openai_base_url)
-        sdk_messages = [
-            {"role": "system", "content": messages[0].content},
-            {"role": "user", "content": messages[1].content},
-        ]
-        completion = client.chat.completions.create(
-            model=configurable.local_llm,
-            messages=sdk_messages,
-            response_format={"type": "json_object"},
-            temperature=0,
-        )
-        
-        # Handle different response formats
-        if hasattr(completion, 'choices') and completion.choices:
-            content = completion.choices[0].message.content or "{}"
-        elif isinstance(completion, str):
-            content = completion
-        else:
-            print(f"Warning: Unexpected completion format: {type(completion)}")
-            content = "{}"
-        try:
-            parsed_json = json.loads(content)
-            search_query = parsed_json.get(json_query_field)
-            if not search_query:
-                return {"search_query": fallback_query}
-            return {"search_query": search_query}
-        except (json.JSONDecodeError, KeyError):
-            if configurable.strip_thinking_tokens:
-                content = strip_thinking_tokens(content)
-            return {"search_query": fallback_query}
+        content = openai_chat_completion(
+            configurable, messages, response_format={"type": "json_object"}
+        ) or "{}"
+        return query_from_json(configurable, content, json_query_field, fallback)
 
     if configurable.use_tool_calling:
         llm = get_llm(configurable).bind_tools([tool_class])
-        result = llm.invoke(messages)
-
-        if not result.tool_calls:
-            return {"search_query": fallback_query}
-        
-        try:
-            tool_data = result.tool_calls[0]["args"]
-            search_query = tool_data.get(tool_query_field)
-            return {"search_query": search_query}
-        except (IndexError, KeyError):
-            return {"search_query": fallback_query}
+        result = invoke_chat_model(
+            configurable, llm, messages, response_format={"tools": [tool_class.name]}
+        )
+        return query_from_tool_calls(configurable, result, tool_query_field, fallback)
     
     else:
         # Use JSON mode
         llm = get_llm(configurable)
-        result = llm.invoke(messages)
-        print(f"result: {result}")
-        content = result.content
-
-        try:
-            parsed_json = json.loads(content)
-            search_query = parsed_json.get(json_query_field)
-            if not search_query:
-                return {"search_query": fallback_query}
-            return {"search_query": search_query}
-        except (json.JSONDecodeError, KeyError):
-            if configurable.strip_thinking_tokens:
-                content = strip_thinking_tokens(content)
-            return {"search_query": fallback_query}
+        result = invoke_chat_model(
+            configurable, llm, messages, response_format={"format": "json"}
+        )
+        return query_from_json(configurable, result.content, json_query_field, fallback)
+
+async def agenerate_search_query_with_structured_output(
+    configurable: Configuration,
+    messages: list,
+    tool_class,
+    fallback_query: str,
+    tool_query_field: str,
+    json_query_field: str,
+):
+    """Async variant of generate_search_query_with_structured_output."""
+    fallback = search_query_update(fallback_query, None, 1)
+
+    if configurable.llm_provider == "openai":
+        content = await aopenai_chat_completion(
+            configurable, messages, response_format={"type": "json_object"}
+        ) or "{}"
+        return query_from_json(configurable, content, json_query_field, fallback)
+
+    if configurable.use_tool_calling:
+        llm = get_llm(configurable).bind_tools([tool_class])
+        result = await ainvoke_chat_model(
+            configurable, llm, messages, response_format={"tools": [tool_class.name]}
+        )
+        return query_from_tool_calls(configurable, result, tool_query_field, fallback)
+
+    llm = get_llm(configurable)
+    result = await ainvoke_chat_model(
+        configurable, llm, messages, response_format={"format": "json"}
+    )
+    return query_from_json(configurable, result.content, json_query_field, fallback)
+
+def query_format_instructions(configurable: Configuration, tool_instructions: str, json_instructions: str) -> str:
+    """Return the output format instructions, asking for extra queries when fanning out."""
+    instructions = tool_instructions if configurable.use_tool_calling else json_instructions
+    if configurable.queries_per_loop > 1:
+        instructions += multi_query_instructions.format(
+            number_of_queries=configurable.queries_per_loop - 1
+        )
+    return instructions
+
+def get_fetch_options(configurable: Configuration) -> dict:
+    """Build the full-page fetch limits passed to the search utilities."""
+    return {
+        "max_concurrency": configurable.fetch_max_concurrency,
+        "per_host_limit": configurable.fetch_per_host_limit,
+        "deadline": configurable.fetch_deadline,
+        "max_bytes": configurable.fetch_max_bytes,
+        "use_page_cache": configurable.page_cache,
+        "cache_dir": configurable.cache_dir,
+    }
+
+def get_cache_options(configurable: Configuration) -> dict:
+    """Build the search cache options passed to the search utilities."""
+    return {
+        "use_cache": configurable.search_cache,
+        "cache_dir": configurable.cache_dir,
+    }
+
+def get_search_options(configurable: Configuration, research_loop_count: int) -> SearchOptions:
+    """Build the per-call options passed to the search backend."""
+    return SearchOptions(
+        fetch_full_page=configurable.fetch_full_page,
+        fetch_options=get_fetch_options(configurable),
+        research_loop_count=research_loop_count,
+        **get_cache_options(configurable),
+    )
 
 def get_llm(configurable: Configuration):
     """Helper function to initialize LLM based on configuration.
@@ -142,40 +450,33 @@ def get_llm(configurable: Configuration):
     """
     if configurable.llm_provider == "openai":
         # Not used for generation in our OpenAI path; keep for compatibility elsewhere
-        return ChatOpenAI(
-            base_url=configurable.openai_base_url,
+        return get_chat_model(
+            "openai",
             model=configurable.local_llm,
+            base_url=configurable.openai_base_url,
             temperature=0,
         )
     else:  # Default to Ollama
         if configurable.use_tool_calling:
-            return ChatOllama(
-                base_url=configurable.ollama_base_url,
+            return get_chat_model(
+                "ollama",
                 model=configurable.local_llm,
+                base_url=configurable.ollama_base_url,
                 temperature=0,
+                num_ctx=get_context_window(configurable),
             )
         else:
-            return ChatOllama(
-                base_url=configurable.ollama_base_url,
+            return get_chat_model(
+                "ollama",
                 model=configurable.local_llm,
+                base_url=configurable.ollama_base_url,
                 temperature=0,
                 format="json",
+                num_ctx=get_context_window(configurable),
             )
 
-# Nodes
-def generate_query(state: SummaryState, config: RunnableConfig):
-    """LangGraph node that generates a search query based on the research topic.
-
-    Uses an LLM to create an optimized search query for web research based on
-    the user's research topic. Supports both OpenAI and Ollama as LLM providers.
-
-    Args:
-        state: Current graph state containing the research topic
-        config: Configuration for the runnable, including LLM provider settings
-
-    Returns:
-        Dictionary with state update, including search_query key containing the generated query
-    """
+def query_request(state: SummaryState, configurable: Configuration) -> dict:
+    """Build the structured output request used by generate_query and agenerate_query."""
 
     # Format the prompt
     current_date = get_current_date()
@@ -183,9 +484,6 @@ def generate_query(state: SummaryState, config: RunnableConfig):
         current_date=current_date, research_topic=state.research_topic
     )
 
-    # Generate a query
-    configurable = Configuration.from_runnable_config(config)
-
     @tool
     class Query(BaseModel):
         """
@@ -196,98 +494,254 @@ def generate_query(state: SummaryState, config: RunnableConfig):
         rationale: str = Field(
             description="Brief explanation of why this query is relevant"
         )
+        additional_queries: List[str] = Field(
+            default_factory=list,
+            description="More search queries covering other aspects of the topic",
+        )
 
     messages = [
         SystemMessage(
-            content=formatted_prompt + (
-                tool_calling_query_instructions if configurable.use_tool_calling 
-                else json_mode_query_instructions
+            content=formatted_prompt + query_format_instructions(
+                configurable, tool_calling_query_instructions, json_mode_query_instructions
             )
         ),
         HumanMessage(content="Generate a query for web search:"),
     ]
 
-    return generate_search_query_with_structured_output(
-        configurable=configurable,
-        messages=messages,
-        tool_class=Query,
-        fallback_query=f"Tell me more about {state.research_topic}",
-        tool_query_field="query",
-        json_query_field="query",
+    return {
+        "configurable": configurable,
+        "messages": messages,
+        "tool_class": Query,
+        "fallback_query": f"Tell me more about {state.research_topic}",
+        "tool_query_field": "query",
+        "json_query_field": "query",
+    }
+
+def get_configured_token_counter(configurable: Configuration) -> TokenCounter:
+    """Return the token counter for the configured model."""
+    return get_token_counter(configurable.llm_provider, configurable.local_llm, configurable.token_counter)
+
+def get_context_window(configurable: Configuration) -> int:
+    """Return the context window of the configured model in tokens."""
+    return context_window_for(configurable.llm_provider, configurable.local_llm, configurable.context_window)
+
+def source_token_budget(configurable: Configuration, search_results: dict) -> int:
+    """Return the full-page token budget for each source of one search.
+
+    The context window left after SUMMARY_TOKEN_RESERVE is shared by all sources
+    of all queries of the loop, capped at max_tokens_per_source so large windows
+    do not turn into large (slow and costly) prompts. A max_tokens_per_source of
+    0 removes the cap and uses the whole window-derived share.
+    """
+    sources = len({result["url"] for result in search_results.get("results", [])})
+    shares = max(1, configurable.queries_per_loop * sources)
+    budget = max(MIN_TOKENS_PER_SOURCE, (get_context_window(configurable) - SUMMARY_TOKEN_RESERVE) // shares)
+    if configurable.max_tokens_per_source > 0:
+        return min(configurable.max_tokens_per_source, budget)
+    return budget
+
+def web_research_update(
+    configurable: Configuration,
+    search_results: dict,
+    research_loop_count: int,
+    capabilities: SearchCapabilities,
+) -> dict:
+    """Format one worker's search results into the web_research state update.
+
+    Full page content is only included for backends that return it. The result is
+    tagged with its research loop; the state reducer keeps only the latest loop's
+    results (see state.latest_loop_results).
+    """
+    search_str = deduplicate_and_format_sources(
+        search_results,
+        max_tokens_per_source=source_token_budget(configurable, search_results),
+        fetch_full_page=configurable.fetch_full_page and capabilities.raw_content,
+        token_counter=get_configured_token_counter(configurable),
+    )
+    return {
+        "sources_gathered": [format_sources(search_results)],
+        "web_research_results": [{"loop": research_loop_count, "content": search_str}],
+    }
+
+def summary_human_message(state: SummaryState, research: str) -> str:
+    """Build the summarizer's human message around the packed research."""
+    if state.running_summary:
+        return (
+            f"<Existing Summary> \n {state.running_summary} \n <Existing Summary>\n\n"
+            f"<New Context> \n {research} \n <New Context>"
+            f"Update the Existing Summary with the New Context on this topic: \n <User Input> \n {state.research_topic} \n <User Input>\n\n"
+        )
+    return (
+        f"<Context> \n {research} \n <Context>"
+        f"Create a Summary using the Context on this topic: \n <User Input> \n {state.research_topic} \n <User Input>\n\n"
     )
 
+def summary_messages(state: SummaryState, configurable: Configuration) -> list:
+    """Build the summarizer messages from the running summary and this loop's research.
+
+    The prompt is packed into the model's context window minus response_token_reserve:
+    sources are ranked by relevance to the topic and this loop's queries, and the
+    least relevant ones are truncated or dropped. Dropped tokens are reported.
+    """
+
+    # The state only holds this loop's web research: one result per query searched
+    # (already cleaned once per document by the search functions)
+    sources = list(dict.fromkeys(
+        source
+        for result in state.web_research_results
+        for source in split_formatted_sources(result["content"])
+    ))
+
+    # Whatever the instructions, running summary and topic leave of the window goes to sources
+    token_counter = get_configured_token_counter(configurable)
+    context_window = get_context_window(configurable)
+    prompt_tokens = token_counter.count(summarizer_instructions + summary_human_message(state, "Sources:"))
+    budget = context_window - configurable.response_token_reserve - prompt_tokens
+    packed = pack_sources(
+        sources, " ".join([state.research_topic, *state.search_queries]), budget, token_counter
+    )
+    # pack_sources already counts the dropped tokens in the context.* metrics
+    if packed.dropped_tokens:
+        logger.debug(
+            "Context packing: dropped %d tokens (%d sources dropped, %d truncated) to fit the %d-token context window",
+            packed.dropped_tokens, packed.dropped_sources, packed.truncated_sources, context_window,
+        )
+    research = "Sources:\n\n" + "\n\n".join(packed.sources)
+
+    # For summarization, we don't need structured output, so always use regular mode
+    return [
+        SystemMessage(content=summarizer_instructions),
+        HumanMessage(content=summary_human_message(state, research)),
+    ]
+
+def summary_update(state: SummaryState, configurable: Configuration, running_summary: str) -> dict:
+    """Build the summarize_sources state update from the model's summary."""
+
+    # Strip thinking tokens if configured
+    if configurable.strip_thinking_tokens:
+        running_summary = strip_thinking_tokens(running_summary)
+
+    # The loop counter lives here rather than in web_research so parallel
+    # search workers do not write it concurrently
+    return {
+        "running_summary": running_summary,
+        "research_loop_count": state.research_loop_count + 1,
+    }
+
+def get_summary_llm(configurable: Configuration):
+    """Return the plain (non-JSON) Ollama chat model used for summarization."""
+    return get_chat_model(
+        "ollama",
+        model=configurable.local_llm,
+        base_url=configurable.ollama_base_url,
+        temperature=0,
+        num_ctx=get_context_window(configurable),
+    )
+
+def reflection_request(state: SummaryState, configurable: Configuration) -> dict:
+    """Build the structured output request used by reflect_on_summary and areflect_on_summary."""
+    formatted_prompt = reflection_instructions.format(
+        research_topic=state.research_topic
+    )
+
+    @tool
+    class FollowUpQuery(BaseModel):
+        """
+        This tool is used to generate a follow-up query to address a knowledge gap.
+        """
+
+        follow_up_query: str = Field(
+            description="Write a specific question to address this gap"
+        )
+        knowledge_gap: str = Field(
+            description="Describe what information is missing or needs clarification"
+        )
+        additional_queries: List[str] = Field(
+            default_factory=list,
+            description="More questions addressing other knowledge gaps",
+        )
+
+    messages = [
+        SystemMessage(
+            content=formatted_prompt + query_format_instructions(
+                configurable, tool_calling_reflection_instructions, json_mode_reflection_instructions
+            )
+        ),
+        HumanMessage(
+            content=f"Reflect on our existing knowledge: \n === \n {state.running_summary}, \n === \n And now identify a knowledge gap and generate a follow-up web search query:"
+        ),
+    ]
+
+    return {
+        "configurable": configurable,
+        "messages": messages,
+        "tool_class": FollowUpQuery,
+        "fallback_query": f"Tell me more about {state.research_topic}",
+        "tool_query_field": "follow_up_query",
+        "json_query_field": "follow_up_query",
+    }
+
+# Nodes
+# Each LLM or search node has an async twin (prefixed with "a") so the compiled
+# graph runs natively under both graph.invoke and graph.ainvoke.
+def generate_query(state: SummaryState, config: RunnableConfig):
+    """LangGraph node that generates a search query based on the research topic.
+
+    Uses an LLM to create an optimized search query for web research based on
+    the user's research topic. Supports both OpenAI and Ollama as LLM providers.
+
+    Args:
+        state: Current graph state containing the research topic
+        config: Configuration for the runnable, including LLM provider settings
+
+    Returns:
+        Dictionary with state update, including search_query key containing the generated query
+        and search_queries with every query to run in parallel this loop
+    """
+    configurable = Configuration.from_runnable_config(config)
+    return generate_search_query_with_structured_output(**query_request(state, configurable))
+
+
+async def agenerate_query(state: SummaryState, config: RunnableConfig):
+    """Async variant of generate_query."""
+    configurable = Configuration.from_runnable_config(config)
+    return await agenerate_search_query_with_structured_output(**query_request(state, configurable))
+
 
 def web_research(state: SummaryState, config: RunnableConfig):
     """LangGraph node that performs web research using the generated search query.
 
-    Executes a web search using the configured search API (tavily, perplexity,
-    duckduckgo, or searxng) and formats the results for further processing.
+    Executes a web search with the backend selected by ``search_api`` (see
+    search_backends.py) and formats the results for further processing.
+    One worker runs per query of the loop (see continue_to_web_research); their
+    results are merged by the state reducers.
 
     Args:
-        state: Current graph state containing the search query and research loop count
+        state: Graph state for this worker, containing its search query and the research loop count
         config: Configuration for the runnable, including search API settings
 
     Returns:
-        Dictionary with state update, including sources_gathered, research_loop_count, and web_research_results
+        Dictionary with state update, including sources_gathered and web_research_results
     """
 
     # Configure
     configurable = Configuration.from_runnable_config(config)
 
-    # Get the search API
-    search_api = get_config_value(configurable.search_api)
-
     # Search the web
-    if search_api == "tavily":
-        search_results = tavily_search(
-            state.search_query,
-            fetch_full_page=configurable.fetch_full_page,
-            max_results=1,
-        )
-        search_str = deduplicate_and_format_sources(
-            search_results,
-            max_tokens_per_source=MAX_TOKENS_PER_SOURCE,
-            fetch_full_page=configurable.fetch_full_page,
-        )
-    elif search_api == "perplexity":
-        search_results = perplexity_search(
-            state.search_query, state.research_loop_count
-        )
-        search_str = deduplicate_and_format_sources(
-            search_results,
-            max_tokens_per_source=MAX_TOKENS_PER_SOURCE,
-            fetch_full_page=configurable.fetch_full_page,
-        )
-    elif search_api == "duckduckgo":
-        search_results = duckduckgo_search(
-            state.search_query,
-            max_results=3,
-            fetch_full_page=configurable.fetch_full_page,
-        )
-        search_str = deduplicate_and_format_sources(
-            search_results,
-            max_tokens_per_source=MAX_TOKENS_PER_SOURCE,
-            fetch_full_page=configurable.fetch_full_page,
-        )
-    elif search_api == "searxng":
-        search_results = searxng_search(
-            state.search_query,
-            max_results=3,
-            fetch_full_page=configurable.fetch_full_page,
-        )
-        search_str = deduplicate_and_format_sources(
-            search_results,
-            max_tokens_per_source=MAX_TOKENS_PER_SOURCE,
-            fetch_full_page=configurable.fetch_full_page,
-        )
-    else:
-        raise ValueError(f"Unsupported search API: {configurable.search_api}")
+    backend = get_search_backend(get_config_value(configurable.search_api))
+    search_results = backend.search(state.search_query, get_search_options(configurable, state.research_loop_count))
 
-    return {
-        "sources_gathered": [format_sources(search_results)],
-        "research_loop_count": state.research_loop_count + 1,
-        "web_research_results": [search_str],
-    }
+    return web_research_update(configurable, search_results, state.research_loop_count, backend.capabilities)
+
+
+async def aweb_research(state: SummaryState, config: RunnableConfig):
+    """Async variant of web_research using the backend's async search."""
+    configurable = Configuration.from_runnable_config(config)
+    backend = get_search_backend(get_config_value(configurable.search_api))
+    search_results = await backend.asearch(
+        state.search_query, get_search_options(configurable, state.research_loop_count)
+    )
+    return web_research_update(configurable, search_results, state.research_loop_count, backend.capabilities)
 
 
 def summarize_sources(state: SummaryState, config: RunnableConfig):
@@ -303,76 +757,23 @@ def summarize_sources(state: SummaryState, config: RunnableConfig):
 
     Returns:
         Dictionary with state update, including running_summary key containing the updated summary
+        and the incremented research_loop_count
     """
-
-    # Existing summary
-    existing_summary = state.running_summary
-
-    # Most recent web research
-    most_recent_web_research = state.web_research_results[-1]
-    
-    # Clean HTML content from web research
-    most_recent_web_research = clean_html_content(most_recent_web_research)
-
-    # Build the human message
-    if existing_summary:
-        human_message_content = (
-            f"<Existing Summary> \n {existing_summary} \n <Existing Summary>\n\n"
-            f"<New Context> \n {most_recent_web_research} \n <New Context>"
-            f"Update the Existing Summary with the New Context on this topic: \n <User Input> \n {state.research_topic} \n <User Input>\n\n"
-        )
-    else:
-        human_message_content = (
-            f"<Context> \n {most_recent_web_research} \n <Context>"
-            f"Create a Summary using the Context on this topic: \n <User Input> \n {state.research_topic} \n <User Input>\n\n"
-        )
-
-    # Run the LLM
     configurable = Configuration.from_runnable_config(config)
+    messages = summary_messages(state, configurable)
 
-    # For summarization, we don't need structured output, so always use regular mode
-    if configurable.llm_provider == "openai":
-        client = OpenAI(base_url=configurable.openai_base_url)
-        completion = client.chat.completions.create(
-            model=configurable.local_llm,
-            messages=[
-                {"role": "system", "content": summarizer_instructions},
-                {"role": "user", "content": human_message_content},
-            ],
-            temperature=0,
-        )
-        # Handle different response formats
-        if hasattr(completion, 'choices') and completion.choices:
-            result_content = completion.choices[0].message.content or ""
-        elif isinstance(completion, str):
-            result_content = completion
-        else:
-            print(f"Warning: Unexpected completion format: {type(completion)}")
-            result_content = ""
-        running_summary = result_content
-        if configurable.strip_thinking_tokens:
-            running_summary = strip_thinking_tokens(running_summary)
-        return {"running_summary": running_summary}
-    else:  # Default to Ollama
-        llm = ChatOllama(
-            base_url=configurable.ollama_base_url,
-            model=configurable.local_llm,
-            temperature=0,
-        )
+    # Run the LLM, streaming tokens to the "custom" stream mode
+    running_summary = stream_chat_completion(configurable, messages, "summarize_sources")
 
-    result = llm.invoke(
-        [
-            SystemMessage(content=summarizer_instructions),
-            HumanMessage(content=human_message_content),
-        ]
-    )
+    return summary_update(state, configurable, running_summary)
 
-    # Strip thinking tokens if configured
-    running_summary = result.content
-    if configurable.strip_thinking_tokens:
-        running_summary = strip_thinking_tokens(running_summary)
 
-    return {"running_summary": running_summary}
+async def asummarize_sources(state: SummaryState, config: RunnableConfig):
+    """Async variant of summarize_sources."""
+    configurable = Configuration.from_runnable_config(config)
+    messages = summary_messages(state, configurable)
+    running_summary = await astream_chat_completion(configurable, messages, "summarize_sources")
+    return summary_update(state, configurable, running_summary)
 
 
 def reflect_on_summary(state: SummaryState, config: RunnableConfig):
@@ -388,47 +789,16 @@ def reflect_on_summary(state: SummaryState, config: RunnableConfig):
 
     Returns:
         Dictionary with state update, including search_query key containing the generated follow-up query
+        and search_queries with every query to run in parallel next loop
     """
-
-    # Generate a query
     configurable = Configuration.from_runnable_config(config)
-    formatted_prompt = reflection_instructions.format(
-        research_topic=state.research_topic
-    )
+    return generate_search_query_with_structured_output(**reflection_request(state, configurable))
 
-    @tool
-    class FollowUpQuery(BaseModel):
-        """
-        This tool is used to generate a follow-up query to address a knowledge gap.
-        """
 
-        follow_up_query: str = Field(
-            description="Write a specific question to address this gap"
-        )
-        knowledge_gap: str = Field(
-            description="Describe what information is missing or needs clarification"
-        )
-
-    messages = [
-        SystemMessage(
-            content=formatted_prompt + (
-                tool_calling_reflection_instructions if configurable.use_tool_calling 
-                else json_mode_reflection_instructions
-            )
-        ),
-        HumanMessage(
-            content=f"Reflect on our existing knowledge: \n === \n {state.running_summary}, \n === \n And now identify a knowledge gap and generate a follow-up web search query:"
-        ),
-    ]
-
-    return generate_search_query_with_structured_output(
-        configurable=configurable,
-        messages=messages,
-        tool_class=FollowUpQuery,
-        fallback_query=f"Tell me more about {state.research_topic}",
-        tool_query_field="follow_up_query",
-        json_query_field="follow_up_query",
-    )
+async def areflect_on_summary(state: SummaryState, config: RunnableConfig):
+    """Async variant of reflect_on_summary."""
+    configurable = Configuration.from_runnable_config(config)
+    return await agenerate_search_query_with_structured_output(**reflection_request(state, configurable))
 
 
 def finalize_summary(state: SummaryState):
@@ -465,9 +835,33 @@ def finalize_summary(state: SummaryState):
     return {"running_summary": state.running_summary}
 
 
+def continue_to_web_research(state: SummaryState) -> List[Send]:
+    """LangGraph routing function that fans the loop's queries out to parallel web_research workers.
+
+    Args:
+        state: Current graph state containing the search queries for this loop
+
+    Returns:
+        One Send to "web_research" per search query
+    """
+    search_queries = state.search_queries or [state.search_query]
+    return [
+        Send(
+            "web_research",
+            SummaryState(
+                research_topic=state.research_topic,
+                search_query=search_query,
+                search_queries=search_queries,
+                research_loop_count=state.research_loop_count,
+            ),
+        )
+        for search_query in search_queries
+    ]
+
+
 def route_research(
     state: SummaryState, config: RunnableConfig
-) -> Literal["finalize_summary", "web_research"]:
+) -> Union[Literal["finalize_summary"], List[Send]]:
     """LangGraph routing function that determines the next step in the research flow.
 
     Controls the research loop by deciding whether to continue gathering information
@@ -478,12 +872,12 @@ def route_research(
         config: Configuration for the runnable, including max_web_research_loops setting
 
     Returns:
-        String literal indicating the next node to visit ("web_research" or "finalize_summary")
+        Sends to the parallel "web_research" workers, or "finalize_summary"
     """
 
     configurable = Configuration.from_runnable_config(config)
     if state.research_loop_count <= configurable.max_web_research_loops:
-        return "web_research"
+        return continue_to_web_research(state)
     else:
         return "finalize_summary"
 
@@ -495,18 +889,52 @@ builder = StateGraph(
     output=SummaryStateOutput,
     config_schema=Configuration,
 )
-builder.add_node("generate_query", generate_query)
-builder.add_node("web_research", web_research)
-builder.add_node("summarize_sources", summarize_sources)
-builder.add_node("reflect_on_summary", reflect_on_summary)
+builder.add_node(
+    "generate_query",
+    RunnableLambda(generate_query, afunc=agenerate_query, name="generate_query"),
+)
+builder.add_node(
+    "web_research",
+    RunnableLambda(web_research, afunc=aweb_research, name="web_research"),
+)
+builder.add_node(
+    "summarize_sources",
+    RunnableLambda(summarize_sources, afunc=asummarize_sources, name="summarize_sources"),
+)
+builder.add_node(
+    "reflect_on_summary",
+    RunnableLambda(reflect_on_summary, afunc=areflect_on_summary, name="reflect_on_summary"),
+)
 builder.add_node("finalize_summary", finalize_summary)
 
 # Add edges
 builder.add_edge(START, "generate_query")
-builder.add_edge("generate_query", "web_research")
+builder.add_conditional_edges("generate_query", continue_to_web_research, ["web_research"])
 builder.add_edge("web_research", "summarize_sources")
 builder.add_edge("summarize_sources", "reflect_on_summary")
-builder.add_conditional_edges("reflect_on_summary", route_research)
+builder.add_conditional_edges(
+    "reflect_on_summary", route_research, ["web_research", "finalize_summary"]
+)
 builder.add_edge("finalize_summary", END)
 
-graph = builder.compile()
+def build_graph(checkpointer=None):
+    """Compile the research graph, optionally with a checkpointer (see checkpointing.py).
+
+    Runs of a checkpointed graph are keyed by the ``thread_id`` in the config and
+    can be resumed from their last completed node by invoking with ``None`` input.
+    """
+    return builder.compile(checkpointer=checkpointer)
+
+
+@functools.cache
+def get_graph():
+    """Return the shared research graph without a checkpointer, compiled on first use."""
+    return build_graph()
+
+
+def __getattr__(name: str):
+    # ``graph`` (the entry point used by LangGraph Studio) is compiled on first access,
+    # so importing this module for its helpers does not pay for compilation
+    if name == "graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
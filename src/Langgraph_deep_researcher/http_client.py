@@ -0,0 +1,118 @@
+"""
+共享 HTTP 连接池 - Shared HTTP Clients
+进程级复用的 httpx 客户端（同步与异步），避免每个请求重新建立 TCP/TLS 连接
+"""
+
+import asyncio
+import atexit
+import importlib.util
+import os
+import threading
+import weakref
+from typing import Optional
+
+import httpx
+
+_lock = threading.Lock()
+_sync_client: Optional[httpx.Client] = None
+# AsyncClient connections are bound to the event loop that opened them,
+# so keep one async client per loop.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+_background_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _http2_available() -> bool:
+    """Return True if HTTP/2 is enabled and the optional h2 package is installed."""
+    if os.environ.get("HTTP2", "true").lower() != "true":
+        return False
+    return importlib.util.find_spec("h2") is not None
+
+
+def _client_options() -> dict:
+    """Build the shared client options from environment variables."""
+    limits = httpx.Limits(
+        max_connections=int(os.environ.get("HTTP_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.environ.get("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")),
+        keepalive_expiry=float(os.environ.get("HTTP_KEEPALIVE_EXPIRY", "30")),
+    )
+    return {
+        "timeout": float(os.environ.get("HTTP_TIMEOUT", "10")),
+        "limits": limits,
+        "http2": _http2_available(),
+        "headers": {"User-Agent": os.environ.get("HTTP_USER_AGENT", "Langgraph-deep-researcher/1.0")},
+    }
+
+
+def get_http_client() -> httpx.Client:
+    """Return the process-wide pooled synchronous client, creating it on first use."""
+    global _sync_client
+    with _lock:
+        if _sync_client is None or _sync_client.is_closed:
+            _sync_client = httpx.Client(**_client_options())
+        return _sync_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Return the pooled async client for the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(**_client_options())
+            _async_clients[loop] = client
+        return client
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    """Return a long-lived event loop running in a daemon thread."""
+    global _background_loop
+    with _lock:
+        if _background_loop is None or _background_loop.is_closed():
+            _background_loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_background_loop.run_forever,
+                name="http-client-loop",
+                daemon=True,
+            ).start()
+        return _background_loop
+
+
+def run_in_background_loop(coro):
+    """
+    Run a coroutine on the shared background loop and block until it finishes.
+
+    Sync callers go through one long-lived loop so that the async client and
+    its keep-alive connections are reused across calls, instead of being torn
+    down with a fresh loop every time.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_background_loop()).result()
+
+
+async def aclose_http_clients() -> None:
+    """Close the async client bound to the running loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_clients.pop(loop, None)
+    if client is not None:
+        await client.aclose()
+
+
+def close_http_clients() -> None:
+    """Close the sync client and the background loop's async client.
+
+    Safe to call more than once; clients are recreated on next use.
+    """
+    global _sync_client, _background_loop
+    with _lock:
+        sync_client, _sync_client = _sync_client, None
+        background_loop, _background_loop = _background_loop, None
+    if sync_client is not None:
+        sync_client.close()
+    if background_loop is not None and background_loop.is_running():
+        asyncio.run_coroutine_threadsafe(aclose_http_clients(), background_loop).result()
+        background_loop.call_soon_threadsafe(background_loop.stop)
+
+
+atexit.register(close_http_clients)
@@ -0,0 +1,36 @@
+"""
+进程内运行指标 - Runtime Metrics
+轻量级计数器，用于统计抓取、缓存等环节的行为，CLI 在结束时打印汇总
+"""
+
+import threading
+from typing import Dict
+
+_lock = threading.Lock()
+_counters: Dict[str, float] = {}
+
+
+def increment(name: str, value: float = 1) -> None:
+    """Increase the counter ``name`` by ``value`` (thread-safe)."""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def get_metrics(prefix: str = "") -> Dict[str, float]:
+    """Return a snapshot of all counters whose name starts with ``prefix``."""
+    with _lock:
+        return {k: v for k, v in _counters.items() if k.startswith(prefix)}
+
+
+def reset_metrics() -> None:
+    """Clear all counters."""
+    with _lock:
+        _counters.clear()
+
+
+def format_metrics(prefix: str = "") -> str:
+    """Format the current counters as ``name=value`` lines sorted by name."""
+    snapshot = get_metrics(prefix)
+    return "\n".join(
+        f"{name}={value:g}" for name, value in sorted(snapshot.items())
+    )
@@ -0,0 +1,171 @@
+"""
+提示词打包 - Context Packing
+按模型上下文窗口为提示词分配 token：预留输出空间后，按与研究主题的相关性（BM25）
+对来源排序，依次放入完整来源，放不下的来源截断或丢弃，并统计被丢弃的 token 数。
+"""
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from Langgraph_deep_researcher import metrics
+from Langgraph_deep_researcher.tokens import TokenCounter
+
+DEFAULT_CONTEXT_WINDOW = 8192
+# Largest window chosen automatically for Ollama, where the window is allocated
+# locally as num_ctx; set CONTEXT_WINDOW explicitly to go beyond it
+OLLAMA_MAX_AUTO_CONTEXT_WINDOW = 32768
+# Context windows by model name prefix; the first matching prefix wins
+MODEL_CONTEXT_WINDOWS: Tuple[Tuple[str, int], ...] = (
+    ("gpt-4.1", 1047576),
+    ("gpt-4o", 128000),
+    ("gpt-4-turbo", 128000),
+    ("gpt-4", 8192),
+    ("gpt-3.5-turbo", 16385),
+    ("o1", 200000),
+    ("o3", 200000),
+    ("o4", 200000),
+    ("deepseek", 65536),
+    ("llama3.1", 131072),
+    ("llama3.2", 131072),
+    ("llama3.3", 131072),
+    ("llama3", 8192),
+    ("qwen3", 40960),
+    ("qwen2.5", 32768),
+    ("qwen", 32768),
+    ("mistral", 32768),
+    ("gemma3", 131072),
+    ("gemma", 8192),
+    ("phi3", 4096),
+)
+# A source is only truncated into the remaining budget if at least this many tokens fit
+MIN_PARTIAL_SOURCE_TOKENS = 100
+
+_TERM_PATTERN = re.compile("[a-z0-9]+|[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]+")
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+
+def context_window_for(provider: str, model: str, configured: int = 0) -> int:
+    """
+    Return the context window in tokens for a model.
+
+    Args:
+        provider: LLM provider ("openai" or "ollama")
+        model: Model name; matched against MODEL_CONTEXT_WINDOWS by prefix
+        configured: Explicit window from the configuration; 0 looks the model up
+
+    Returns:
+        int: The context window, DEFAULT_CONTEXT_WINDOW for unknown models
+    """
+    if configured > 0:
+        return configured
+    name = model.lower().rsplit("/", 1)[-1]
+    window = next(
+        (tokens for prefix, tokens in MODEL_CONTEXT_WINDOWS if name.startswith(prefix)),
+        DEFAULT_CONTEXT_WINDOW,
+    )
+    if provider == "ollama":
+        window = min(window, OLLAMA_MAX_AUTO_CONTEXT_WINDOW)
+    return window
+
+
+def _terms(text: str) -> List[str]:
+    """Lowercased words for Latin text, character bigrams for CJK runs."""
+    terms = []
+    for match in _TERM_PATTERN.finditer(text.lower()):
+        term = match.group()
+        if term[0].isascii() or len(term) == 1:
+            terms.append(term)
+        else:
+            terms.extend(term[i:i + 2] for i in range(len(term) - 1))
+    return terms
+
+
+def relevance_scores(query: str, documents: List[str]) -> List[float]:
+    """
+    Score documents against a query with BM25, using the documents themselves as the corpus.
+
+    Args:
+        query: Text describing what is relevant, e.g. the research topic and queries
+        documents: Documents to score
+
+    Returns:
+        List[float]: One score per document, higher is more relevant
+    """
+    query_terms = set(_terms(query))
+    term_counts = [Counter(_terms(document)) for document in documents]
+    if not query_terms or not term_counts:
+        return [0.0] * len(documents)
+
+    average_length = sum(sum(counts.values()) for counts in term_counts) / len(term_counts) or 1.0
+    document_frequency = Counter(term for counts in term_counts for term in query_terms & counts.keys())
+    scores = []
+    for counts in term_counts:
+        length_norm = _BM25_K1 * (1 - _BM25_B + _BM25_B * sum(counts.values()) / average_length)
+        score = 0.0
+        for term in query_terms & counts.keys():
+            idf = math.log(1 + (len(documents) - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+            score += idf * counts[term] * (_BM25_K1 + 1) / (counts[term] + length_norm)
+        scores.append(score)
+    return scores
+
+
+@dataclass
+class PackedContext:
+    """Sources selected to fit a token budget, with what had to be left out."""
+    sources: List[str]
+    used_tokens: int
+    dropped_tokens: int
+    dropped_sources: int
+    truncated_sources: int
+
+
+def pack_sources(
+    sources: List[str], query: str, budget: int, token_counter: TokenCounter
+) -> PackedContext:
+    """
+    Fit sources into a token budget, most relevant first.
+
+    Sources are ranked by relevance to ``query`` and added whole while they fit.
+    A source that does not fit is truncated into the remaining budget if at least
+    MIN_PARTIAL_SOURCE_TOKENS remain, and dropped otherwise.
+
+    Args:
+        sources: Formatted source blocks
+        query: Text the sources are ranked against
+        budget: Token budget for all sources together
+        token_counter: Counter used to measure and truncate the sources
+
+    Returns:
+        PackedContext: The kept sources in ranked order and the dropped token counts
+    """
+    scores = relevance_scores(query, sources)
+    ranked = sorted(range(len(sources)), key=lambda index: -scores[index])
+
+    packed = PackedContext(sources=[], used_tokens=0, dropped_tokens=0, dropped_sources=0, truncated_sources=0)
+    remaining = max(0, budget)
+    for index in ranked:
+        source = sources[index]
+        tokens = token_counter.count(source)
+        if tokens <= remaining:
+            packed.sources.append(source)
+            remaining -= tokens
+            packed.used_tokens += tokens
+        elif remaining >= MIN_PARTIAL_SOURCE_TOKENS:
+            packed.sources.append(token_counter.truncate(source, remaining) + "... [truncated]")
+            packed.truncated_sources += 1
+            packed.used_tokens += remaining
+            packed.dropped_tokens += tokens - remaining
+            remaining = 0
+        else:
+            packed.dropped_sources += 1
+            packed.dropped_tokens += tokens
+
+    metrics.increment("context.packed_tokens", packed.used_tokens)
+    metrics.increment("context.dropped_tokens", packed.dropped_tokens)
+    metrics.increment("context.dropped_sources", packed.dropped_sources)
+    metrics.increment("context.truncated_sources", packed.truncated_sources)
+    return packed
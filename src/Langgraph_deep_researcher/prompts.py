@@ -118,4 +118,10 @@ Call the FollowUpQuery tool to format your response with the following keys:
 Reflect carefully on the Summary to identify knowledge gaps and produce a follow-up query.
 </Task>
 
-Call the FollowUpQuery Tool to generate a reflection for this request:"""
\ No newline at end of file
+Call the FollowUpQuery Tool to generate a reflection for this request:"""
+multi_query_instructions = """
+<ADDITIONAL QUERIES>
+Also provide "additional_queries": a list of {number_of_queries} more search queries.
+Each additional query must cover a different aspect of the topic than the main query and than each other,
+and must be self-contained for web search.
+</ADDITIONAL QUERIES>"""
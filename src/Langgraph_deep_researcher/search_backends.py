@@ -0,0 +1,263 @@
+"""
+搜索后端注册表 - Search Backends
+web_research 节点通过统一的 SearchBackend 接口调用搜索：每个后端提供同步与异步搜索方法，
+并声明自己的能力（是否返回全文、每次查询的结果数、请求速率上限）。
+后端按 Configuration.search_api 从注册表中选择，内置 DuckDuckGo、Tavily、Perplexity 与 SearXNG；
+本地离线索引或压测用的模拟后端可以通过 register_search_backend 注册，
+或以 "package.module:factory" 的形式直接写在 SEARCH_API 中，无需修改图代码。
+"""
+
+import asyncio
+import functools
+import importlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from typing_extensions import Protocol, runtime_checkable
+
+from Langgraph_deep_researcher import metrics
+from Langgraph_deep_researcher.utils import (
+    aduckduckgo_search,
+    aperplexity_search,
+    asearxng_search,
+    atavily_search,
+    duckduckgo_search,
+    perplexity_search,
+    searxng_search,
+    tavily_search,
+)
+
+
+@dataclass(frozen=True)
+class SearchCapabilities:
+    """What a search backend can do, used by the graph to build requests."""
+    # Results carry the full page text in raw_content when fetch_full_page is set
+    raw_content: bool
+    # Results requested per query; None when the API decides
+    max_results: Optional[int]
+    # Client-side request rate limit; 0 for none. SEARCH_RATE_LIMIT_<NAME> overrides it
+    requests_per_second: float = 0.0
+
+
+@dataclass
+class SearchOptions:
+    """Per-call settings passed to a search backend."""
+    fetch_full_page: bool = False
+    # Concurrency limits and deadline for full page fetches, see utils.afetch_raw_contents
+    fetch_options: Optional[Dict[str, Any]] = None
+    research_loop_count: int = 0
+    use_cache: bool = False
+    cache_dir: Optional[str] = None
+
+
+@runtime_checkable
+class SearchBackend(Protocol):
+    """
+    A web search backend.
+
+    Both methods return ``{"results": [...]}``, each result a dict with ``title``,
+    ``url``, ``content`` and ``raw_content`` keys. Backends enforce their own
+    declared rate limit, e.g. with a RateLimiter.
+    """
+
+    name: str
+    capabilities: SearchCapabilities
+
+    def search(self, query: str, options: SearchOptions) -> Dict[str, Any]:
+        """Run a blocking search for ``query``."""
+        ...
+
+    async def asearch(self, query: str, options: SearchOptions) -> Dict[str, Any]:
+        """Run a search for ``query`` on the running event loop."""
+        ...
+
+
+class RateLimiter:
+    """Space requests at least 1/requests_per_second apart, across threads and event loops."""
+
+    def __init__(self, requests_per_second: float):
+        """
+        Create a rate limiter.
+
+        Args:
+            requests_per_second: Maximum request rate; 0 or less disables limiting
+        """
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Reserve the next free slot and return how long to wait for it."""
+        if not self.interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            metrics.increment("search.rate_limited")
+        return delay
+
+    def acquire(self) -> None:
+        """Block until the caller may send its request."""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def aacquire(self) -> None:
+        """Wait, without blocking the event loop, until the caller may send its request."""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def requests_per_second(name: str, declared: float) -> float:
+    """Return the rate limit for backend ``name``, overridable through SEARCH_RATE_LIMIT_<NAME>."""
+    override = os.environ.get(f"SEARCH_RATE_LIMIT_{name.upper()}")
+    return float(override) if override else declared
+
+
+class FunctionSearchBackend:
+    """Search backend built from a pair of cached search functions (see utils.cached_search)."""
+
+    def __init__(
+        self,
+        name: str,
+        capabilities: SearchCapabilities,
+        search_fn: Callable[..., Dict[str, Any]],
+        asearch_fn: Callable[..., Any],
+        arguments: Callable[[SearchCapabilities, SearchOptions], Dict[str, Any]],
+    ):
+        """
+        Create a backend from a sync and an async search function.
+
+        Args:
+            name: Name the backend is registered under
+            capabilities: What the backend can do
+            search_fn: Blocking search function taking the query first
+            asearch_fn: Async search function with the same arguments
+            arguments: Builds the backend-specific keyword arguments from the
+                capabilities and the per-call options
+        """
+        self.name = name
+        self.capabilities = capabilities
+        self._search_fn = search_fn
+        self._asearch_fn = asearch_fn
+        self._arguments = arguments
+
+    @functools.cached_property
+    def rate_limiter(self) -> RateLimiter:
+        """Rate limiter of this backend, see requests_per_second."""
+        # Created on first use, after .env files have been loaded
+        return RateLimiter(requests_per_second(self.name, self.capabilities.requests_per_second))
+
+    def _kwargs(self, options: SearchOptions) -> Dict[str, Any]:
+        return {
+            **self._arguments(self.capabilities, options),
+            "use_cache": options.use_cache,
+            "cache_dir": options.cache_dir,
+            # Throttles only requests that miss the search cache
+            "rate_limiter": self.rate_limiter,
+        }
+
+    def search(self, query: str, options: SearchOptions) -> Dict[str, Any]:
+        """Run a blocking search for ``query``."""
+        return self._search_fn(query, **self._kwargs(options))
+
+    async def asearch(self, query: str, options: SearchOptions) -> Dict[str, Any]:
+        """Run a search for ``query`` on the running event loop."""
+        return await self._asearch_fn(query, **self._kwargs(options))
+
+
+def _page_search_arguments(capabilities: SearchCapabilities, options: SearchOptions) -> Dict[str, Any]:
+    """Arguments for backends that fetch full pages themselves (DuckDuckGo, SearXNG)."""
+    return {
+        "max_results": capabilities.max_results,
+        "fetch_full_page": options.fetch_full_page,
+        "fetch_options": options.fetch_options,
+    }
+
+
+_BACKENDS: Dict[str, SearchBackend] = {}
+
+
+def register_search_backend(backend: SearchBackend) -> None:
+    """
+    Register a search backend that configurations can select by name.
+
+    Args:
+        backend: The backend; ``backend.name`` is the value of ``search_api``
+    """
+    _BACKENDS[backend.name] = backend
+
+
+def _load_backend(reference: str) -> SearchBackend:
+    """Build a backend from a "package.module:factory" reference; the factory takes no arguments."""
+    module_name, _, factory_name = reference.partition(":")
+    backend = getattr(importlib.import_module(module_name), factory_name)()
+    if not isinstance(backend, SearchBackend):
+        raise TypeError(f"{reference} did not return a SearchBackend")
+    return backend
+
+
+def get_search_backend(name: str) -> SearchBackend:
+    """
+    Return the registered search backend for ``name``.
+
+    A "package.module:factory" reference is loaded on first use and registered
+    under that reference.
+
+    Raises:
+        ValueError: If no backend is registered under ``name``
+    """
+    backend = _BACKENDS.get(name)
+    if backend is None and ":" in name:
+        backend = _load_backend(name)
+        _BACKENDS[name] = backend
+    if backend is None:
+        raise ValueError(f"Unsupported search API: {name}")
+    return backend
+
+
+def search_backend_names() -> List[str]:
+    """Return the names of all registered search backends."""
+    return sorted(_BACKENDS)
+
+
+register_search_backend(FunctionSearchBackend(
+    "duckduckgo",
+    # DuckDuckGo answers bursts of requests with rate limit errors
+    SearchCapabilities(raw_content=True, max_results=3, requests_per_second=2.0),
+    duckduckgo_search,
+    aduckduckgo_search,
+    _page_search_arguments,
+))
+register_search_backend(FunctionSearchBackend(
+    "searxng",
+    SearchCapabilities(raw_content=True, max_results=3),
+    searxng_search,
+    asearxng_search,
+    _page_search_arguments,
+))
+register_search_backend(FunctionSearchBackend(
+    "tavily",
+    SearchCapabilities(raw_content=True, max_results=1),
+    tavily_search,
+    atavily_search,
+    lambda capabilities, options: {
+        "max_results": capabilities.max_results,
+        "fetch_full_page": options.fetch_full_page,
+    },
+))
+register_search_backend(FunctionSearchBackend(
+    "perplexity",
+    # One synthesized answer plus its citations; there are no pages to fetch
+    SearchCapabilities(raw_content=False, max_results=None),
+    perplexity_search,
+    aperplexity_search,
+    lambda capabilities, options: {"perplexity_search_loop_count": options.research_loop_count},
+))
@@ -0,0 +1,505 @@
+"""
+HTTP 服务 - Research Server
+常驻进程的 ASGI 应用：接收研究任务，放入有并发上限的队列执行，通过 SSE 推送节点进度，
+完成后保存结果供查询。同一进程内共享模型/搜索客户端、连接池与缓存，避免每个请求冷启动一次 CLI。
+不依赖 Web 框架，运行需要 uvicorn（pip install -e ".[server]"）。
+
+接口：
+    POST   /jobs              提交任务 {"topic": "...", "config": {...}}，返回 202
+    GET    /jobs              列出内存中的任务
+    GET    /jobs/{id}         任务状态与结果
+    GET    /jobs/{id}/events  SSE 进度流，支持 Last-Event-ID 断线续传
+    DELETE /jobs/{id}         取消排队中或运行中的任务
+    GET    /health            队列状态与运行指标
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from pydantic import ValidationError
+
+from Langgraph_deep_researcher import metrics
+from Langgraph_deep_researcher.cache import resolve_cache_dir
+from Langgraph_deep_researcher.clients import aclose_clients
+from Langgraph_deep_researcher.configuration import Configuration
+from Langgraph_deep_researcher.graph import get_graph
+from Langgraph_deep_researcher.http_client import aclose_http_clients
+from Langgraph_deep_researcher.search_backends import search_backend_names
+from Langgraph_deep_researcher.state import SummaryStateInput
+
+# Finished jobs are kept as <id>.json in this subdirectory of the cache directory
+JOBS_DIR = "jobs"
+MAX_REQUEST_BYTES = 64 * 1024
+# A comment line is sent on idle SSE streams so proxies keep the connection open
+SSE_KEEPALIVE_SECONDS = 15.0
+# Per-job settings a client may override; endpoints, keys and server limits stay server-side
+JOB_CONFIG_KEYS = frozenset({
+    "max_web_research_loops",
+    "queries_per_loop",
+    "local_llm",
+    "llm_provider",
+    "search_api",
+    "fetch_full_page",
+    "use_tool_calling",
+    "strip_thinking_tokens",
+})
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+_JOB_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+
+class HTTPError(Exception):
+    """Error answered with ``status`` and a JSON body ``{"error": message}``."""
+
+    def __init__(self, status: int, message: str):
+        """
+        Create an error response.
+
+        Args:
+            status: HTTP status code
+            message: Error message sent to the client
+        """
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+@dataclass
+class Job:
+    """A research request and everything that happened to it."""
+    id: str
+    topic: str
+    config: Dict[str, Any]
+    status: str = "queued"  # queued, running, completed, failed or cancelled
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    events: List[Dict[str, Any]] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, Any]:
+        """Job fields without the result and the event log."""
+        return {key: value for key, value in asdict(self).items() if key not in ("result", "events")}
+
+
+class ResearchServer:
+    """
+    ASGI application running research jobs on a bounded worker pool.
+
+    At most ``max_queued_jobs`` jobs wait to start and are run by
+    ``max_concurrent_jobs`` workers on the server's event loop. Every graph node
+    that finishes is published as an event, which clients follow over SSE.
+    Finished jobs stay in memory up to ``max_stored_jobs`` and are also written
+    to the cache directory, so results survive eviction and restarts.
+    """
+
+    def __init__(self, configuration: Optional[Configuration] = None, research_graph=None):
+        """
+        Create the application; workers start with the first request or on lifespan startup.
+
+        Args:
+            configuration: Server settings, by default read from the environment on start
+            research_graph: Graph run for each job, by default the shared uncheckpointed graph
+        """
+        self.configuration = configuration
+        self.research_graph = research_graph
+        self.jobs: OrderedDict[str, Job] = OrderedDict()
+        self.jobs_dir: Optional[Path] = None
+        self._queue: Optional[asyncio.Queue] = None
+        # Jobs still waiting to start; cancelled jobs stay in the queue but no longer count
+        self._queued = 0
+        self._workers: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._changed: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    async def start(self) -> None:
+        """Start the workers; called on lifespan startup or by the first request."""
+        if self._queue is not None:
+            return
+        self.configuration = self.configuration or Configuration()
+        self.research_graph = self.research_graph or get_graph()
+        cache_dir = resolve_cache_dir(self.configuration.cache_dir)
+        if cache_dir is not None:
+            self.jobs_dir = cache_dir / JOBS_DIR
+            self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        self._queue = asyncio.Queue()
+        self._queued = 0
+        self._changed = asyncio.Event()
+        self._stopping = False
+        self._workers = [
+            asyncio.ensure_future(self._worker()) for _ in range(max(1, self.configuration.max_concurrent_jobs))
+        ]
+
+    async def stop(self) -> None:
+        """Cancel running jobs, stop the workers and close the loop's SDK clients and HTTP connections."""
+        self._stopping = True
+        for task in list(self._running.values()) + self._workers:
+            task.cancel()
+        await asyncio.gather(*self._running.values(), *self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        await aclose_clients()
+        await aclose_http_clients()
+
+    def submit(self, topic: str, overrides: Optional[Dict[str, Any]] = None) -> Job:
+        """
+        Queue a research job.
+
+        Args:
+            topic: The research topic
+            overrides: Configuration overrides, limited to JOB_CONFIG_KEYS
+
+        Returns:
+            Job: The queued job
+
+        Raises:
+            HTTPError: 400 for invalid input or settings fixed by the server
+                environment, 503 when the queue is full
+        """
+        if not isinstance(topic, str) or not topic.strip():
+            raise HTTPError(400, "topic must be a non-empty string")
+        overrides = overrides or {}
+        if not isinstance(overrides, dict):
+            raise HTTPError(400, "config must be an object")
+        unknown = sorted(set(overrides) - JOB_CONFIG_KEYS)
+        if unknown:
+            raise HTTPError(400, f"config keys not allowed: {', '.join(unknown)}")
+        # Environment variables take precedence over the configurable, so such an override would be ignored
+        fixed = sorted(key for key in overrides if os.environ.get(key.upper()) is not None)
+        if fixed:
+            raise HTTPError(400, f"config keys fixed by the server environment: {', '.join(fixed)}")
+        # Only registered backends; a package.module:factory reference would import arbitrary code
+        if "search_api" in overrides and overrides["search_api"] not in search_backend_names():
+            raise HTTPError(400, f"unknown search_api, expected one of: {', '.join(search_backend_names())}")
+        try:
+            Configuration.from_runnable_config({"configurable": overrides})
+        except ValidationError as e:
+            raise HTTPError(400, f"invalid config: {e.errors()[0]['msg']}") from e
+
+        if self._queued >= max(1, self.configuration.max_queued_jobs):
+            metrics.increment("server.jobs_rejected")
+            raise HTTPError(503, "job queue is full, retry later")
+        job = Job(id=uuid.uuid4().hex, topic=topic.strip(), config=overrides)
+        self._queue.put_nowait(job)
+        self._queued += 1
+        self.jobs[job.id] = job
+        metrics.increment("server.jobs_submitted")
+        self._publish(job, "queued", {"position": self._queued})
+        return job
+
+    def cancel(self, job: Job) -> None:
+        """Cancel a queued or running job; finished jobs are left untouched."""
+        if job.status == "queued":
+            # The worker skips it when it reaches the front of the queue
+            self._queued -= 1
+            self._finish(job, "cancelled", "cancelled before start")
+        elif job.status == "running" and job.id in self._running:
+            self._running[job.id].cancel()
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        """Return a job from memory or, once evicted, from the cache directory."""
+        job = self.jobs.get(job_id)
+        if job is not None or self.jobs_dir is None or not _JOB_ID_PATTERN.fullmatch(job_id):
+            return job
+        path = self.jobs_dir / f"{job_id}.json"
+        try:
+            return Job(**json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _publish(self, job: Job, event: str, data: Dict[str, Any]) -> None:
+        """Append an event to the job's log and wake up SSE subscribers."""
+        job.events.append({"id": len(job.events), "event": event, "time": time.time(), "data": data})
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def _finish(self, job: Job, status: str, error: Optional[str] = None) -> None:
+        """Record the final status, persist the job and evict old finished jobs from memory."""
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+        metrics.increment(f"server.jobs_{status}")
+        self._publish(job, status, job.summary())
+        if self.jobs_dir is not None:
+            path = self.jobs_dir / f"{job.id}.json"
+            temp_path = path.with_suffix(".tmp")
+            temp_path.write_text(json.dumps(asdict(job), ensure_ascii=False), encoding="utf-8")
+            temp_path.replace(path)
+
+        # Memory holds finished jobs in the order they finished, oldest evicted first
+        if job.id in self.jobs:
+            self.jobs.move_to_end(job.id)
+        finished = [job_id for job_id, stored in self.jobs.items() if stored.status in TERMINAL_STATUSES]
+        for job_id in finished[:max(0, len(finished) - self.configuration.max_stored_jobs)]:
+            del self.jobs[job_id]
+
+    async def _worker(self) -> None:
+        """Take jobs off the queue one at a time until the server stops."""
+        while not self._stopping:
+            job = await self._queue.get()
+            if job.status != "queued":
+                continue
+            self._queued -= 1
+            task = asyncio.ensure_future(self._run_job(job))
+            self._running[job.id] = task
+            try:
+                await task
+            finally:
+                self._running.pop(job.id, None)
+
+    async def _run_job(self, job: Job) -> None:
+        """Run the research graph for a job, publishing an event per finished node."""
+        job.status = "running"
+        job.started_at = time.time()
+        self._publish(job, "started", {"queued_seconds": round(job.started_at - job.created_at, 3)})
+
+        final_state: Dict[str, Any] = {}
+        pending_nodes = []
+        last_event = time.perf_counter()
+        try:
+            async for mode, chunk in self.research_graph.astream(
+                SummaryStateInput(research_topic=job.topic),
+                config={"configurable": dict(job.config)},
+                stream_mode=["updates", "values"],
+            ):
+                if mode == "updates":
+                    now = time.perf_counter()
+                    duration, last_event = now - last_event, now
+                    for node_name in chunk or {}:
+                        pending_nodes.append((node_name, duration))
+                        # Parallel nodes in the same step share the wait of the first one
+                        duration = 0.0
+                else:
+                    final_state = chunk
+                    for node_name, duration in pending_nodes:
+                        self._publish(job, "node", {
+                            "node": node_name,
+                            "duration": round(duration, 3),
+                            "research_loop_count": final_state.get("research_loop_count", 0),
+                            "sources": len(final_state.get("sources_gathered") or []),
+                        })
+                    pending_nodes = []
+
+            summary = final_state.get("running_summary")
+            if not summary:
+                raise ValueError("graph produced no running summary")
+            job.result = {
+                "running_summary": summary,
+                "sources_gathered": final_state.get("sources_gathered") or [],
+            }
+            self._finish(job, "completed")
+        except asyncio.CancelledError:
+            self._finish(job, "cancelled", "server shutting down" if self._stopping else "cancelled while running")
+        except Exception as e:
+            self._finish(job, "failed", f"{type(e).__name__}: {e}")
+
+    async def __call__(self, scope, receive, send) -> None:
+        """Handle one ASGI connection: lifespan events or an HTTP request."""
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        await self.start()
+        try:
+            await self._route(scope, receive, send)
+        except HTTPError as e:
+            await _send_json(send, e.status, {"error": e.message})
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await self.start()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.stop()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _route(self, scope, receive, send) -> None:
+        method = scope["method"]
+        parts = [part for part in scope["path"].split("/") if part]
+
+        if parts == ["health"]:
+            _require_method(method, "GET")
+            await _send_json(send, 200, {
+                "status": "ok",
+                "queued": self._queued,
+                "running": len(self._running),
+                "stored": len(self.jobs),
+                "metrics": metrics.get_metrics(),
+            })
+        elif parts == ["jobs"]:
+            _require_method(method, "GET", "POST")
+            if method == "GET":
+                jobs = [job.summary() for job in reversed(self.jobs.values())]
+                await _send_json(send, 200, {"jobs": jobs})
+                return
+            body = await _read_json(receive)
+            job = self.submit(body.get("topic"), body.get("config"))
+            location = f"/jobs/{job.id}"
+            await _send_json(
+                send,
+                202,
+                {**job.summary(), "links": {"self": location, "events": f"{location}/events"}},
+                headers=[(b"location", location.encode())],
+            )
+        elif len(parts) in (2, 3) and parts[0] == "jobs" and parts[2:] in ([], ["events"]):
+            job = self.get_job(parts[1])
+            if job is None:
+                raise HTTPError(404, f"job {parts[1]} not found")
+            if len(parts) == 3:
+                _require_method(method, "GET")
+                await self._stream_events(job, scope, receive, send)
+            elif method == "DELETE":
+                self.cancel(job)
+                await _send_json(send, 200, job.summary())
+            else:
+                _require_method(method, "GET")
+                await _send_json(send, 200, {**job.summary(), "result": job.result})
+        else:
+            raise HTTPError(404, "not found")
+
+    async def _stream_events(self, job: Job, scope, receive, send) -> None:
+        """Send the job's events as Server-Sent Events until the job finishes or the client leaves."""
+        headers = dict(scope.get("headers") or [])
+        try:
+            next_index = int(headers.get(b"last-event-id", b"-1")) + 1
+        except ValueError:
+            next_index = 0
+
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream; charset=utf-8"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+            ],
+        })
+        disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+        try:
+            while True:
+                changed = self._changed
+                while next_index < len(job.events):
+                    await send({"type": "http.response.body", "body": _sse(job.events[next_index]), "more_body": True})
+                    next_index += 1
+                if job.status in TERMINAL_STATUSES:
+                    break
+                waiter = asyncio.ensure_future(changed.wait())
+                done, _ = await asyncio.wait(
+                    [waiter, disconnected], timeout=SSE_KEEPALIVE_SECONDS, return_when=asyncio.FIRST_COMPLETED
+                )
+                waiter.cancel()
+                if disconnected in done:
+                    return
+                if not done:
+                    await send({"type": "http.response.body", "body": b": keepalive\n\n", "more_body": True})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            disconnected.cancel()
+
+
+def _require_method(method: str, *allowed: str) -> None:
+    if method not in allowed:
+        raise HTTPError(405, f"method {method} not allowed")
+
+
+def _sse(event: Dict[str, Any]) -> bytes:
+    """Encode a job event as one Server-Sent Event."""
+    data = json.dumps(event["data"], ensure_ascii=False)
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {data}\n\n".encode()
+
+
+async def _wait_for_disconnect(receive) -> None:
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def _read_json(receive) -> Dict[str, Any]:
+    """Read a JSON object request body of at most MAX_REQUEST_BYTES."""
+    body = b""
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if len(body) > MAX_REQUEST_BYTES:
+            raise HTTPError(413, "request body too large")
+    try:
+        data = json.loads(body or b"{}")
+    except ValueError:
+        raise HTTPError(400, "request body is not valid JSON") from None
+    if not isinstance(data, dict):
+        raise HTTPError(400, "request body must be a JSON object")
+    return data
+
+
+async def _send_json(send, status: int, payload: Dict[str, Any], headers: Optional[list] = None) -> None:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json; charset=utf-8"),
+            (b"content-length", str(len(body)).encode()),
+            *(headers or []),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+# ASGI entry point, e.g. ``uvicorn Langgraph_deep_researcher.server:app``
+app = ResearchServer()
+
+
+def main():
+    """Run the research server with uvicorn."""
+    try:
+        from dotenv import find_dotenv, load_dotenv
+
+        load_dotenv(find_dotenv(usecwd=True), override=False)
+    except Exception:
+        pass
+
+    parser = argparse.ArgumentParser(
+        prog="Langgraph_deep_researcher.server",
+        description="Serve research jobs over HTTP with a job queue and SSE progress.",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on (default: 8000)")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Maximum number of jobs run at the same time (default: MAX_CONCURRENT_JOBS)",
+    )
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        print("❌ 服务模式需要 uvicorn: pip install -e \".[server]\"")
+        sys.exit(1)
+
+    configuration = Configuration()
+    if args.concurrency is not None:
+        configuration.max_concurrent_jobs = max(1, args.concurrency)
+    print(f"🚀 研究服务启动: http://{args.host}:{args.port} (并发任务: {configuration.max_concurrent_jobs})")
+    uvicorn.run(ResearchServer(configuration), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
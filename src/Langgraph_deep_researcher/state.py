@@ -3,11 +3,26 @@ from dataclasses import dataclass, field
 from typing_extensions import Annotated
 
 
+def latest_loop_results(current: list, update: list) -> list:
+    """Reducer for web_research_results that keeps only the most recent research loop.
+
+    Each entry is a ``{"loop": int, "content": str}`` dict. Parallel workers of one
+    loop are merged; entries of earlier loops are dropped once a newer loop reports,
+    so the state (and every checkpoint of it) stays the size of a single loop.
+    """
+    merged = (current or []) + (update or [])
+    if not merged:
+        return []
+    latest_loop = max(entry["loop"] for entry in merged)
+    return [entry for entry in merged if entry["loop"] == latest_loop]
+
+
 @dataclass(kw_only=True)
 class SummaryState:
     research_topic: str = field(default=None)  # 研究主题
     search_query: str = field(default=None)  # 搜索查询
-    web_research_results: Annotated[list, operator.add] = field(default_factory=list)
+    search_queries: list = field(default_factory=list)  # 本轮并行执行的全部搜索查询
+    web_research_results: Annotated[list, latest_loop_results] = field(default_factory=list)  # 最近一轮的搜索结果
     sources_gathered: Annotated[list, operator.add] = field(default_factory=list)
     research_loop_count: int = field(default=0)  # Research loop count
     running_summary: str = field(default=None)  # Final report
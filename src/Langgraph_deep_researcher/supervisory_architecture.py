@@ -4,20 +4,28 @@
 """
 
 import asyncio
-from typing import Dict, List, Any, Optional, Literal
-from dataclasses import dataclass
+import functools
+import json
+from typing import Awaitable, Callable, Dict, List, Any, Optional
+from dataclasses import dataclass, field
 from enum import Enum
 from pydantic import BaseModel, Field
+from typing_extensions import TypedDict
 
 from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, AIMessage
 from langchain_core.runnables import RunnableConfig
-from langchain_ollama import ChatOllama
-from langchain_openai import ChatOpenAI
 from langgraph.graph import StateGraph, START, END
 
-from Langgraph_deep_researcher.graph import graph as deep_researcher_graph
+from Langgraph_deep_researcher.checkpointing import (
+    aopen_checkpointer,
+    register_checkpoint_types,
+    resume_input,
+)
+from Langgraph_deep_researcher.clients import get_chat_model
+from Langgraph_deep_researcher.graph import build_graph, get_graph
 from Langgraph_deep_researcher.state import SummaryStateInput
 from Langgraph_deep_researcher.configuration import Configuration
+from Langgraph_deep_researcher.utils import TokenStream, strip_thinking_tokens
 
 
 class TaskType(Enum):
@@ -46,7 +54,13 @@ class Task:
     assigned_agent: Optional[str] = None
     status: str = "pending"
     result: Optional[str] = None
+    error: Optional[str] = None  # 任务失败时的错误信息，失败任务没有 result
     metadata: Dict[str, Any] = None
+    depends_on: List[str] = field(default_factory=list)  # 依赖的任务 id，全部完成后才可执行
+
+
+# 任务与 Agent 状态保存在图状态中，需要允许它们出现在检查点里
+register_checkpoint_types(Task, TaskType, AgentStatus)
 
 
 class SupervisoryState(BaseModel):
@@ -112,21 +126,19 @@ class SupervisoryAgent:
             print(f"{icon} {message}")
         
     def _get_llm(self):
-        """获取 LLM 实例"""
+        """获取 LLM 实例（通过客户端注册表复用）"""
         if self.config.llm_provider == "openai":
-            return ChatOpenAI(
-                model=self.config.local_llm,
-                base_url=self.config.openai_base_url,
-                temperature=0.1
-            )
+            base_url = self.config.openai_base_url
         else:
-            return ChatOllama(
-                model=self.config.local_llm,
-                base_url=self.config.ollama_base_url,
-                temperature=0.1
-            )
+            base_url = self.config.ollama_base_url
+        return get_chat_model(
+            self.config.llm_provider,
+            model=self.config.local_llm,
+            base_url=base_url,
+            temperature=0.1
+        )
     
-    def decompose_request(self, user_request: str) -> List[Task]:
+    async def decompose_request(self, user_request: str) -> List[Task]:
         """将用户请求分解为具体任务"""
         self._print_progress(f"开始分解用户请求: {user_request}", "TASK")
         
@@ -142,13 +154,15 @@ class SupervisoryAgent:
             "id": "task_1",
             "type": "research",
             "description": "研究任务描述",
-            "priority": 5
+            "priority": 5,
+            "depends_on": []
         }},
         {{
             "id": "task_2", 
             "type": "analysis",
             "description": "分析任务描述",
-            "priority": 4
+            "priority": 4,
+            "depends_on": ["task_1"]
         }}
     ]
 }}
@@ -159,7 +173,10 @@ class SupervisoryAgent:
 - synthesis: 需要综合整理的任务
 - validation: 需要验证、检查的任务
 
-请确保任务分解合理、具体、可执行。
+priority 取值 1-5，5 为最高优先级。depends_on 列出必须先完成的任务 id；
+互不依赖的研究子课题请拆成独立的 research 任务，它们会被并行执行。
+
+请确保任务分解合理、具体、可执行。只输出 JSON。
 """
 
         messages = [
@@ -169,58 +186,237 @@ class SupervisoryAgent:
         
         try:
             self._print_progress("正在调用LLM进行任务分解...", "PROGRESS")
-            response = self.llm.invoke(messages)
+            response = await self.llm.ainvoke(messages)
             self._print_progress("正在解析任务分解结果...", "PROGRESS")
             
-            # 这里需要解析 JSON 响应并创建 Task 对象
-            # 简化实现，直接创建示例任务
-            tasks = [
-                Task(
-                    id="research_task",
-                    type=TaskType.RESEARCH,
-                    description=f"深度研究: {user_request}",
-                    priority=5
-                ),
-                Task(
-                    id="analysis_task",
-                    type=TaskType.ANALYSIS,
-                    description=f"分析研究结果并生成见解",
-                    priority=4
-                ),
-                Task(
-                    id="synthesis_task",
-                    type=TaskType.SYNTHESIS,
-                    description="综合所有信息生成最终报告",
-                    priority=3
-                )
-            ]
+            tasks = parse_task_decomposition(response.content, user_request)
+            if not tasks:
+                self._print_progress("未能从LLM响应中解析出任务，使用默认任务分解策略", "WARNING")
+                tasks = default_tasks(user_request)
             
             self._print_progress(f"成功分解为 {len(tasks)} 个任务", "SUCCESS")
             for i, task in enumerate(tasks, 1):
-                self._print_progress(f"  任务 {i}: {task.type.value} - {task.description[:50]}...", "INFO")
+                depends = f" (依赖: {', '.join(task.depends_on)})" if task.depends_on else ""
+                self._print_progress(f"  任务 {i}: {task.type.value} [P{task.priority}] - {task.description[:50]}...{depends}", "INFO")
             
             return tasks
         except Exception as e:
             self._print_progress(f"任务分解失败: {e}", "ERROR")
             self._print_progress("使用默认任务分解策略", "WARNING")
-            # 返回默认任务
-            return [
-                Task(
-                    id="research_task",
-                    type=TaskType.RESEARCH,
-                    description=f"研究: {user_request}",
-                    priority=5
-                )
-            ]
+            return default_tasks(user_request)
+
+
+def default_tasks(user_request: str) -> List[Task]:
+    """默认任务分解：研究 → 分析 → 综合"""
+    return [
+        Task(
+            id="research_task",
+            type=TaskType.RESEARCH,
+            description=f"深度研究: {user_request}",
+            priority=5
+        ),
+        Task(
+            id="analysis_task",
+            type=TaskType.ANALYSIS,
+            description="分析研究结果并生成见解",
+            priority=4,
+            depends_on=["research_task"]
+        ),
+        Task(
+            id="synthesis_task",
+            type=TaskType.SYNTHESIS,
+            description="综合所有信息生成最终报告",
+            priority=3,
+            depends_on=["research_task", "analysis_task"]
+        )
+    ]
+
+
+def _remove_dependency_cycles(tasks: List[Task]) -> None:
+    """按任务顺序做深度优先遍历，删除构成环的依赖边，保证调度不会死锁"""
+    by_id = {task.id: task for task in tasks}
+    state: Dict[str, str] = {}  # id -> "visiting" | "done"
+
+    def visit(task: Task) -> None:
+        state[task.id] = "visiting"
+        for dep in list(task.depends_on):
+            if state.get(dep) == "visiting":
+                task.depends_on.remove(dep)
+            elif dep not in state:
+                visit(by_id[dep])
+        state[task.id] = "done"
+
+    for task in tasks:
+        if task.id not in state:
+            visit(task)
+
+
+def parse_task_decomposition(content: str, user_request: str) -> List[Task]:
+    """
+    将 LLM 的任务分解 JSON 解析为 Task 列表。
+
+    - 未知任务类型按 research 处理，priority 限制在 1-5
+    - 删除指向不存在任务或构成环的依赖
+    - 未声明依赖的 analysis/validation 任务默认依赖全部 research 任务，
+      synthesis 任务默认依赖所有非 synthesis 任务
+    - 若没有 synthesis 任务则自动追加一个，保证生成最终报告
+
+    解析失败时返回空列表。
+    """
+    content = strip_thinking_tokens(content or "")
+    start, end = content.find("{"), content.rfind("}")
+    if start == -1 or end <= start:
+        return []
+    try:
+        raw_tasks = json.loads(content[start:end + 1]).get("tasks", [])
+    except (json.JSONDecodeError, AttributeError):
+        return []
+    if not isinstance(raw_tasks, list):
+        return []
+
+    task_types = {task_type.value: task_type for task_type in TaskType}
+    tasks: List[Task] = []
+    seen_ids = set()
+    for index, raw in enumerate(raw_tasks, 1):
+        if not isinstance(raw, dict) or not str(raw.get("description", "")).strip():
+            continue
+        task_id = str(raw.get("id") or f"task_{index}")
+        while task_id in seen_ids:
+            task_id = f"{task_id}_{index}"
+        seen_ids.add(task_id)
+        try:
+            priority = min(5, max(1, int(raw.get("priority", 1))))
+        except (TypeError, ValueError):
+            priority = 1
+        depends_on = raw.get("depends_on") or []
+        tasks.append(Task(
+            id=task_id,
+            type=task_types.get(str(raw.get("type", "")).lower(), TaskType.RESEARCH),
+            description=str(raw["description"]).strip(),
+            priority=priority,
+            depends_on=[str(dep) for dep in depends_on] if isinstance(depends_on, list) else [],
+        ))
+
+    if not tasks:
+        return []
+
+    if not any(task.type == TaskType.SYNTHESIS for task in tasks):
+        tasks.append(Task(
+            id="synthesis_task" if "synthesis_task" not in seen_ids else f"synthesis_task_{len(tasks) + 1}",
+            type=TaskType.SYNTHESIS,
+            description=f"综合所有信息生成最终报告: {user_request}",
+            priority=1,
+        ))
+
+    task_ids = {task.id for task in tasks}
+    research_ids = [task.id for task in tasks if task.type == TaskType.RESEARCH]
+    for task in tasks:
+        task.depends_on = [dep for dep in dict.fromkeys(task.depends_on) if dep in task_ids and dep != task.id]
+    _remove_dependency_cycles(tasks)
+
+    for task in tasks:
+        if task.depends_on:
+            continue
+        if task.type in (TaskType.ANALYSIS, TaskType.VALIDATION):
+            task.depends_on = list(research_ids)
+        elif task.type == TaskType.SYNTHESIS:
+            task.depends_on = [other.id for other in tasks if other.type != TaskType.SYNTHESIS]
+
+    _remove_dependency_cycles(tasks)
+    return tasks
+
+
+async def run_task_scheduler(
+    tasks: List[Task],
+    execute: Callable[[Task], Awaitable[str]],
+    max_concurrency: int,
+    on_event: Optional[Callable[[str, Task], None]] = None,
+) -> None:
+    """
+    按依赖与优先级调度任务。
+
+    依赖全部完成的任务进入就绪队列，按 priority 从高到低派发，同时运行的任务
+    不超过 max_concurrency 个；每完成一个任务就重新计算就绪队列。任务结果与
+    状态直接写回 Task 对象。execute 抛出异常的任务标记为 error（错误信息写入
+    Task.error），依赖失败或被跳过任务的任务（传递地）以及依赖无法满足的任务
+    标记为 skipped，不会以失败的输入运行。
+    """
+    pending = {task.id: task for task in tasks}
+    finished = set()
+    failed = set()  # error 或 skipped 的任务
+    running: Dict[asyncio.Task, Task] = {}
+    max_concurrency = max(1, max_concurrency)
+
+    def skip(task: Task) -> None:
+        del pending[task.id]
+        task.status = "skipped"
+        failed.add(task.id)
+        if on_event:
+            on_event("skipped", task)
+
+    while pending or running:
+        # 依赖失败的任务不再运行；跳过一个任务可能继续阻塞依赖它的任务
+        blocked = [task for task in pending.values() if any(dep in failed for dep in task.depends_on)]
+        while blocked:
+            for task in blocked:
+                skip(task)
+            blocked = [task for task in pending.values() if any(dep in failed for dep in task.depends_on)]
+
+        ready = sorted(
+            (task for task in pending.values() if all(dep in finished for dep in task.depends_on)),
+            key=lambda task: -task.priority,
+        )
+        for task in ready[:max_concurrency - len(running)]:
+            del pending[task.id]
+            task.status = "running"
+            if on_event:
+                on_event("start", task)
+            running[asyncio.ensure_future(execute(task))] = task
+
+        if not running:
+            for task in list(pending.values()):
+                skip(task)
+            break
+
+        done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+        for future in done:
+            task = running.pop(future)
+            try:
+                task.result = future.result()
+                task.status = "completed"
+                finished.add(task.id)
+            except Exception as e:
+                task.error = f"{type(e).__name__}: {e}"
+                task.status = "error"
+                failed.add(task.id)
+            if on_event:
+                on_event(task.status, task)
+
+
+def _running_summary(values: Dict[str, Any]) -> str:
+    """取出研究图的最终摘要；没有摘要时抛出异常，由调度器把任务标记为 error"""
+    summary = values.get("running_summary")
+    if not summary:
+        raise ValueError("研究图没有生成摘要")
+    return summary
 
 
 class DeepResearcherAgent:
     """Deep Researcher 子 Agent"""
     
-    def __init__(self, config: Configuration, verbose: bool = False):
+    def __init__(
+        self,
+        config: Configuration,
+        verbose: bool = False,
+        research_graph=None,
+        thread_id: Optional[str] = None,
+    ):
         self.config = config
         self.verbose = verbose
         self.status = AgentStatus.IDLE
+        # 带检查点的研究图：每个研究任务使用独立的 thread，中断后可从最后完成的节点继续
+        self.research_graph = research_graph or get_graph()
+        self.thread_id = thread_id
         
     def _print_progress(self, message: str, level: str = "INFO"):
         """打印进度信息"""
@@ -257,9 +453,20 @@ class DeepResearcherAgent:
                 }
             }
             
+            if self.thread_id and self.research_graph.checkpointer:
+                config_dict["configurable"]["thread_id"] = f"{self.thread_id}:{task.id}"
+                snapshot = await self.research_graph.aget_state(config_dict)
+                if snapshot.values and not snapshot.next:
+                    self._print_progress("研究任务已在之前的运行中完成，复用检查点结果", "SUCCESS")
+                    self.status = AgentStatus.COMPLETED
+                    return _running_summary(snapshot.values)
+                if snapshot.next:
+                    self._print_progress(f"从检查点继续研究任务 (下一步: {', '.join(snapshot.next)})", "PROGRESS")
+                    input_state = None
+            
             self._print_progress("正在运行Deep Researcher研究流程...", "PROGRESS")
-            result = deep_researcher_graph.invoke(input_state, config=config_dict)
-            research_result = result.get("running_summary", "研究失败")
+            result = await self.research_graph.ainvoke(input_state, config=config_dict)
+            research_result = _running_summary(result)
             
             self._print_progress("研究任务完成", "SUCCESS")
             self.status = AgentStatus.COMPLETED
@@ -268,7 +475,7 @@ class DeepResearcherAgent:
         except Exception as e:
             self._print_progress(f"研究任务失败: {e}", "ERROR")
             self.status = AgentStatus.ERROR
-            return f"研究执行失败: {str(e)}"
+            raise
 
 
 class AnalysisAgent:
@@ -298,19 +505,17 @@ class AnalysisAgent:
             print(f"{icon} [AnalysisAgent] {message}")
     
     def _get_llm(self):
-        """获取 LLM 实例"""
+        """获取 LLM 实例（通过客户端注册表复用）"""
         if self.config.llm_provider == "openai":
-            return ChatOpenAI(
-                model=self.config.local_llm,
-                base_url=self.config.openai_base_url,
-                temperature=0.2
-            )
+            base_url = self.config.openai_base_url
         else:
-            return ChatOllama(
-                model=self.config.local_llm,
-                base_url=self.config.ollama_base_url,
-                temperature=0.2
-            )
+            base_url = self.config.ollama_base_url
+        return get_chat_model(
+            self.config.llm_provider,
+            model=self.config.local_llm,
+            base_url=base_url,
+            temperature=0.2
+        )
     
     async def analyze_results(self, research_results: List[str], original_request: str) -> str:
         """分析研究结果"""
@@ -343,8 +548,14 @@ class AnalysisAgent:
                 HumanMessage(content="请分析这些研究结果")
             ]
             
-            response = self.llm.invoke(messages)
-            analysis_result = response.content
+            # 流式生成，token 实时推送到 "custom" 流模式
+            tokens = TokenStream("analysis_agent", self.config.strip_thinking_tokens)
+            async for chunk in self.llm.astream(messages):
+                tokens.send(chunk.content)
+            analysis_result = tokens.close()
+            # 流中已去除的思考内容同样不能进入下游提示词和最终报告
+            if self.config.strip_thinking_tokens:
+                analysis_result = strip_thinking_tokens(analysis_result)
             
             self._print_progress("分析任务完成", "SUCCESS")
             self.status = AgentStatus.COMPLETED
@@ -353,7 +564,7 @@ class AnalysisAgent:
         except Exception as e:
             self._print_progress(f"分析任务失败: {e}", "ERROR")
             self.status = AgentStatus.ERROR
-            return f"分析执行失败: {str(e)}"
+            raise
 
 
 class SynthesisAgent:
@@ -383,19 +594,17 @@ class SynthesisAgent:
             print(f"{icon} [SynthesisAgent] {message}")
     
     def _get_llm(self):
-        """获取 LLM 实例"""
+        """获取 LLM 实例（通过客户端注册表复用）"""
         if self.config.llm_provider == "openai":
-            return ChatOpenAI(
-                model=self.config.local_llm,
-                base_url=self.config.openai_base_url,
-                temperature=0.3
-            )
+            base_url = self.config.openai_base_url
         else:
-            return ChatOllama(
-                model=self.config.local_llm,
-                base_url=self.config.ollama_base_url,
-                temperature=0.3
-            )
+            base_url = self.config.ollama_base_url
+        return get_chat_model(
+            self.config.llm_provider,
+            model=self.config.local_llm,
+            base_url=base_url,
+            temperature=0.3
+        )
     
     async def synthesize_final_report(self, 
                                     research_results: List[str], 
@@ -434,8 +643,14 @@ class SynthesisAgent:
                 HumanMessage(content="请生成最终综合报告")
             ]
             
-            response = self.llm.invoke(messages)
-            final_report = response.content
+            # 流式生成，token 实时推送到 "custom" 流模式
+            tokens = TokenStream("synthesis_agent", self.config.strip_thinking_tokens)
+            async for chunk in self.llm.astream(messages):
+                tokens.send(chunk.content)
+            final_report = tokens.close()
+            # 流中已去除的思考内容同样不能进入下游提示词和最终报告
+            if self.config.strip_thinking_tokens:
+                final_report = strip_thinking_tokens(final_report)
             
             self._print_progress("综合报告生成完成", "SUCCESS")
             self.status = AgentStatus.COMPLETED
@@ -444,18 +659,18 @@ class SynthesisAgent:
         except Exception as e:
             self._print_progress(f"综合报告生成失败: {e}", "ERROR")
             self.status = AgentStatus.ERROR
-            return f"报告生成失败: {str(e)}"
+            raise
 
 
 # LangGraph 节点函数
-def decompose_request_node(state: SupervisoryState, config: RunnableConfig) -> Dict[str, Any]:
+async def decompose_request_node(state: SupervisoryState, config: RunnableConfig) -> Dict[str, Any]:
     """任务分解节点"""
     supervisory_config = Configuration.from_runnable_config(config)
     verbose = config.get("configurable", {}).get("verbose", False)
     supervisory_agent = SupervisoryAgent(supervisory_config, verbose=verbose)
     
     supervisory_agent._print_progress("开始任务分解阶段", "TASK")
-    tasks = supervisory_agent.decompose_request(state.user_request)
+    tasks = await supervisory_agent.decompose_request(state.user_request)
     
     return {
         "tasks": tasks,
@@ -464,88 +679,145 @@ def decompose_request_node(state: SupervisoryState, config: RunnableConfig) -> D
     }
 
 
-def execute_research_node(state: SupervisoryState, config: RunnableConfig) -> Dict[str, Any]:
-    """执行研究节点"""
-    supervisory_config = Configuration.from_runnable_config(config)
-    verbose = config.get("configurable", {}).get("verbose", False)
-    research_agent = DeepResearcherAgent(supervisory_config, verbose=verbose)
-    
-    # 找到研究任务
-    research_tasks = [task for task in state.tasks if task.type == TaskType.RESEARCH]
-    
-    if not research_tasks:
-        return {
-            "deep_researcher_status": AgentStatus.ERROR,
-            "research_results": [],
-            "messages": state.messages + [AIMessage(content="未找到研究任务")]
-        }
-    
-    # 执行研究任务
-    research_results = []
-    for task in research_tasks:
-        result = asyncio.run(research_agent.execute_research(task))
-        research_results.append(result)
-    
-    return {
-        "deep_researcher_status": AgentStatus.COMPLETED,
-        "research_results": research_results,
-        "messages": state.messages + [AIMessage(content=f"完成 {len(research_results)} 个研究任务")]
-    }
+def _dependency_results(task: Task, by_id: Dict[str, Task], task_type: TaskType) -> List[str]:
+    """收集任务（传递）依赖中指定类型、已完成任务的结果，按任务顺序返回"""
+    collected = set()
+    stack = list(task.depends_on)
+    while stack:
+        dep_id = stack.pop()
+        if dep_id in collected:
+            continue
+        collected.add(dep_id)
+        stack.extend(by_id[dep_id].depends_on)
+    return [
+        other.result for other in by_id.values()
+        if other.id in collected and other.type == task_type and other.result
+    ]
 
 
-def analyze_results_node(state: SupervisoryState, config: RunnableConfig) -> Dict[str, Any]:
-    """分析结果节点"""
-    supervisory_config = Configuration.from_runnable_config(config)
-    verbose = config.get("configurable", {}).get("verbose", False)
-    analysis_agent = AnalysisAgent(supervisory_config, verbose=verbose)
-    
-    analysis_results = []
-    if state.research_results:
-        result = asyncio.run(analysis_agent.analyze_results(state.research_results, state.user_request))
-        analysis_results.append(result)
-    
-    return {
-        "analysis_agent_status": AgentStatus.COMPLETED,
-        "analysis_results": analysis_results,
-        "messages": state.messages + [AIMessage(content="完成结果分析")]
-    }
+class TaskResultState(TypedDict):
+    """已完成任务的结果"""
+    result: str
+
+
+def build_task_result_graph(checkpointer):
+    """构建保存任务结果的单节点图
+
+    调度节点在一个图节点内运行全部任务，节点结束前不会产生检查点。分析、验证与
+    综合任务完成后立即以 ``<thread_id>:<task_id>`` 为 thread 写入这个图，中断后
+    重新运行调度节点时直接复用，研究任务则由带检查点的研究图保存。
+    """
+    builder = StateGraph(TaskResultState)
+    builder.add_node("record", lambda state: {})
+    builder.add_edge(START, "record")
+    builder.add_edge("record", END)
+    return builder.compile(checkpointer=checkpointer)
 
 
-def synthesize_final_report_node(state: SupervisoryState, config: RunnableConfig) -> Dict[str, Any]:
-    """生成最终报告节点"""
+async def schedule_tasks_node(
+    state: SupervisoryState, config: RunnableConfig, research_graph=None, task_results=None
+) -> Dict[str, Any]:
+    """任务调度节点 - 按依赖和优先级派发任务，并发数受 max_concurrent_research_tasks 限制
+
+    ``research_graph`` 为带检查点的研究图时，研究任务以 ``<thread_id>:<task_id>`` 为
+    thread 保存进度，恢复运行时已完成的研究直接复用，未完成的从最后完成的节点继续。
+    ``task_results`` 为 build_task_result_graph 构建的图时，其他任务的结果在完成时
+    保存，恢复运行时不再重新生成。
+    """
     supervisory_config = Configuration.from_runnable_config(config)
     verbose = config.get("configurable", {}).get("verbose", False)
+    supervisory_agent = SupervisoryAgent(supervisory_config, verbose=verbose)
+    research_agent = DeepResearcherAgent(
+        supervisory_config,
+        verbose=verbose,
+        research_graph=research_graph,
+        thread_id=config.get("configurable", {}).get("thread_id"),
+    )
+    analysis_agent = AnalysisAgent(supervisory_config, verbose=verbose)
     synthesis_agent = SynthesisAgent(supervisory_config, verbose=verbose)
-    
-    final_report = ""
-    if state.research_results and state.analysis_results:
-        final_report = asyncio.run(synthesis_agent.synthesize_final_report(
-            state.research_results,
-            state.analysis_results,
-            state.user_request
-        ))
-    
-    return {
-        "final_synthesis": final_report,
-        "messages": state.messages + [AIMessage(content="生成最终综合报告")]
-    }
 
+    tasks = state.tasks
+    by_id = {task.id: task for task in tasks}
+    thread_id = config.get("configurable", {}).get("thread_id")
+
+    async def execute(task: Task) -> str:
+        task.assigned_agent = {
+            TaskType.RESEARCH: "deep_researcher",
+            TaskType.SYNTHESIS: "synthesis_agent",
+        }.get(task.type, "analysis_agent")
+        if task.type == TaskType.RESEARCH:
+            return await research_agent.execute_research(task)
+        if task_results is None or not thread_id:
+            return await run_agent(task)
+
+        result_config = {"configurable": {"thread_id": f"{thread_id}:{task.id}"}}
+        saved = (await task_results.aget_state(result_config)).values.get("result")
+        if saved:
+            supervisory_agent._print_progress(f"任务 {task.id} 已在之前的运行中完成，复用检查点结果", "SUCCESS")
+            return saved
+        result = await run_agent(task)
+        await task_results.ainvoke({"result": result}, result_config)
+        return result
+
+    async def run_agent(task: Task) -> str:
+        research_results = _dependency_results(task, by_id, TaskType.RESEARCH)
+        if task.type == TaskType.SYNTHESIS:
+            analysis_results = (
+                _dependency_results(task, by_id, TaskType.ANALYSIS)
+                + _dependency_results(task, by_id, TaskType.VALIDATION)
+            )
+            return await synthesis_agent.synthesize_final_report(
+                research_results, analysis_results, state.user_request
+            )
+        return await analysis_agent.analyze_results(
+            research_results, f"{state.user_request}\n\n当前任务: {task.description}"
+        )
+
+    def on_event(event: str, task: Task) -> None:
+        labels = {"start": "开始", "completed": "完成", "error": "失败", "skipped": "跳过"}
+        level = {"start": "PROGRESS", "completed": "SUCCESS", "error": "ERROR", "skipped": "WARNING"}[event]
+        detail = f": {task.error}" if event == "error" else ""
+        supervisory_agent._print_progress(
+            f"{labels[event]}任务 {task.id} ({task.type.value}, P{task.priority}){detail}", level
+        )
+
+    supervisory_agent._print_progress(f"开始调度 {len(tasks)} 个任务", "TASK")
+    await run_task_scheduler(
+        tasks, execute, supervisory_config.max_concurrent_research_tasks, on_event=on_event
+    )
 
-def route_next_task(state: SupervisoryState, config: RunnableConfig) -> Literal["execute_research", "analyze_results", "synthesize_final_report", "end"]:
-    """路由到下一个任务"""
-    if state.deep_researcher_status == AgentStatus.IDLE:
-        return "execute_research"
-    elif state.deep_researcher_status == AgentStatus.COMPLETED and state.analysis_agent_status == AgentStatus.IDLE:
-        return "analyze_results"
-    elif state.analysis_agent_status == AgentStatus.COMPLETED:
-        return "synthesize_final_report"
-    else:
-        return "end"
+    def results_of(*task_types: TaskType) -> List[str]:
+        return [task.result for task in tasks if task.type in task_types and task.result]
+
+    def agent_status(*task_types: TaskType) -> AgentStatus:
+        typed = [task for task in tasks if task.type in task_types]
+        if not typed:
+            return AgentStatus.IDLE
+        if any(task.status != "completed" for task in typed):
+            return AgentStatus.ERROR
+        return AgentStatus.COMPLETED
+
+    synthesis_results = results_of(TaskType.SYNTHESIS)
+    completed = sum(1 for task in tasks if task.status == "completed")
+    return {
+        "tasks": tasks,
+        "deep_researcher_status": agent_status(TaskType.RESEARCH),
+        "analysis_agent_status": agent_status(TaskType.ANALYSIS, TaskType.VALIDATION),
+        "research_results": results_of(TaskType.RESEARCH),
+        "analysis_results": results_of(TaskType.ANALYSIS, TaskType.VALIDATION),
+        "final_synthesis": synthesis_results[-1] if synthesis_results else "",
+        "messages": state.messages + [AIMessage(content=f"完成 {completed}/{len(tasks)} 个任务")]
+    }
 
 
 # 构建主管架构图
-def create_supervisory_graph():
-    """创建主管架构图"""
+def create_supervisory_graph(checkpointer=None):
+    """创建主管架构图
+
+    Args:
+        checkpointer: 可选的检查点存储（见 checkpointing.py），同时用于各研究任务的子图
+            和已完成任务的结果（见 build_task_result_graph）
+    """
     builder = StateGraph(
         SupervisoryState,
         input=SupervisoryStateInput,
@@ -555,51 +827,75 @@ def create_supervisory_graph():
     
     # 添加节点
     builder.add_node("decompose_request", decompose_request_node)
-    builder.add_node("execute_research", execute_research_node)
-    builder.add_node("analyze_results", analyze_results_node)
-    builder.add_node("synthesize_final_report", synthesize_final_report_node)
+    research_graph = build_graph(checkpointer) if checkpointer is not None else None
+    task_results = build_task_result_graph(checkpointer) if checkpointer is not None else None
+    builder.add_node(
+        "schedule_tasks",
+        functools.partial(schedule_tasks_node, research_graph=research_graph, task_results=task_results),
+    )
     
     # 添加边
     builder.add_edge(START, "decompose_request")
-    builder.add_conditional_edges(
-        "decompose_request",
-        route_next_task,
-        {
-            "execute_research": "execute_research",
-            "analyze_results": "analyze_results",
-            "synthesize_final_report": "synthesize_final_report",
-            "end": END
-        }
-    )
-    builder.add_conditional_edges(
-        "execute_research",
-        route_next_task,
-        {
-            "analyze_results": "analyze_results",
-            "synthesize_final_report": "synthesize_final_report",
-            "end": END
-        }
-    )
-    builder.add_conditional_edges(
-        "analyze_results",
-        route_next_task,
-        {
-            "synthesize_final_report": "synthesize_final_report",
-            "end": END
-        }
-    )
-    builder.add_edge("synthesize_final_report", END)
+    builder.add_edge("decompose_request", "schedule_tasks")
+    builder.add_edge("schedule_tasks", END)
     
-    return builder.compile()
+    return builder.compile(checkpointer=checkpointer)
+
 
+@functools.cache
+def get_supervisory_graph():
+    """返回共享的主管架构图实例（不带检查点），首次使用时才编译"""
+    return create_supervisory_graph()
 
-# 创建主管架构图实例
-supervisory_graph = create_supervisory_graph()
+
+def __getattr__(name: str):
+    # 兼容直接访问模块属性 ``supervisory_graph``，首次访问时编译
+    if name == "supervisory_graph":
+        return get_supervisory_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # 便捷函数
-async def run_supervisory_research(user_request: str, config: Configuration, verbose: bool = False) -> SupervisoryStateOutput:
-    """运行主管架构研究"""
+async def _run_graph(
+    graph,
+    input_state,
+    config_dict: Dict[str, Any],
+    on_token: Optional[Callable[[str, str], None]] = None,
+) -> Dict[str, Any]:
+    """执行主管架构图并返回最终状态"""
+    # 使用异步调用避免事件循环冲突
+    if on_token is None:
+        return await graph.ainvoke(input_state, config=config_dict)
+    result = {}
+    async for mode, chunk in graph.astream(
+        input_state, config=config_dict, stream_mode=["custom", "values"]
+    ):
+        if mode == "custom" and chunk.get("type") == "token":
+            on_token(chunk["source"], chunk["content"])
+        elif mode == "values":
+            result = chunk
+    return result
+
+
+async def run_supervisory_research(
+    user_request: str,
+    config: Configuration,
+    verbose: bool = False,
+    on_token: Optional[Callable[[str, str], None]] = None,
+    thread_id: Optional[str] = None,
+    resume: bool = False,
+) -> SupervisoryStateOutput:
+    """
+    运行主管架构研究
+
+    Args:
+        user_request: 用户请求（恢复运行时不使用）
+        config: 配置
+        verbose: 是否打印详细进度
+        on_token: 可选回调 ``on_token(source, text)``，在分析/综合 Agent 流式输出 token 时调用
+        thread_id: 指定后使用 ``config.checkpointer`` 保存检查点，可在中断后恢复
+        resume: 从 ``thread_id`` 的最后一个检查点继续运行
+    """
     input_state = SupervisoryStateInput(user_request=user_request)
     config_dict = {
         "configurable": {
@@ -608,8 +904,19 @@ async def run_supervisory_research(user_request: str, config: Configuration, ver
         }
     }
     
-    # 使用异步调用避免事件循环冲突
-    result = await supervisory_graph.ainvoke(input_state, config=config_dict)
+    if not thread_id:
+        result = await _run_graph(get_supervisory_graph(), input_state, config_dict, on_token)
+    else:
+        config_dict["configurable"]["thread_id"] = thread_id
+        async with aopen_checkpointer(config.checkpointer, config.checkpoint_path, config.cache_dir) as checkpointer:
+            graph = create_supervisory_graph(checkpointer)
+            snapshot = await graph.aget_state(config_dict)
+            input_state = resume_input(snapshot, input_state, resume, thread_id)
+            if resume and not snapshot.next:
+                # 该 thread 的运行已经完成，直接返回保存的结果
+                result = snapshot.values
+            else:
+                result = await _run_graph(graph, input_state, config_dict, on_token)
     return SupervisoryStateOutput(
         final_synthesis=result.get("final_synthesis", ""),
         research_results=result.get("research_results", []),
@@ -18,11 +18,10 @@ except Exception:
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from Langgraph_deep_researcher.supervisory_architecture import (
-    supervisory_graph,
-    run_supervisory_research
-)
+from Langgraph_deep_researcher.supervisory_architecture import run_supervisory_research
 from Langgraph_deep_researcher.configuration import Configuration, SearchAPI
+from Langgraph_deep_researcher.clients import aclose_clients
+from Langgraph_deep_researcher.http_client import aclose_http_clients, close_http_clients
 
 
 def create_parser():
@@ -35,6 +34,8 @@ def create_parser():
   python -m Langgraph_deep_researcher.supervisory_cli "人工智能发展趋势"
   python -m Langgraph_deep_researcher.supervisory_cli --topic "量子计算应用" --out report.md
   python -m Langgraph_deep_researcher.supervisory_cli --provider openai --model gpt-4 "医疗AI研究"
+  python -m Langgraph_deep_researcher.supervisory_cli --thread-id ai-2024 "人工智能发展趋势"
+  python -m Langgraph_deep_researcher.supervisory_cli --thread-id ai-2024 --resume
         """
     )
     
@@ -72,9 +73,8 @@ def create_parser():
     
     parser.add_argument(
         "--search-api",
-        choices=["duckduckgo", "tavily", "perplexity", "searxng"],
         default="duckduckgo",
-        help="搜索引擎 API (默认: duckduckgo)"
+        help="搜索引擎 API: duckduckgo、tavily、perplexity、searxng 或 package.module:factory (默认: duckduckgo)"
     )
     
     parser.add_argument(
@@ -96,6 +96,29 @@ def create_parser():
         help="OpenAI API 地址 (默认: https://api.openai.com/v1)"
     )
     
+    parser.add_argument(
+        "--max-concurrent-tasks",
+        type=int,
+        help="同时执行的任务数上限 (默认: 环境变量 MAX_CONCURRENT_RESEARCH_TASKS 或 3)"
+    )
+    
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="实时输出分析与综合 Agent 生成的内容"
+    )
+    
+    parser.add_argument(
+        "--thread-id",
+        help="以该线程 ID 保存检查点，中断后可用 --resume 继续 (存储方式见环境变量 CHECKPOINTER)"
+    )
+    
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="从 --thread-id 的最后一个检查点继续中断的研究"
+    )
+    
     parser.add_argument(
         "--verbose", "-v",
         action="store_true",
@@ -105,6 +128,20 @@ def create_parser():
     return parser
 
 
+def make_token_printer():
+    """创建 token 流打印回调，输出来源切换时先打印来源标题"""
+    current_source = None
+
+    def on_token(source: str, text: str):
+        nonlocal current_source
+        if source != current_source:
+            current_source = source
+            print(f"\n\n📝 [{source}]", flush=True)
+        print(text, end="", flush=True)
+
+    return on_token
+
+
 def print_progress(message: str, verbose: bool = False):
     """打印进度信息"""
     # 在verbose模式下显示详细信息，否则只显示关键进度
@@ -116,7 +153,10 @@ async def run_supervisory_research_cli(args):
     """运行主管架构研究"""
     # 确定研究主题
     topic = args.topic or args.research_topic
-    if not topic:
+    if args.resume and not args.thread_id:
+        print("❌ 错误: --resume 需要同时指定 --thread-id")
+        return False
+    if not topic and not args.resume:
         print("❌ 错误: 请提供研究主题")
         return False
     
@@ -170,10 +210,19 @@ async def run_supervisory_research_cli(args):
         # 用户明确指定了非默认值
         config_overrides["openai_base_url"] = args.openai_url
     
+    if args.max_concurrent_tasks is not None:
+        config_overrides["max_concurrent_research_tasks"] = args.max_concurrent_tasks
+    
     # 创建最终配置
     config = Configuration(**{**default_config.model_dump(), **config_overrides})
     
-    print(f"🎯 研究主题: {topic}")
+    if args.resume:
+        print(f"♻️ 恢复研究线程: {args.thread_id}")
+        topic = topic or f"恢复的研究 (线程 {args.thread_id})"
+    else:
+        print(f"🎯 研究主题: {topic}")
+    if args.thread_id and not args.resume:
+        print(f"🧷 检查点线程: {args.thread_id} (中断后可使用 --resume 继续)")
     print(f"🤖 LLM 提供商: {config.llm_provider}")
     print(f"🧠 模型: {config.local_llm}")
     print(f"🔍 搜索引擎: {config.search_api}")
@@ -184,7 +233,17 @@ async def run_supervisory_research_cli(args):
         print_progress("开始执行主管架构研究流程...", args.verbose)
         
         # 运行研究
-        result = await run_supervisory_research(topic, config, verbose=args.verbose)
+        on_token = make_token_printer() if args.stream else None
+        result = await run_supervisory_research(
+            topic,
+            config,
+            verbose=args.verbose,
+            on_token=on_token,
+            thread_id=args.thread_id,
+            resume=args.resume,
+        )
+        if args.stream:
+            print()
         
         print("✅ 研究完成!")
         
@@ -255,8 +314,20 @@ def main():
     parser = create_parser()
     args = parser.parse_args()
     
+    async def run_and_close():
+        try:
+            return await run_supervisory_research_cli(args)
+        finally:
+            # 事件循环结束前关闭绑定在该循环上的 SDK 客户端与 HTTP 连接池
+            await aclose_clients()
+            await aclose_http_clients()
+
     # 运行异步研究
-    success = asyncio.run(run_supervisory_research_cli(args))
+    try:
+        success = asyncio.run(run_and_close())
+    finally:
+        # 释放同步 HTTP 客户端与后台事件循环
+        close_http_clients()
     
     sys.exit(0 if success else 1)
 
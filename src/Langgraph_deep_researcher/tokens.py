@@ -0,0 +1,159 @@
+"""
+Token 计数 - Token Counting
+为来源截断和提示词预算提供可插拔的 token 计数器：
+OpenAI 模型使用 tiktoken（编码器按模型缓存），Ollama 等其他模型使用兼顾中日韩文字的近似估算。
+"""
+
+import functools
+import logging
+import re
+from abc import ABC, abstractmethod
+from typing import Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+# Approximation used when no tokenizer is available: Latin text averages about
+# four characters per token, while CJK characters are roughly one token each
+CHARS_PER_TOKEN = 4
+# No real tokenizer packs more characters than this into one token of cleaned text
+MAX_CHARS_PER_TOKEN = 16
+_CJK_PATTERN = re.compile(
+    "[\u3000-\u303f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]"
+)
+# tiktoken encoding used for OpenAI-compatible models it does not know by name
+DEFAULT_TIKTOKEN_ENCODING = "o200k_base"
+
+
+class TokenCounter(ABC):
+    """Count tokens in text and truncate text to a token budget."""
+
+    name = "base"
+
+    @abstractmethod
+    def count(self, text: str) -> int:
+        """Return the number of tokens in ``text``."""
+
+    @abstractmethod
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Return the longest prefix of ``text`` that fits in ``max_tokens`` tokens."""
+
+
+class ApproximateTokenCounter(TokenCounter):
+    """
+    Tokenizer-free token estimate.
+
+    One token per CJK character and CHARS_PER_TOKEN characters per token for
+    everything else. Deliberately on the high side for Chinese text, so prompts
+    built with it do not overflow small local context windows.
+    """
+
+    name = "approximate"
+
+    def count(self, text: str) -> int:
+        """Estimate the number of tokens in ``text``."""
+        cjk_chars = len(_CJK_PATTERN.findall(text))
+        other_chars = len(text) - cjk_chars
+        return cjk_chars + -(-other_chars // CHARS_PER_TOKEN)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Return the longest prefix of ``text`` estimated to fit in ``max_tokens`` tokens."""
+        # Every character costs at least 1/CHARS_PER_TOKEN tokens, so this prefix is an upper bound
+        text = text[:max(0, max_tokens) * CHARS_PER_TOKEN]
+        if self.count(text) <= max_tokens:
+            return text
+        budget = max_tokens * CHARS_PER_TOKEN
+        for index, char in enumerate(text):
+            budget -= CHARS_PER_TOKEN if _CJK_PATTERN.match(char) else 1
+            if budget < 0:
+                return text[:index]
+        return text
+
+
+class TiktokenCounter(TokenCounter):
+    """Exact counts with a tiktoken encoding."""
+
+    name = "tiktoken"
+
+    def __init__(self, encoding):
+        """
+        Create a counter for a tiktoken encoding.
+
+        Args:
+            encoding: A ``tiktoken.Encoding``, or anything with its encode/decode methods
+        """
+        self.encoding = encoding
+
+    def count(self, text: str) -> int:
+        """Return the number of tokens in ``text``."""
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Return the longest prefix of ``text`` that fits in ``max_tokens`` tokens."""
+        # Only encode a prefix long enough to hold the budget; whole pages can be megabytes long
+        tokens = self.encoding.encode(text[:max(0, max_tokens) * MAX_CHARS_PER_TOKEN], disallowed_special=())
+        if len(tokens) <= max_tokens and len(text) <= max_tokens * MAX_CHARS_PER_TOKEN:
+            return text
+        # Dropping trailing partial characters keeps a multi-byte character from being split
+        return self.encoding.decode(tokens[:max(0, max_tokens)]).rstrip("\ufffd")
+
+
+@functools.cache
+def _tiktoken_encoding(model: str):
+    """Load (once per model) the tiktoken encoding for ``model``."""
+    import tiktoken
+
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding(DEFAULT_TIKTOKEN_ENCODING)
+
+
+def _tiktoken_counter(model: str) -> TokenCounter:
+    """Build a tiktoken counter, falling back to the approximation if tiktoken is unusable."""
+    try:
+        return TiktokenCounter(_tiktoken_encoding(model))
+    except Exception as e:
+        # tiktoken missing, or its encoding files cannot be downloaded
+        logger.warning("tiktoken unavailable for %s, using approximate token counts: %s", model, e)
+        return ApproximateTokenCounter()
+
+
+_COUNTER_FACTORIES: Dict[str, Callable[[str], TokenCounter]] = {
+    "tiktoken": _tiktoken_counter,
+    "approximate": lambda model: ApproximateTokenCounter(),
+}
+# Counter used for each LLM provider when the configuration asks for "auto"
+_PROVIDER_COUNTERS = {"openai": "tiktoken", "ollama": "approximate"}
+
+
+def register_token_counter(name: str, factory: Callable[[str], TokenCounter]) -> None:
+    """
+    Register a token counter that configurations can select by name.
+
+    Args:
+        name: Value of the ``token_counter`` configuration option
+        factory: Callable building a TokenCounter for a model name
+    """
+    _COUNTER_FACTORIES[name] = factory
+    get_token_counter.cache_clear()
+
+
+@functools.cache
+def get_token_counter(provider: str, model: str, counter: str = "auto") -> TokenCounter:
+    """
+    Return the shared token counter for a model.
+
+    Args:
+        provider: LLM provider, used to pick the counter when ``counter`` is "auto"
+        model: Model name, used to pick the tiktoken encoding
+        counter: Registered counter name, or "auto"
+
+    Returns:
+        TokenCounter: A cached counter instance
+    """
+    if counter == "auto":
+        counter = _PROVIDER_COUNTERS.get(provider, "approximate")
+    factory = _COUNTER_FACTORIES.get(counter)
+    if factory is None:
+        raise ValueError(f"Unknown token counter: {counter}")
+    return factory(model)
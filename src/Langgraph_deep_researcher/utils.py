@@ -1,17 +1,47 @@
 import os
+import re
+import asyncio
+import codecs
+import functools
+import importlib.util
+import inspect
+import logging
 import httpx
-import requests
-from typing import Dict, Any, List, Union, Optional
+from typing import Callable, Dict, Any, Iterable, List, Union, Optional
+from urllib.parse import urlsplit
 
-from markdownify import markdownify
 from langsmith import traceable
-from tavily import TavilyClient
-from duckduckgo_search import DDGS
+from langgraph.config import get_stream_writer
 
-from langchain_community.utilities import SearxSearchWrapper
+from Langgraph_deep_researcher import metrics
+from Langgraph_deep_researcher.cache import CachedPage, PageCache, get_page_cache, get_search_cache
+from Langgraph_deep_researcher.clients import get_async_tavily_client, get_tavily_client
+from Langgraph_deep_researcher.extraction import detect_javascript_page, extract_main_content
+from Langgraph_deep_researcher.http_client import (
+    get_async_http_client,
+    get_http_client,
+    run_in_background_loop,
+)
+from Langgraph_deep_researcher.tokens import ApproximateTokenCounter, TokenCounter
+
+logger = logging.getLogger(__name__)
 
 # Constants
-CHARS_PER_TOKEN = 4
+FETCH_TIMEOUT = 10.0
+FETCH_MAX_BYTES = 2 * 1024 * 1024
+PERPLEXITY_TIMEOUT = 60.0
+# Start of each source block written by deduplicate_and_format_sources
+_SOURCE_BLOCK_PATTERN = re.compile(r"^Source: ", re.MULTILINE)
+# Content types worth converting to markdown; a missing Content-Type is accepted too
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+
+# Script/style blocks and comments: markup whose text is never content
+_NON_CONTENT_MARKUP = r"script[^>]*>.*?</script|style[^>]*>.*?</style|!--.*?--"
+_NON_CONTENT_PATTERN = re.compile(rf"<(?:{_NON_CONTENT_MARKUP})>", re.DOTALL | re.IGNORECASE)
+# The above plus any remaining tag, removed in a single scan
+_HTML_NOISE_PATTERN = re.compile(rf"<(?:{_NON_CONTENT_MARKUP}|[^>]+)>", re.DOTALL | re.IGNORECASE)
+# Let markdownify parse with lxml when it is installed (see the "perf" extra)
+_MARKDOWNIFY_OPTIONS = {"bs4_options": "lxml"} if importlib.util.find_spec("lxml") else {}
 
 
 def get_config_value(value: Any) -> str:
@@ -37,7 +67,9 @@ def strip_thinking_tokens(text: str) -> str:
     """
     Remove <think> and </think> tags and their content from the text.
 
-    Iteratively removes all occurrences of content enclosed in thinking tokens.
+    Single pass over the text using ThinkingTokenStripper, so the cost is linear
+    in the length of the text regardless of how many thinking blocks it holds.
+    A block that is never closed is removed up to the end of the text.
 
     Args:
         text (str): The text to process
@@ -45,11 +77,113 @@ def strip_thinking_tokens(text: str) -> str:
     Returns:
         str: The text with thinking tokens and their content removed
     """
-    while "<think>" in text and "</think>" in text:
-        start = text.find("<think>")
-        end = text.find("</think>") + len("</think>")
-        text = text[:start] + text[end:]
-    return text
+    if ThinkingTokenStripper.OPEN_TAG not in text:
+        return text
+    stripper = ThinkingTokenStripper()
+    return stripper.feed(text) + stripper.flush()
+
+
+class ThinkingTokenStripper:
+    """
+    Incrementally remove <think>...</think> blocks from a stream of text chunks.
+
+    Tags may be split across chunks: a chunk ending in a partial tag is held back
+    until the next chunk shows whether it completes the tag. Text inside a block
+    that is still open when the stream ends is dropped.
+
+    Examples:
+        >>> stripper = ThinkingTokenStripper()
+        >>> stripper.feed("Hi <thi") + stripper.feed("nk>hmm</think> there") + stripper.flush()
+        'Hi  there'
+    """
+
+    OPEN_TAG = "<think>"
+    CLOSE_TAG = "</think>"
+
+    def __init__(self):
+        """Start outside of any thinking block with nothing buffered."""
+        self._buffer = ""
+        self._in_think = False
+
+    def feed(self, chunk: str) -> str:
+        """Consume a chunk and return the visible text that is now safe to emit."""
+        buffer = self._buffer + chunk
+        visible = []
+        position = 0
+        while True:
+            tag = self.CLOSE_TAG if self._in_think else self.OPEN_TAG
+            index = buffer.find(tag, position)
+            if index == -1:
+                # Hold back a suffix that may be the start of the tag
+                keep = min(_partial_tag_length(buffer, tag), len(buffer) - position)
+                if not self._in_think:
+                    visible.append(buffer[position:len(buffer) - keep])
+                self._buffer = buffer[len(buffer) - keep:]
+                return "".join(visible)
+            if not self._in_think:
+                visible.append(buffer[position:index])
+            position = index + len(tag)
+            self._in_think = not self._in_think
+
+    def flush(self) -> str:
+        """Return any held-back visible text and reset the stripper."""
+        tail = "" if self._in_think else self._buffer
+        self._buffer = ""
+        self._in_think = False
+        return tail
+
+
+def _partial_tag_length(text: str, tag: str) -> int:
+    """Length of the suffix of ``text`` that is a proper prefix of ``tag`` (0 if none).
+
+    Tags contain a single "<", so only a suffix starting at the last "<" can match.
+    """
+    start = text.rfind("<", max(0, len(text) - len(tag) + 1))
+    if start == -1 or not tag.startswith(text[start:]):
+        return 0
+    return len(text) - start
+
+
+class TokenStream:
+    """
+    Forward streamed LLM text to LangGraph's "custom" stream mode.
+
+    Each visible piece of text is written as ``{"type": "token", "source": source,
+    "content": text}``; thinking blocks are removed on the fly when
+    ``strip_thinking`` is set. Outside a graph run the events are dropped, so
+    callers can use it unconditionally. ``close()`` returns the full, unstripped text.
+
+    Args:
+        source (str): Name of the node or agent producing the text
+        strip_thinking (bool): Whether to drop <think> blocks from the streamed text
+    """
+
+    def __init__(self, source: str, strip_thinking: bool = True):
+        """Bind to the stream writer of the running graph, if there is one."""
+        self.source = source
+        self._stripper = ThinkingTokenStripper() if strip_thinking else None
+        self._parts: List[str] = []
+        try:
+            self._writer: Callable[[Any], None] = get_stream_writer()
+        except RuntimeError:
+            self._writer = lambda _: None
+
+    def _write(self, text: str) -> None:
+        if text:
+            self._writer({"type": "token", "source": self.source, "content": text})
+
+    def send(self, text: Optional[str]) -> None:
+        """Record a chunk of model output and stream its visible part."""
+        if not text:
+            return
+        self._parts.append(text)
+        self._write(self._stripper.feed(text) if self._stripper else text)
+
+    def close(self) -> str:
+        """Flush held-back text and return everything sent so far."""
+        if self._stripper:
+            self._write(self._stripper.flush())
+        return "".join(self._parts)
 
 
 def clean_html_content(text: str) -> str:
@@ -57,7 +191,9 @@ def clean_html_content(text: str) -> str:
     Clean HTML content from text to make it suitable for LLM processing.
     
     Removes HTML tags, scripts, and other non-text elements while preserving
-    the actual content.
+    the actual content. Scripts, styles, comments and tags are removed by one
+    precompiled pattern, then whitespace is collapsed. Search functions apply it
+    once per document, so downstream code receives text that is already clean.
     
     Args:
         text (str): The text that may contain HTML
@@ -65,29 +201,16 @@ def clean_html_content(text: str) -> str:
     Returns:
         str: Cleaned text with HTML removed
     """
-    import re
-    
-    # Remove script and style elements completely
-    text = re.sub(r'<script[^>]*>.*?</script>', '', text, flags=re.DOTALL | re.IGNORECASE)
-    text = re.sub(r'<style[^>]*>.*?</style>', '', text, flags=re.DOTALL | re.IGNORECASE)
-    
-    # Remove HTML comments
-    text = re.sub(r'<!--.*?-->', '', text, flags=re.DOTALL)
-    
-    # Remove HTML tags but keep the content
-    text = re.sub(r'<[^>]+>', '', text)
-    
-    # Clean up extra whitespace
-    text = re.sub(r'\s+', ' ', text)
-    text = text.strip()
-    
-    return text
+    if "<" in text:
+        text = _HTML_NOISE_PATTERN.sub("", text)
+    return " ".join(text.split())
 
 
 def deduplicate_and_format_sources(
     search_response: Union[Dict[str, Any], List[Dict[str, Any]]],
     max_tokens_per_source: int,
     fetch_full_page: bool = False,
+    token_counter: Optional[TokenCounter] = None,
 ) -> str:
     """
     Format and deduplicate search responses from various search APIs.
@@ -101,6 +224,8 @@ def deduplicate_and_format_sources(
             - A list of dicts, each containing search results
         max_tokens_per_source (int): Maximum number of tokens to include for each source's content
         fetch_full_page (bool, optional): Whether to include the full page content. Defaults to False.
+        token_counter (TokenCounter, optional): Counter used to truncate the full page content.
+                                                Defaults to the tokenizer-free approximation.
 
     Returns:
         str: Formatted string with deduplicated sources
@@ -129,35 +254,51 @@ def deduplicate_and_format_sources(
         if source["url"] not in unique_sources:
             unique_sources[source["url"]] = source
 
-    # Format output
+    token_counter = token_counter or ApproximateTokenCounter()
+
+    # Format output; search functions already cleaned content and raw_content
     formatted_text = "Sources:\n\n"
     for i, source in enumerate(unique_sources.values(), 1):
         formatted_text += f"Source: {source['title']}\n===\n"
         formatted_text += f"URL: {source['url']}\n===\n"
-        # Clean HTML content from the main content field
-        cleaned_content = clean_html_content(source['content'])
         formatted_text += (
-            f"Most relevant content from source: {cleaned_content}\n===\n"
+            f"Most relevant content from source: {source['content']}\n===\n"
         )
         if fetch_full_page:
-            # Using rough estimate of characters per token
-            char_limit = max_tokens_per_source * CHARS_PER_TOKEN
             # Handle None raw_content
             raw_content = source.get("raw_content", "")
             if raw_content is None:
                 raw_content = ""
                 print(f"Warning: No raw_content found for source {source['url']}")
             
-            # Clean HTML content if present
-            raw_content = clean_html_content(raw_content)
-            
-            if len(raw_content) > char_limit:
-                raw_content = raw_content[:char_limit] + "... [truncated]"
+            truncated_content = token_counter.truncate(raw_content, max_tokens_per_source)
+            if len(truncated_content) < len(raw_content):
+                raw_content = truncated_content + "... [truncated]"
             formatted_text += f"Full source content limited to {max_tokens_per_source} tokens: {raw_content}\n\n"
 
     return formatted_text.strip()
 
 
+def split_formatted_sources(formatted_text: str) -> List[str]:
+    """
+    Split the output of deduplicate_and_format_sources back into one block per source.
+
+    Source contents are whitespace-collapsed when cleaned, so a line starting with
+    "Source: " always begins a new block.
+
+    Args:
+        formatted_text (str): Text produced by deduplicate_and_format_sources
+
+    Returns:
+        List[str]: The source blocks, without the leading "Sources:" header
+    """
+    starts = [match.start() for match in _SOURCE_BLOCK_PATTERN.finditer(formatted_text)]
+    return [
+        formatted_text[start:end].strip()
+        for start, end in zip(starts, starts[1:] + [len(formatted_text)])
+    ]
+
+
 def format_sources(search_results: Dict[str, Any]) -> str:
     """
     Format search results into a bullet-point list of sources with URLs.
@@ -176,64 +317,471 @@ def format_sources(search_results: Dict[str, Any]) -> str:
     )
 
 
-def fetch_raw_content(url: str) -> Optional[str]:
+def cached_search(backend: str):
+    """
+    Decorate a sync or async search function with the two-tier search result cache.
+
+    The wrapped function accepts three extra keyword arguments: ``use_cache``
+    (the cache is opt-in, off by default), ``cache_dir`` (where the SQLite tier
+    lives, see cache.resolve_cache_dir) and ``rate_limiter`` (an object with
+    ``acquire`` and ``aacquire`` methods, waited on before every real search so
+    that cache hits are never throttled). Entries are keyed by backend,
+    normalized query and every other argument of the search function, since any
+    of them can change the response; empty responses are never cached.
+
+    Args:
+        backend (str): Search backend name, used in the cache key and to pick the TTL
+
+    Returns:
+        A decorator for search functions taking ``query`` as first argument
+    """
+    def decorator(search_fn):
+        signature = inspect.signature(search_fn)
+
+        def cache_key(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            return arguments.pop("query"), arguments
+
+        if inspect.iscoroutinefunction(search_fn):
+            @functools.wraps(search_fn)
+            async def async_wrapper(
+                *args, use_cache: bool = False, cache_dir: Optional[str] = None, rate_limiter=None, **kwargs
+            ):
+                if not use_cache:
+                    if rate_limiter is not None:
+                        await rate_limiter.aacquire()
+                    return await search_fn(*args, **kwargs)
+                key = cache_key(args, kwargs)
+                # The disk tier is SQLite; keep its I/O off the event loop
+                cache = await asyncio.to_thread(get_search_cache, cache_dir)
+                cached = await asyncio.to_thread(cache.get, backend, *key)
+                if cached is not None:
+                    return cached
+                if rate_limiter is not None:
+                    await rate_limiter.aacquire()
+                response = await search_fn(*args, **kwargs)
+                if response.get("results"):
+                    await asyncio.to_thread(cache.set, backend, *key, response)
+                return response
+
+            return async_wrapper
+
+        @functools.wraps(search_fn)
+        def wrapper(*args, use_cache: bool = False, cache_dir: Optional[str] = None, rate_limiter=None, **kwargs):
+            if not use_cache:
+                if rate_limiter is not None:
+                    rate_limiter.acquire()
+                return search_fn(*args, **kwargs)
+            key = cache_key(args, kwargs)
+            cache = get_search_cache(cache_dir)
+            cached = cache.get(backend, *key)
+            if cached is not None:
+                return cached
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+            response = search_fn(*args, **kwargs)
+            if response.get("results"):
+                cache.set(backend, *key, response)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def _html_to_markdown(url: str, html_content: str) -> Optional[str]:
+    """
+    Convert the main content of a fetched HTML document to cleaned markdown.
+
+    Shared by the sync and async fetch paths. Returns None for JavaScript-heavy
+    pages and for pages whose converted content is too poor to be useful.
+
+    Args:
+        url (str): The URL the document was fetched from (used for warnings)
+        html_content (str): The raw HTML document
+
+    Returns:
+        Optional[str]: Cleaned markdown content, or None if the page should be skipped
+    """
+    # Skip client-rendered pages (SPA shells) and use the search snippet instead
+    spa_reason = detect_javascript_page(html_content)
+    if spa_reason:
+        logger.warning("Detected JavaScript-heavy page for %s (%s), using search snippet instead", url, spa_reason)
+        return None
+    
+    # Drop scripts, styles and comments, keep only the main content (no nav,
+    # footers, sidebars or ads), then convert that to markdown
+    main_content = extract_main_content(_NON_CONTENT_PATTERN.sub("", html_content))
+    # Imported on first use: markdownify pulls in BeautifulSoup
+    from markdownify import markdownify
+
+    markdown_content = markdownify(main_content, **_MARKDOWNIFY_OPTIONS)
+    
+    # Clean any remaining HTML tags
+    markdown_content = clean_html_content(markdown_content)
+    
+    # Filter out excessive HTML artifacts
+    if len(markdown_content) < 100 or markdown_content.count('<') > 10:
+        logger.warning("Poor content quality for %s, using search snippet instead", url)
+        return None
+        
+    return markdown_content
+
+
+def _lookup_page(
+    url: str, use_page_cache: bool, cache_dir: Optional[str]
+) -> "tuple[Optional[PageCache], Optional[CachedPage]]":
+    """Return the page cache to use (None if disabled) and the cached entry for url, if any."""
+    cache = get_page_cache(cache_dir) if use_page_cache else None
+    return cache, (cache.lookup(url) if cache is not None else None)
+
+
+def _revalidated_page(url: str, cache: PageCache, cached: CachedPage) -> Optional[str]:
+    """Handle a 304 Not Modified answer: refresh the cache entry and reuse its content."""
+    cache.touch(url)
+    return cached.content or None
+
+
+def _is_html_response(response: httpx.Response) -> bool:
+    """Return True if the response headers announce a document we can convert."""
+    content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+    return not content_type or content_type in HTML_CONTENT_TYPES
+
+
+def _store_page(
+    url: str, response: httpx.Response, cache: Optional[PageCache], markdown_content: Optional[str]
+) -> Optional[str]:
+    """Remember a converted page (or an empty entry for a skipped one) in the page cache."""
+    if cache is not None:
+        # An empty entry remembers pages we decided to skip so they are not refetched
+        cache.store(
+            url,
+            markdown_content or "",
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+    return markdown_content
+
+
+def _reject_response(url: str, response: httpx.Response, cache: Optional[PageCache]) -> None:
+    """Skip a non-HTML response without downloading its body."""
+    metrics.increment("fetch.rejected_content_type")
+    logger.warning("Skipping %s, unsupported content type %s", url, response.headers.get("Content-Type"))
+    _store_page(url, response, cache, None)
+
+
+class _BodyDecoder:
+    """
+    Incrementally decode a streamed response body, stopping after ``max_bytes``.
+
+    Chunks are decoded as they arrive, so the raw bytes are never buffered as a
+    whole and decoding cost is bounded by the cap.
+    """
+
+    def __init__(self, response: httpx.Response, max_bytes: int):
+        try:
+            decoder_class = codecs.getincrementaldecoder(response.charset_encoding or "utf-8")
+        except LookupError:
+            decoder_class = codecs.getincrementaldecoder("utf-8")
+        self._decoder = decoder_class(errors="replace")
+        self._parts: List[str] = []
+        self._remaining = max_bytes
+        self.truncated = False
+
+    def feed(self, chunk: bytes) -> bool:
+        """Decode a chunk; return False once the byte cap is reached."""
+        if len(chunk) > self._remaining:
+            chunk = chunk[:self._remaining]
+            self.truncated = True
+        self._remaining -= len(chunk)
+        self._parts.append(self._decoder.decode(chunk))
+        return not self.truncated
+
+    def text(self) -> str:
+        """Return everything decoded so far."""
+        self._parts.append(self._decoder.decode(b"", final=True))
+        if self.truncated:
+            metrics.increment("fetch.truncated")
+        return "".join(self._parts)
+
+
+def _fresh_page(cache: Optional[PageCache], cached: Optional[CachedPage]) -> bool:
+    """Return True if the cached page can be used without a request."""
+    if cached is not None and cached.is_fresh(cache.max_age):
+        metrics.increment("page_cache.fresh_hits")
+        return True
+    return False
+
+
+def fetch_raw_content(
+    url: str,
+    use_page_cache: bool = False,
+    cache_dir: Optional[str] = None,
+    max_bytes: int = FETCH_MAX_BYTES,
+) -> Optional[str]:
     """
     Fetch HTML content from a URL and convert it to markdown format.
 
     Uses a 10-second timeout to avoid hanging on slow sites or large pages.
+    The body is streamed: responses whose Content-Type is not HTML are rejected
+    from the headers alone, and the download stops after ``max_bytes`` bytes,
+    decoding incrementally as chunks arrive.
     Filters out JavaScript-heavy pages and returns None for SPA pages.
+    Converted pages are kept in the disk page cache: fresh entries are served
+    without a request, stale ones are revalidated with a conditional GET.
 
     Args:
         url (str): The URL to fetch content from
+        use_page_cache (bool, optional): Whether to use the page cache. Defaults to False.
+        cache_dir (str, optional): Cache directory, see cache.resolve_cache_dir
+        max_bytes (int, optional): Maximum number of body bytes to download. Defaults to 2 MiB.
 
     Returns:
         Optional[str]: The fetched content converted to markdown if successful,
                       None if any error occurs during fetching or conversion
     """
     try:
-        # Create a client with reasonable timeout
-        with httpx.Client(timeout=10.0) as client:
-            response = client.get(url)
+        cache, cached = _lookup_page(url, use_page_cache, cache_dir)
+        if _fresh_page(cache, cached):
+            return cached.content or None
+        with get_http_client().stream(
+            "GET",
+            url,
+            timeout=FETCH_TIMEOUT,
+            headers=cached.conditional_headers() if cached else None,
+        ) as response:
+            if response.status_code == 304 and cached is not None:
+                return _revalidated_page(url, cache, cached)
             response.raise_for_status()
-            html_content = response.text
-            
-            # Check if this is a JavaScript-heavy page (SPA)
-            js_indicators = [
-                '<div id="root"></div>',
-                '<div id="app"></div>',
-                'react',
-                'vue',
-                'angular',
-                'single page application',
-                'spa'
-            ]
-            
-            # If it's a SPA page, return None to use search snippet instead
-            if any(indicator.lower() in html_content.lower() for indicator in js_indicators):
-                print(f"Warning: Detected JavaScript-heavy page for {url}, using search snippet instead")
-                return None
-            
-            # Convert to markdown
-            markdown_content = markdownify(html_content)
-            
-            # Clean any remaining HTML tags
-            markdown_content = clean_html_content(markdown_content)
-            
-            # Filter out excessive HTML artifacts
-            if len(markdown_content) < 100 or markdown_content.count('<') > 10:
-                print(f"Warning: Poor content quality for {url}, using search snippet instead")
-                return None
-                
-            return markdown_content
-            
+            if not _is_html_response(response):
+                return _reject_response(url, response, cache)
+            body = _BodyDecoder(response, max_bytes)
+            for chunk in response.iter_bytes():
+                if not body.feed(chunk):
+                    break
+        return _store_page(url, response, cache, _html_to_markdown(url, body.text()))
+    except Exception as e:
+        logger.warning("Failed to fetch full page content for %s: %s", url, e)
+        return None
+
+
+async def afetch_raw_content(
+    url: str,
+    client: Optional[httpx.AsyncClient] = None,
+    use_page_cache: bool = False,
+    cache_dir: Optional[str] = None,
+    max_bytes: int = FETCH_MAX_BYTES,
+) -> Optional[str]:
+    """
+    Async variant of fetch_raw_content.
+
+    Args:
+        url (str): The URL to fetch content from
+        client (httpx.AsyncClient, optional): The client to issue the request with.
+                                              Defaults to the shared pooled client.
+        use_page_cache (bool, optional): Whether to use the page cache. Defaults to False.
+        cache_dir (str, optional): Cache directory, see cache.resolve_cache_dir
+        max_bytes (int, optional): Maximum number of body bytes to download. Defaults to 2 MiB.
+
+    Returns:
+        Optional[str]: The fetched content converted to markdown if successful,
+                      None if any error occurs during fetching or conversion
+    """
+    try:
+        # The page cache is SQLite; its lookups and writes run in a worker thread
+        cache, cached = await asyncio.to_thread(_lookup_page, url, use_page_cache, cache_dir)
+        if _fresh_page(cache, cached):
+            return cached.content or None
+        client = client or get_async_http_client()
+        async with client.stream(
+            "GET",
+            url,
+            timeout=FETCH_TIMEOUT,
+            headers=cached.conditional_headers() if cached else None,
+        ) as response:
+            if response.status_code == 304 and cached is not None:
+                return await asyncio.to_thread(_revalidated_page, url, cache, cached)
+            response.raise_for_status()
+            if not _is_html_response(response):
+                return await asyncio.to_thread(_reject_response, url, response, cache)
+            body = _BodyDecoder(response, max_bytes)
+            async for chunk in response.aiter_bytes():
+                if not body.feed(chunk):
+                    break
+        # Extraction and conversion are CPU-bound; off the loop they run in parallel and stay cancellable
+        markdown_content = await asyncio.to_thread(_html_to_markdown, url, body.text())
+        return await asyncio.to_thread(_store_page, url, response, cache, markdown_content)
     except Exception as e:
-        print(f"Warning: Failed to fetch full page content for {url}: {str(e)}")
+        logger.warning("Failed to fetch full page content for %s: %s", url, e)
         return None
 
 
+async def afetch_raw_contents(
+    urls: Iterable[str],
+    max_concurrency: int = 8,
+    per_host_limit: int = 2,
+    deadline: float = 15.0,
+    use_page_cache: bool = False,
+    cache_dir: Optional[str] = None,
+    max_bytes: int = FETCH_MAX_BYTES,
+) -> Dict[str, Optional[str]]:
+    """
+    Fetch several URLs concurrently and return whatever finished in time.
+
+    Requests are bounded by a global concurrency limit and a per-host limit so a
+    batch of results from the same site does not hammer it. Once ``deadline``
+    seconds have passed, unfinished fetches are cancelled and reported as None,
+    so one slow site can no longer hold up the whole batch.
+
+    Args:
+        urls (Iterable[str]): URLs to fetch; duplicates are fetched once
+        max_concurrency (int, optional): Maximum number of requests in flight. Defaults to 8.
+        per_host_limit (int, optional): Maximum number of requests in flight per host. Defaults to 2.
+        deadline (float, optional): Overall time budget in seconds. Defaults to 15.0.
+        use_page_cache (bool, optional): Whether to use the page cache. Defaults to False.
+        cache_dir (str, optional): Cache directory, see cache.resolve_cache_dir
+        max_bytes (int, optional): Maximum number of body bytes per page. Defaults to 2 MiB.
+
+    Returns:
+        Dict[str, Optional[str]]: Mapping from URL to markdown content, None for
+                                  failed, skipped or unfinished fetches
+    """
+    unique_urls = list(dict.fromkeys(urls))
+    results: Dict[str, Optional[str]] = {url: None for url in unique_urls}
+    if not unique_urls:
+        return results
+
+    global_limit = asyncio.Semaphore(max(1, max_concurrency))
+    host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    async def fetch_one(client: httpx.AsyncClient, url: str) -> None:
+        host = urlsplit(url).netloc
+        host_limit = host_limits.setdefault(host, asyncio.Semaphore(max(1, per_host_limit)))
+        async with host_limit, global_limit:
+            results[url] = await afetch_raw_content(url, client, use_page_cache, cache_dir, max_bytes)
+
+    client = get_async_http_client()
+    tasks = [asyncio.create_task(fetch_one(client, url)) for url in unique_urls]
+    done, pending = await asyncio.wait(tasks, timeout=deadline)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+        logger.warning("Fetch deadline of %ss reached, skipped %d of %d pages", deadline, len(pending), len(tasks))
+
+    metrics.increment("fetch.requested", len(unique_urls))
+    metrics.increment("fetch.deadline_skipped", len(pending))
+    metrics.increment("fetch.succeeded", sum(1 for content in results.values() if content))
+    return results
+
+
+def run_coroutine_sync(coro):
+    """
+    Run a coroutine to completion from synchronous code.
+
+    The coroutine runs on the shared background event loop, so async clients and
+    their keep-alive connections survive between calls. Works whether or not an
+    event loop is already running in the calling thread.
+
+    Args:
+        coro: The coroutine to run
+
+    Returns:
+        The coroutine's result
+    """
+    return run_in_background_loop(coro)
+
+
+def fetch_raw_contents(urls: Iterable[str], **fetch_options: Any) -> Dict[str, Optional[str]]:
+    """
+    Fetch several URLs concurrently from synchronous code, see afetch_raw_contents.
+
+    Args:
+        urls (Iterable[str]): URLs to fetch
+        **fetch_options: Limits, deadline and page cache options, see afetch_raw_contents
+
+    Returns:
+        Dict[str, Optional[str]]: Mapping from URL to markdown content or None
+    """
+    return run_coroutine_sync(afetch_raw_contents(urls, **fetch_options))
+
+
+def _attach_raw_contents(
+    results: List[Dict[str, Any]], fetch_options: Optional[Dict[str, Any]] = None
+) -> None:
+    """Fetch full pages for all results in parallel and replace raw_content in place."""
+    fetched = fetch_raw_contents(
+        [result["url"] for result in results], **(fetch_options or {})
+    )
+    _merge_raw_contents(results, fetched)
+
+
+async def _aattach_raw_contents(
+    results: List[Dict[str, Any]], fetch_options: Optional[Dict[str, Any]] = None
+) -> None:
+    """Async variant of _attach_raw_contents."""
+    fetched = await afetch_raw_contents(
+        [result["url"] for result in results], **(fetch_options or {})
+    )
+    _merge_raw_contents(results, fetched)
+
+
+def _merge_raw_contents(results: List[Dict[str, Any]], fetched: Dict[str, Optional[str]]) -> None:
+    """Replace raw_content with fetched page content where the fetch succeeded."""
+    for result in results:
+        if fetched.get(result["url"]):
+            result["raw_content"] = fetched[result["url"]]
+
+
+def _search_result(
+    raw_result: Dict[str, Any], url_key: str, title_key: str, content_key: str, source_name: str
+) -> Optional[Dict[str, Any]]:
+    """Normalize one raw search hit; raw_content starts as the snippet and may be replaced later."""
+    url = raw_result.get(url_key)
+    title = raw_result.get(title_key)
+    content = raw_result.get(content_key)
+
+    if not all([url, title, content]):
+        logger.warning("Incomplete result from %s: %s", source_name, raw_result)
+        return None
+
+    content = clean_html_content(content)
+    return {
+        "title": title,
+        "url": url,
+        "content": content,
+        "raw_content": content,
+    }
+
+
+def _duckduckgo_results(search_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Normalize DDGS text results."""
+    results = []
+    for r in search_results:
+        result = _search_result(r, "href", "title", "body", "DuckDuckGo")
+        if result:
+            results.append(result)
+    return results
+
+
+def _duckduckgo_text(query: str, max_results: int) -> List[Dict[str, Any]]:
+    """Run a blocking DDGS text search."""
+    # Only loaded when DuckDuckGo is the selected search API
+    from duckduckgo_search import DDGS
+
+    with DDGS() as ddgs:
+        return list(ddgs.text(query, max_results=max_results))
+
+
 @traceable
+@cached_search("duckduckgo")
 def duckduckgo_search(
-    query: str, max_results: int = 3, fetch_full_page: bool = False
+    query: str,
+    max_results: int = 3,
+    fetch_full_page: bool = False,
+    fetch_options: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, List[Dict[str, Any]]]:
     """
     Search the web using DuckDuckGo and return formatted results.
@@ -245,6 +793,8 @@ def duckduckgo_search(
         max_results (int, optional): Maximum number of results to return. Defaults to 3.
         fetch_full_page (bool, optional): Whether to fetch full page content from result URLs.
                                          Defaults to False.
+        fetch_options (Dict[str, Any], optional): Concurrency limits and deadline for the
+                                                  full page fetch, see afetch_raw_contents.
     Returns:
         Dict[str, List[Dict[str, Any]]]: Search response containing:
             - results (list): List of search result dictionaries, each containing:
@@ -255,49 +805,69 @@ def duckduckgo_search(
                                             otherwise same as content
     """
     try:
-        with DDGS() as ddgs:
-            results = []
-            search_results = list(ddgs.text(query, max_results=max_results))
-
-            for r in search_results:
-                url = r.get("href")
-                title = r.get("title")
-                content = r.get("body")
-
-                if not all([url, title, content]):
-                    print(f"Warning: Incomplete result from DuckDuckGo: {r}")
-                    continue
-
-                raw_content = content
-                if fetch_full_page:
-                    fetched_content = fetch_raw_content(url)
-                    if fetched_content:
-                        raw_content = fetched_content
-
-                # Add result to list
-                result = {
-                    "title": title,
-                    "url": url,
-                    "content": content,
-                    "raw_content": raw_content,
-                }
-                results.append(result)
-
-            return {"results": results}
+        results = _duckduckgo_results(_duckduckgo_text(query, max_results))
+        if fetch_full_page:
+            _attach_raw_contents(results, fetch_options)
+        return {"results": results}
+    except Exception as e:
+        logger.warning("Error in DuckDuckGo search: %s: %s", type(e).__name__, e)
+        return {"results": []}
+
+
+@traceable
+@cached_search("duckduckgo")
+async def aduckduckgo_search(
+    query: str,
+    max_results: int = 3,
+    fetch_full_page: bool = False,
+    fetch_options: Optional[Dict[str, Any]] = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Async variant of duckduckgo_search.
+
+    The DDGS library has no async API, so the search call runs in a worker
+    thread; the full page fetch is natively async.
+    """
+    try:
+        search_results = await asyncio.to_thread(_duckduckgo_text, query, max_results)
+        results = _duckduckgo_results(search_results)
+        if fetch_full_page:
+            await _aattach_raw_contents(results, fetch_options)
+        return {"results": results}
     except Exception as e:
-        print(f"Error in DuckDuckGo search: {str(e)}")
-        print(f"Full error details: {type(e).__name__}")
+        logger.warning("Error in DuckDuckGo search: %s: %s", type(e).__name__, e)
         return {"results": []}
 
 
+def _searxng_request(query: str) -> "tuple[str, Dict[str, str]]":
+    """Return the SearXNG search URL and query parameters."""
+    host = os.environ.get("SEARXNG_URL", "http://localhost:8888").rstrip("/")
+    search_url = host if host.endswith("/search") else host + "/search"
+    return search_url, {"q": query, "language": "en", "format": "json"}
+
+
+def _searxng_results(data: Dict[str, Any], max_results: int) -> List[Dict[str, Any]]:
+    """Normalize a SearXNG JSON response."""
+    results = []
+    for r in data.get("results", [])[:max_results]:
+        result = _search_result(r, "url", "title", "content", "SearXNG")
+        if result:
+            results.append(result)
+    return results
+
+
 @traceable
+@cached_search("searxng")
 def searxng_search(
-    query: str, max_results: int = 3, fetch_full_page: bool = False
+    query: str,
+    max_results: int = 3,
+    fetch_full_page: bool = False,
+    fetch_options: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, List[Dict[str, Any]]]:
     """
     Search the web using SearXNG and return formatted results.
 
-    Uses the SearxSearchWrapper to perform searches through a SearXNG instance.
+    Queries the JSON API of a SearXNG instance through the shared HTTP client.
     The SearXNG host URL is read from the SEARXNG_URL environment variable
     or defaults to http://localhost:8888.
 
@@ -306,6 +876,8 @@ def searxng_search(
         max_results (int, optional): Maximum number of results to return. Defaults to 3.
         fetch_full_page (bool, optional): Whether to fetch full page content from result URLs.
                                          Defaults to False.
+        fetch_options (Dict[str, Any], optional): Concurrency limits and deadline for the
+                                                  full page fetch, see afetch_raw_contents.
 
     Returns:
         Dict[str, List[Dict[str, Any]]]: Search response containing:
@@ -316,63 +888,39 @@ def searxng_search(
                 - raw_content (str or None): Full page content if fetch_full_page is True,
                                            otherwise same as content
     """
-    host = os.environ.get("SEARXNG_URL", "http://localhost:8888")
-    s = SearxSearchWrapper(searx_host=host)
+    search_url, params = _searxng_request(query)
+    response = get_http_client().get(search_url, params=params)
+    response.raise_for_status()
 
-    results = []
-    search_results = s.results(query, num_results=max_results)
-    for r in search_results:
-        url = r.get("link")
-        title = r.get("title")
-        content = r.get("snippet")
+    results = _searxng_results(response.json(), max_results)
+    if fetch_full_page:
+        _attach_raw_contents(results, fetch_options)
 
-        if not all([url, title, content]):
-            print(f"Warning: Incomplete result from SearXNG: {r}")
-            continue
-
-        raw_content = content
-        if fetch_full_page:
-            fetched_content = fetch_raw_content(url)
-            if fetched_content:
-                raw_content = fetched_content
-
-        # Add result to list
-        result = {
-            "title": title,
-            "url": url,
-            "content": content,
-            "raw_content": raw_content,
-        }
-        results.append(result)
     return {"results": results}
 
 
 @traceable
-def tavily_search(
-    query: str, fetch_full_page: bool = True, max_results: int = 3
+@cached_search("searxng")
+async def asearxng_search(
+    query: str,
+    max_results: int = 3,
+    fetch_full_page: bool = False,
+    fetch_options: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, List[Dict[str, Any]]]:
-    """
-    Search the web using the Tavily API and return formatted results.
+    """Async variant of searxng_search using the pooled AsyncClient."""
+    search_url, params = _searxng_request(query)
+    response = await get_async_http_client().get(search_url, params=params)
+    response.raise_for_status()
 
-    Uses the TavilyClient to perform searches. Tavily API key must be configured
-    in the environment.
+    results = _searxng_results(response.json(), max_results)
+    if fetch_full_page:
+        await _aattach_raw_contents(results, fetch_options)
 
-    Args:
-        query (str): The search query to execute
-        fetch_full_page (bool, optional): Whether to include raw content from sources.
-                                         Defaults to True.
-        max_results (int, optional): Maximum number of results to return. Defaults to 3.
+    return {"results": results}
 
-    Returns:
-        Dict[str, List[Dict[str, Any]]]: Search response containing:
-            - results (list): List of search result dictionaries, each containing:
-                - title (str): Title of the search result
-                - url (str): URL of the search result
-                - content (str): Snippet/summary of the content
-                - raw_content (str or None): Full content of the page if available and
-                                            fetch_full_page is True
-    """
 
+def _tavily_query(query: str) -> "tuple[str, str]":
+    """Return the Tavily API key and the query truncated to Tavily's length limit."""
     # Get API key from environment
     api_key = os.getenv("TAVILY_API_KEY")
     if not api_key:
@@ -391,41 +939,69 @@ def tavily_search(
         else:
             query = truncated_query
         print(f"Truncated query: {query}")
-    
-    tavily_client = TavilyClient(api_key=api_key)
-    return tavily_client.search(
-        query, max_results=max_results, include_raw_content=fetch_full_page
-    )
+    return api_key, query
+
+
+def _tavily_results(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Clean the content and raw_content of each Tavily result in place."""
+    for result in response.get("results", []):
+        result["content"] = clean_html_content(result.get("content") or "")
+        if result.get("raw_content"):
+            result["raw_content"] = clean_html_content(result["raw_content"])
+    return response
 
 
 @traceable
-def perplexity_search(
-    query: str, perplexity_search_loop_count: int = 0
-) -> Dict[str, Any]:
+@cached_search("tavily")
+def tavily_search(
+    query: str, fetch_full_page: bool = True, max_results: int = 3
+) -> Dict[str, List[Dict[str, Any]]]:
     """
-    Search the web using the Perplexity API and return formatted results.
+    Search the web using the Tavily API and return formatted results.
 
-    Uses the Perplexity API to perform searches with the 'sonar-pro' model.
-    Requires a PERPLEXITY_API_KEY environment variable to be set.
+    Uses the shared TavilyClient to perform searches. Tavily API key must be configured
+    in the environment.
 
     Args:
         query (str): The search query to execute
-        perplexity_search_loop_count (int, optional): The loop step for perplexity search
-                                                     (used for source labeling). Defaults to 0.
+        fetch_full_page (bool, optional): Whether to include raw content from sources.
+                                         Defaults to True.
+        max_results (int, optional): Maximum number of results to return. Defaults to 3.
 
     Returns:
-        Dict[str, Any]: Search response containing:
+        Dict[str, List[Dict[str, Any]]]: Search response containing:
             - results (list): List of search result dictionaries, each containing:
-                - title (str): Title of the search result (includes search counter)
-                - url (str): URL of the citation source
-                - content (str): Content of the response or reference to main content
-                - raw_content (str or None): Full content for the first source, None for additional
-                                            citation sources
-
-    Raises:
-        requests.exceptions.HTTPError: If the API request fails
+                - title (str): Title of the search result
+                - url (str): URL of the search result
+                - content (str): Snippet/summary of the content
+                - raw_content (str or None): Full content of the page if available and
+                                            fetch_full_page is True
     """
+    api_key, query = _tavily_query(query)
+    tavily_client = get_tavily_client(api_key)
+    return _tavily_results(tavily_client.search(
+        query, max_results=max_results, include_raw_content=fetch_full_page
+    ))
+
+
+@traceable
+@cached_search("tavily")
+async def atavily_search(
+    query: str, fetch_full_page: bool = True, max_results: int = 3
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Async variant of tavily_search using AsyncTavilyClient."""
+    api_key, query = _tavily_query(query)
+    tavily_client = get_async_tavily_client(api_key)
+    return _tavily_results(await tavily_client.search(
+        query, max_results=max_results, include_raw_content=fetch_full_page
+    ))
+
 
+PERPLEXITY_URL = "https://api.perplexity.ai/chat/completions"
+
+
+def _perplexity_request(query: str) -> "tuple[Dict[str, str], Dict[str, Any]]":
+    """Return the headers and payload for a Perplexity search request."""
     headers = {
         "accept": "application/json",
         "content-type": "application/json",
@@ -442,15 +1018,12 @@ def perplexity_search(
             {"role": "user", "content": query},
         ],
     }
+    return headers, payload
 
-    response = requests.post(
-        "https://api.perplexity.ai/chat/completions", headers=headers, json=payload
-    )
-    response.raise_for_status()  # Raise exception for bad status codes
 
-    # Parse the response
-    data = response.json()
-    content = data["choices"][0]["message"]["content"]
+def _perplexity_results(data: Dict[str, Any], perplexity_search_loop_count: int) -> Dict[str, Any]:
+    """Turn a Perplexity chat completion into search results, one per citation."""
+    content = clean_html_content(data["choices"][0]["message"]["content"])
 
     # Perplexity returns a list of citations for a single search result
     citations = data.get("citations", ["https://perplexity.ai"])
@@ -477,3 +1050,53 @@ def perplexity_search(
         )
 
     return {"results": results}
+
+
+@traceable
+@cached_search("perplexity")
+def perplexity_search(
+    query: str, perplexity_search_loop_count: int = 0
+) -> Dict[str, Any]:
+    """
+    Search the web using the Perplexity API and return formatted results.
+
+    Uses the Perplexity API to perform searches with the 'sonar-pro' model.
+    Requires a PERPLEXITY_API_KEY environment variable to be set.
+
+    Args:
+        query (str): The search query to execute
+        perplexity_search_loop_count (int, optional): The loop step for perplexity search
+                                                     (used for source labeling). Defaults to 0.
+
+    Returns:
+        Dict[str, Any]: Search response containing:
+            - results (list): List of search result dictionaries, each containing:
+                - title (str): Title of the search result (includes search counter)
+                - url (str): URL of the citation source
+                - content (str): Content of the response or reference to main content
+                - raw_content (str or None): Full content for the first source, None for additional
+                                            citation sources
+
+    Raises:
+        httpx.HTTPStatusError: If the API request fails
+    """
+    headers, payload = _perplexity_request(query)
+    response = get_http_client().post(
+        PERPLEXITY_URL, headers=headers, json=payload, timeout=PERPLEXITY_TIMEOUT
+    )
+    response.raise_for_status()  # Raise exception for bad status codes
+    return _perplexity_results(response.json(), perplexity_search_loop_count)
+
+
+@traceable
+@cached_search("perplexity")
+async def aperplexity_search(
+    query: str, perplexity_search_loop_count: int = 0
+) -> Dict[str, Any]:
+    """Async variant of perplexity_search using the pooled AsyncClient."""
+    headers, payload = _perplexity_request(query)
+    response = await get_async_http_client().post(
+        PERPLEXITY_URL, headers=headers, json=payload, timeout=PERPLEXITY_TIMEOUT
+    )
+    response.raise_for_status()  # Raise exception for bad status codes
+    return _perplexity_results(response.json(), perplexity_search_loop_count)
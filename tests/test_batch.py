@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from Langgraph_deep_researcher.batch import load_topics
+
+
+def _write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_load_topics_jsonl(tmp_path):
+    path = _write(
+        tmp_path,
+        "topics.jsonl",
+        "\n".join([
+            "# comment",
+            json.dumps({"id": "llm", "topic": "Large language models", "out": "reports/llm.md"}),
+            "",
+            json.dumps("量子计算 的进展"),
+            json.dumps({"topic": " Solar power "}),
+        ]),
+    )
+    topics = load_topics(path)
+    assert [(t.id, t.topic, t.out) for t in topics] == [
+        ("llm", "Large language models", "reports/llm.md"),
+        ("002-量子计算-的进展", "量子计算 的进展", "002-量子计算-的进展.md"),
+        ("003-solar-power", "Solar power", "003-solar-power.md"),
+    ]
+
+
+def test_load_topics_csv_with_header(tmp_path):
+    path = _write(tmp_path, "topics.csv", "ID,Topic,Out\nllm,Large language models,\n,\"Wind, and solar\",energy.md\n")
+    topics = load_topics(path)
+    assert [(t.id, t.topic, t.out) for t in topics] == [
+        ("llm", "Large language models", "llm.md"),
+        ("002-wind-and-solar", "Wind, and solar", "energy.md"),
+    ]
+
+
+def test_load_topics_csv_without_header(tmp_path):
+    path = _write(tmp_path, "topics.csv", "First topic,ignored\n\nSecond topic\n")
+    assert [t.topic for t in load_topics(path)] == ["First topic", "Second topic"]
+
+
+@pytest.mark.parametrize(
+    "rows, message",
+    [
+        ([{"id": "a", "topic": "x"}, {"id": "a", "topic": "y"}], "duplicate topic id a"),
+        ([{"topic": "x", "out": "same.md"}, {"topic": "y", "out": "same.md"}], "both write same.md"),
+        ([{"topic": "x", "out": "r/a.md"}, {"topic": "y", "out": "r/./a.md"}], "both write r/./a.md"),
+        # A derived report name can collide with an explicit one
+        ([{"id": "a", "topic": "x"}, {"id": "b", "topic": "y", "out": "a.md"}], "topics a and b both write a.md"),
+        ([{"topic": "x"}, {"topic": " "}], "entry 2 has no topic"),
+    ],
+)
+def test_load_topics_rejects_invalid_entries(tmp_path, rows, message):
+    path = _write(tmp_path, "topics.jsonl", "\n".join(json.dumps(row) for row in rows))
+    with pytest.raises(ValueError, match=message):
+        load_topics(path)
+
+
+def test_load_topics_rejects_unknown_formats(tmp_path):
+    with pytest.raises(ValueError, match="expected .jsonl or .csv"):
+        load_topics(_write(tmp_path, "topics.txt", "topic"))
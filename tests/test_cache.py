@@ -0,0 +1,152 @@
+import itertools
+
+import pytest
+
+from Langgraph_deep_researcher import cache
+from Langgraph_deep_researcher.utils import cached_search
+
+RESPONSE = {"results": [{"title": "t", "url": "https://example.com", "content": "c", "raw_content": None}]}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Deterministic time.time() for the cache module; advance with clock.now += seconds."""
+
+    class Clock:
+        now = 1_000_000.0
+
+    ticks = itertools.count()
+
+    def fake_time():
+        # Distinct, increasing timestamps keep LRU order well defined
+        return Clock.now + next(ticks) * 1e-3
+
+    monkeypatch.setattr(cache.time, "time", fake_time)
+    return Clock
+
+
+def test_search_cache_normalizes_queries(tmp_path):
+    search_cache = cache.SearchCache(tmp_path / "search.sqlite3")
+    search_cache.set("duckduckgo", "  Large   Language MODELS ", {"max_results": 3}, RESPONSE)
+    assert search_cache.get("duckduckgo", "large language models", {"max_results": 3}) == RESPONSE
+    assert search_cache.get("tavily", "large language models", {"max_results": 3}) is None
+
+
+def test_search_cache_keys_on_all_arguments(tmp_path):
+    search_cache = cache.SearchCache(tmp_path / "search.sqlite3")
+    search_cache.set("perplexity", "q", {"perplexity_search_loop_count": 0}, RESPONSE)
+    assert search_cache.get("perplexity", "q", {"perplexity_search_loop_count": 1}) is None
+    assert search_cache.get("perplexity", "q", {"perplexity_search_loop_count": 0}) == RESPONSE
+
+
+def test_search_cache_ttl(tmp_path, clock, monkeypatch):
+    monkeypatch.setenv("SEARCH_CACHE_TTL_DUCKDUCKGO", "60")
+    path = tmp_path / "search.sqlite3"
+    cache.SearchCache(path).set("duckduckgo", "q", {}, RESPONSE)
+
+    assert cache.SearchCache(path).get("duckduckgo", "q", {}) == RESPONSE
+    clock.now += 61
+    assert cache.SearchCache(path).get("duckduckgo", "q", {}) is None
+
+
+def test_search_cache_memory_tier_is_lru(tmp_path):
+    search_cache = cache.SearchCache(None, max_memory_entries=2)
+    for query in ("a", "b"):
+        search_cache.set("duckduckgo", query, {}, RESPONSE)
+    search_cache.get("duckduckgo", "a", {})
+    search_cache.set("duckduckgo", "c", {}, RESPONSE)
+    assert search_cache.get("duckduckgo", "b", {}) is None
+    assert search_cache.get("duckduckgo", "a", {}) == RESPONSE
+    assert search_cache.get("duckduckgo", "c", {}) == RESPONSE
+
+
+def test_search_cache_drops_tables_of_older_schemas(tmp_path):
+    import sqlite3
+
+    path = tmp_path / "search.sqlite3"
+    conn = sqlite3.connect(str(path))
+    conn.execute(
+        "CREATE TABLE search_cache (backend TEXT, query TEXT, max_results INTEGER, full_page INTEGER, "
+        "expires_at REAL, response TEXT)"
+    )
+    conn.commit()
+    conn.close()
+
+    search_cache = cache.SearchCache(path)
+    search_cache.set("duckduckgo", "q", {}, RESPONSE)
+    assert cache.SearchCache(path).get("duckduckgo", "q", {}) == RESPONSE
+
+
+def test_cached_search_keys_on_every_argument(tmp_path):
+    calls = []
+
+    @cached_search("perplexity")
+    def search(query, perplexity_search_loop_count=0):
+        calls.append(perplexity_search_loop_count)
+        return {"results": [{**RESPONSE["results"][0], "title": f"Perplexity Search {perplexity_search_loop_count + 1}"}]}
+
+    cache_dir = str(tmp_path)
+    first = search("q", perplexity_search_loop_count=0, use_cache=True, cache_dir=cache_dir)
+    second = search("q", perplexity_search_loop_count=1, use_cache=True, cache_dir=cache_dir)
+    again = search("q", 0, use_cache=True, cache_dir=cache_dir)
+    assert first["results"][0]["title"] == "Perplexity Search 1"
+    assert second["results"][0]["title"] == "Perplexity Search 2"
+    assert again == first
+    assert calls == [0, 1]
+
+
+def test_cached_search_is_opt_in(tmp_path):
+    calls = []
+
+    @cached_search("duckduckgo")
+    def search(query, max_results=3):
+        calls.append(query)
+        return RESPONSE
+
+    search("q", cache_dir=str(tmp_path))
+    search("q", cache_dir=str(tmp_path))
+    assert calls == ["q", "q"]
+
+
+def test_page_cache_deduplicates_and_evicts_lru(tmp_path, clock):
+    page_cache = cache.PageCache(tmp_path / "pages.sqlite3", max_bytes=10, max_age=3600)
+    page_cache.store("https://a", "aaaa")
+    page_cache.store("https://a-mirror", "aaaa")
+    page_cache.store("https://b", "bbbb")
+    assert page_cache.lookup("https://a") is not None
+
+    page_cache.store("https://c", "cccc")
+    assert page_cache.lookup("https://b") is None
+    assert page_cache.lookup("https://a").content == "aaaa"
+    assert page_cache.lookup("https://c").content == "cccc"
+
+
+def test_page_cache_freshness_and_revalidation(tmp_path, clock):
+    page_cache = cache.PageCache(tmp_path / "pages.sqlite3", max_bytes=1000, max_age=60)
+    page_cache.store("https://a", "body", etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+    page = page_cache.lookup("https://a")
+    assert page.is_fresh(page_cache.max_age)
+    assert page.conditional_headers() == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+    }
+
+    clock.now += 120
+    assert not page_cache.lookup("https://a").is_fresh(page_cache.max_age)
+    page_cache.touch("https://a")
+    assert page_cache.lookup("https://a").is_fresh(page_cache.max_age)
+
+
+def test_llm_cache_evicts_least_recently_used(tmp_path, clock):
+    llm_cache = cache.LLMCache(tmp_path / "llm.sqlite3", max_bytes=60)
+    keys = [cache.LLMCache.make_key("openai", "gpt-4o", [{"role": "user", "content": str(i)}]) for i in range(3)]
+    assert len(set(keys)) == 3
+
+    llm_cache.set(keys[0], {"content": "first"})
+    llm_cache.set(keys[1], {"content": "second"})
+    assert llm_cache.get(keys[0]) == {"content": "first"}
+    llm_cache.set(keys[2], {"content": "third"})
+
+    assert llm_cache.get(keys[1]) is None
+    assert llm_cache.get(keys[0]) == {"content": "first"}
+    assert llm_cache.get(keys[2]) == {"content": "third"}
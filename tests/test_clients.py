@@ -0,0 +1,54 @@
+import asyncio
+
+from Langgraph_deep_researcher import clients, http_client
+
+
+class FakeAsyncClient:
+    closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeSyncClient:
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_aclose_clients_closes_the_loop_clients():
+    async def run():
+        client = clients._get_or_create_async(("fake", "async"), FakeAsyncClient)
+        assert clients._get_or_create_async(("fake", "async"), FakeAsyncClient) is client
+        await clients.aclose_clients()
+        await clients.aclose_clients()
+        return client, clients._get_or_create_async(("fake", "async"), FakeAsyncClient)
+
+    client, recreated = asyncio.run(run())
+    assert client.closed
+    assert recreated is not client
+
+
+def test_async_clients_are_per_loop():
+    async def get():
+        return clients._get_or_create_async(("fake", "per-loop"), FakeAsyncClient)
+
+    assert asyncio.run(get()) is not asyncio.run(get())
+
+
+def test_close_clients_closes_sync_clients():
+    client = clients._get_or_create(("fake", "sync"), FakeSyncClient)
+    clients.close_clients()
+    assert client.closed
+    assert clients._get_or_create(("fake", "sync"), FakeSyncClient) is not client
+    clients.close_clients()
+
+
+def test_aclose_http_clients_closes_the_loop_client():
+    async def run():
+        client = http_client.get_async_http_client()
+        await http_client.aclose_http_clients()
+        return client
+
+    assert asyncio.run(run()).is_closed
@@ -0,0 +1,49 @@
+import pytest
+
+from Langgraph_deep_researcher import extraction
+
+pytest.importorskip("lxml")
+
+PARAGRAPH = "<p>" + "This sentence belongs to the article body, with commas, clauses and words. " * 4 + "</p>"
+
+
+@pytest.mark.parametrize("wrapper_class", ["container has-sidebar", "with-sidebar", "comments-enabled"])
+def test_negative_hint_wrapper_keeps_article(wrapper_class):
+    html = (
+        f'<html><body><div class="{wrapper_class}">'
+        f'<div class="post">{PARAGRAPH * 4}</div>'
+        '<div class="sidebar"><p>Popular posts, tags and other sidebar links</p></div>'
+        "</div></body></html>"
+    )
+    content = extraction.extract_main_content(html)
+    assert "belongs to the article body" in content
+    assert "sidebar links" not in content
+
+
+@pytest.mark.parametrize("wrapper_class", ["container has-sidebar", "comments-enabled"])
+def test_negative_hint_element_holding_paragraphs_is_kept(wrapper_class):
+    html = f'<html><body><div class="{wrapper_class}">{PARAGRAPH * 3}</div></body></html>'
+    assert "belongs to the article body" in extraction.extract_main_content(html)
+
+
+def test_boilerplate_is_removed():
+    html = (
+        "<html><body><nav><a href='/'>Home</a><a href='/about'>About</a></nav>"
+        f"<div id='content'>{PARAGRAPH * 3}</div>"
+        "<footer>Copyright notice and footer links</footer></body></html>"
+    )
+    content = extraction.extract_main_content(html)
+    assert "belongs to the article body" in content
+    assert "Home" not in content
+    assert "Copyright" not in content
+
+
+def test_article_element_wins():
+    html = f"<html><body><div>{PARAGRAPH}</div><article><h1>Title</h1>{PARAGRAPH * 2}</article></body></html>"
+    content = extraction.extract_main_content(html)
+    assert content.startswith("<article")
+
+
+def test_short_page_falls_back_to_full_page():
+    html = "<html><body><div class='menu'><p>Short text only</p></div></body></html>"
+    assert "Short text only" in extraction.extract_main_content(html)
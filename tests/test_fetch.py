@@ -0,0 +1,152 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from Langgraph_deep_researcher import metrics, utils
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset_metrics()
+    yield
+    metrics.reset_metrics()
+
+
+@pytest.fixture
+def passthrough(monkeypatch):
+    """Skip extraction so the tests see the fetched body as the page content."""
+    monkeypatch.setattr(utils, "_html_to_markdown", lambda url, html: html)
+
+
+def _use_transport(monkeypatch, handler):
+    """Route the shared async client through an httpx.MockTransport."""
+    monkeypatch.setattr(
+        utils, "get_async_http_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+
+
+class InFlight:
+    """Track the peak number of concurrent requests, overall and per host."""
+
+    def __init__(self):
+        self.hosts = {}
+        self.peak_total = 0
+        self.peak_host = 0
+
+    async def handler(self, request):
+        host = request.url.host
+        self.hosts[host] = self.hosts.get(host, 0) + 1
+        self.peak_total = max(self.peak_total, sum(self.hosts.values()))
+        self.peak_host = max(self.peak_host, self.hosts[host])
+        await asyncio.sleep(0.02)
+        self.hosts[host] -= 1
+        return httpx.Response(200, text=f"page {request.url}", headers={"Content-Type": "text/html"})
+
+
+def test_afetch_raw_contents_respects_the_per_host_limit(monkeypatch, passthrough):
+    in_flight = InFlight()
+    _use_transport(monkeypatch, in_flight.handler)
+    urls = [f"https://same.example/{i}" for i in range(6)]
+
+    results = asyncio.run(utils.afetch_raw_contents(urls, max_concurrency=8, per_host_limit=2))
+    assert in_flight.peak_host == 2
+    assert results == {url: f"page {url}" for url in urls}
+
+
+def test_afetch_raw_contents_respects_the_global_limit(monkeypatch, passthrough):
+    in_flight = InFlight()
+    _use_transport(monkeypatch, in_flight.handler)
+    urls = [f"https://host{i}.example/" for i in range(8)]
+
+    results = asyncio.run(utils.afetch_raw_contents(urls + urls[:2], max_concurrency=3, per_host_limit=2))
+    assert in_flight.peak_total == 3
+    assert len(results) == 8 and all(results.values())
+    assert metrics.get_metrics("fetch.requested") == {"fetch.requested": 8}
+
+
+def test_afetch_raw_contents_deadline_covers_page_conversion(monkeypatch):
+    def slow_conversion(url, html):
+        time.sleep(0.5)
+        return html
+
+    monkeypatch.setattr(utils, "_html_to_markdown", slow_conversion)
+    _use_transport(monkeypatch, lambda request: httpx.Response(200, text="page", headers={"Content-Type": "text/html"}))
+    urls = [f"https://host{i}.example/" for i in range(4)]
+
+    async def run():
+        started = time.perf_counter()
+        results = await utils.afetch_raw_contents(urls, deadline=0.2)
+        return results, time.perf_counter() - started
+
+    results, elapsed = asyncio.run(run())
+    assert elapsed < 0.45
+    assert results == {url: None for url in urls}
+    assert metrics.get_metrics("fetch.deadline_skipped") == {"fetch.deadline_skipped": 4}
+
+
+class ChunkStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """Response body delivered in the given chunks; records how many were read."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.read = 0
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            self.read += 1
+            yield chunk
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            self.read += 1
+            yield chunk
+
+
+def _fetch(monkeypatch, mode, handler, **options):
+    """Fetch one page through the sync or async fetcher with a mocked transport."""
+    url = "https://example.com/page"
+    transport = httpx.MockTransport(handler)
+    if mode == "sync":
+        monkeypatch.setattr(utils, "get_http_client", lambda: httpx.Client(transport=transport))
+        return utils.fetch_raw_content(url, **options)
+    return asyncio.run(utils.afetch_raw_content(url, httpx.AsyncClient(transport=transport), **options))
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_fetch_rejects_non_html_without_reading_the_body(monkeypatch, passthrough, mode):
+    body = ChunkStream([b"%PDF-1.7"] * 3)
+    content = _fetch(
+        monkeypatch, mode, lambda request: httpx.Response(200, headers={"Content-Type": "application/pdf"}, stream=body)
+    )
+    assert content is None
+    assert body.read == 0
+    assert metrics.get_metrics("fetch.") == {"fetch.rejected_content_type": 1}
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_fetch_stops_at_max_bytes(monkeypatch, passthrough, mode):
+    body = ChunkStream([b"a" * 8, b"b" * 8, b"c" * 8, b"d" * 8])
+    content = _fetch(
+        monkeypatch, mode, lambda request: httpx.Response(200, headers={"Content-Type": "text/html"}, stream=body),
+        max_bytes=12,
+    )
+    assert content == "a" * 8 + "b" * 4
+    assert body.read == 2
+    assert metrics.get_metrics("fetch.") == {"fetch.truncated": 1}
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_fetch_decodes_characters_split_across_chunks(monkeypatch, passthrough, mode):
+    encoded = "Café 研究".encode("utf-8")
+    # Split inside "é" and inside "研"
+    chunks = [encoded[:4], encoded[4:7], encoded[7:]]
+    body = ChunkStream(chunks)
+    content = _fetch(
+        monkeypatch,
+        mode,
+        lambda request: httpx.Response(200, headers={"Content-Type": "text/html; charset=utf-8"}, stream=body),
+    )
+    assert content == "Café 研究"
+    assert metrics.get_metrics("fetch.") == {}
@@ -0,0 +1,204 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from Langgraph_deep_researcher import cache, graph, search_backends
+from Langgraph_deep_researcher.configuration import Configuration
+from Langgraph_deep_researcher.prompts import summarizer_instructions
+from Langgraph_deep_researcher.search_backends import SearchCapabilities
+
+
+class FakeBackend:
+    """Search backend answering every query with one result about it."""
+
+    name = "fake"
+    capabilities = SearchCapabilities(raw_content=False, max_results=1)
+
+    def __init__(self):
+        self.queries = []
+
+    def _results(self, query, options):
+        self.queries.append((options.research_loop_count, query))
+        slug = query.lower().replace(" ", "-")
+        return {"results": [{
+            "title": f"About {query}",
+            "url": f"https://example.com/{slug}",
+            "content": f"Findings on {query}.",
+            "raw_content": None,
+        }]}
+
+    def search(self, query, options):
+        return self._results(query, options)
+
+    async def asearch(self, query, options):
+        return self._results(query, options)
+
+
+class FakeChatModel:
+    """Chat model answering query and reflection prompts with JSON and summarizing with a fixed text."""
+
+    def __init__(self, queries, follow_ups):
+        self.queries = queries
+        self.follow_ups = follow_ups
+        self.calls = []
+        self.summarized_sources = []
+
+    def bind_tools(self, tools):
+        return self
+
+    def _reply(self, messages):
+        system = messages[0].content
+        if system == summarizer_instructions:
+            self.calls.append("summary")
+            sources = sorted(line for line in messages[1].content.splitlines() if line.startswith("Source: "))
+            self.summarized_sources.append(sources)
+            return "<think>notes</think>Summary covering " + ", ".join(sources)
+        if "follow_up_query" in system:
+            self.calls.append("reflection")
+            return json.dumps(self.follow_ups)
+        self.calls.append("query")
+        return json.dumps(self.queries)
+
+    def invoke(self, messages):
+        return AIMessage(content=self._reply(messages))
+
+    async def ainvoke(self, messages):
+        return AIMessage(content=self._reply(messages))
+
+    def stream(self, messages):
+        yield AIMessageChunk(content=self._reply(messages))
+
+    async def astream(self, messages):
+        yield AIMessageChunk(content=self._reply(messages))
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = FakeBackend()
+    monkeypatch.setitem(search_backends._BACKENDS, backend.name, backend)
+    return backend
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    def install(queries, follow_ups):
+        model = FakeChatModel(queries, follow_ups)
+        monkeypatch.setattr(graph, "get_chat_model", lambda *args, **kwargs: model)
+        return model
+
+    return install
+
+
+@pytest.fixture
+def run_config(tmp_path, monkeypatch):
+    # Environment variables take precedence over the configurable
+    for name in Configuration.model_fields:
+        monkeypatch.delenv(name.upper(), raising=False)
+
+    def build(**overrides):
+        return {"configurable": {
+            "llm_provider": "ollama",
+            "search_api": "fake",
+            "fetch_full_page": False,
+            "max_web_research_loops": 1,
+            "queries_per_loop": 1,
+            "cache_dir": str(tmp_path),
+            **overrides,
+        }}
+
+    return build
+
+
+def test_graph_runs_under_ainvoke(backend, fake_model, run_config):
+    model = fake_model({"query": "solar power"}, {"follow_up_query": "solar storage"})
+
+    result = asyncio.run(graph.build_graph().ainvoke({"research_topic": "solar"}, config=run_config()))
+    assert backend.queries == [(0, "solar power"), (1, "solar storage")]
+    assert model.calls == ["query", "summary", "reflection", "summary", "reflection"]
+    summary = result["running_summary"]
+    assert summary.startswith("## Summary\nSummary covering Source: About solar storage")
+    assert "<think>" not in summary
+    assert "* About solar power : https://example.com/solar-power" in summary
+
+
+def test_async_llm_cache_runs_off_the_event_loop(backend, fake_model, run_config, monkeypatch):
+    model = fake_model({"query": "solar power"}, {"follow_up_query": "solar storage"})
+    cache_threads = set()
+    for method in ("get", "set"):
+        original = getattr(cache.LLMCache, method)
+
+        def record(self, *args, _original=original):
+            cache_threads.add(threading.get_ident())
+            return _original(self, *args)
+
+        monkeypatch.setattr(cache.LLMCache, method, record)
+
+    async def run():
+        config = run_config(llm_cache=True)
+        first = await graph.build_graph().ainvoke({"research_topic": "solar"}, config=config)
+        second = await graph.build_graph().ainvoke({"research_topic": "solar"}, config=config)
+        return first, second, threading.get_ident()
+
+    first, second, loop_thread = asyncio.run(run())
+    assert first == second
+    # The second run is answered from the LLM cache
+    assert len(model.calls) == 5
+    assert cache_threads and loop_thread not in cache_threads
+
+
+def test_queries_fan_out_to_parallel_workers_merged_into_one_summary(backend, fake_model, run_config):
+    model = fake_model(
+        {"query": "solar power", "additional_queries": ["solar cost", "solar storage"]},
+        {"follow_up_query": "grid", "additional_queries": ["batteries"]},
+    )
+
+    async def run():
+        updates = []
+        async for update in graph.build_graph().astream(
+            {"research_topic": "solar"}, config=run_config(queries_per_loop=3), stream_mode="updates"
+        ):
+            updates.extend(update)
+        return updates
+
+    updates = asyncio.run(run())
+    assert updates == [
+        "generate_query", *["web_research"] * 3, "summarize_sources", "reflect_on_summary",
+        *["web_research"] * 2, "summarize_sources", "reflect_on_summary", "finalize_summary",
+    ]
+    assert sorted(backend.queries) == [
+        (0, "solar cost"), (0, "solar power"), (0, "solar storage"), (1, "batteries"), (1, "grid"),
+    ]
+    assert model.summarized_sources == [
+        ["Source: About solar cost", "Source: About solar power", "Source: About solar storage"],
+        ["Source: About batteries", "Source: About grid"],
+    ]
+
+
+def test_malformed_and_duplicate_additional_queries_are_dropped(backend, fake_model, run_config):
+    fake_model(
+        {"query": "solar power", "additional_queries": ["solar power", 7, "", "  ", None, "solar cost", "solar cost", "wind"]},
+        {"follow_up_query": "grid", "additional_queries": "not a list"},
+    )
+
+    graph.build_graph().invoke({"research_topic": "solar"}, config=run_config(queries_per_loop=3))
+    assert sorted(backend.queries) == [(0, "solar cost"), (0, "solar power"), (0, "wind"), (1, "grid")]
+
+
+@pytest.mark.parametrize(
+    "additional_queries, number_of_queries, expected",
+    [
+        (["b", "c", "d"], 3, ["a", "b", "c"]),
+        (["b", "c"], 1, ["a"]),
+        (None, 3, ["a"]),
+        ({"b": 1}, 3, ["a"]),
+        (["a", "", 1, ["b"], "b"], 3, ["a", "b"]),
+    ],
+)
+def test_search_query_update(additional_queries, number_of_queries, expected):
+    assert graph.search_query_update("a", additional_queries, number_of_queries) == {
+        "search_query": "a",
+        "search_queries": expected,
+    }
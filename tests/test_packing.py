@@ -0,0 +1,101 @@
+import pytest
+
+from Langgraph_deep_researcher import metrics
+from Langgraph_deep_researcher.packing import (
+    MIN_PARTIAL_SOURCE_TOKENS,
+    context_window_for,
+    pack_sources,
+    relevance_scores,
+)
+from Langgraph_deep_researcher.tokens import TokenCounter
+
+
+class WordCounter(TokenCounter):
+    """One token per whitespace-separated word."""
+
+    name = "words"
+
+    def count(self, text):
+        return len(text.split())
+
+    def truncate(self, text, max_tokens):
+        return " ".join(text.split()[:max_tokens])
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset_metrics()
+    yield
+    metrics.reset_metrics()
+
+
+def test_relevance_scores_rank_matching_documents_first():
+    documents = [
+        "Recipes for sourdough bread and pastry",
+        "Solar panels convert sunlight into electricity; solar power is growing",
+        "A short note on solar eclipses",
+    ]
+    scores = relevance_scores("solar power", documents)
+    assert scores[1] > scores[2] > scores[0] == 0.0
+
+
+def test_relevance_scores_prefer_rare_terms():
+    documents = ["battery battery storage", "battery grid", "battery cost"]
+    scores = relevance_scores("battery storage", documents)
+    assert scores.index(max(scores)) == 0
+
+
+def test_relevance_scores_handle_cjk_and_empty_queries():
+    scores = relevance_scores("人工智能", ["人工智能的发展趋势", "天气预报"])
+    assert scores[0] > scores[1] == 0.0
+    assert relevance_scores("", ["a", "b"]) == [0.0, 0.0]
+    assert relevance_scores("query", []) == []
+
+
+def test_pack_sources_keeps_everything_within_budget():
+    sources = ["apple pie", "banana bread recipe", "cherry"]
+    packed = pack_sources(sources, "banana", 100, WordCounter())
+    assert packed.sources[0] == "banana bread recipe"
+    assert sorted(packed.sources) == sorted(sources)
+    assert (packed.used_tokens, packed.dropped_tokens, packed.dropped_sources, packed.truncated_sources) == (6, 0, 0, 0)
+
+
+def test_pack_sources_truncates_then_drops_least_relevant():
+    relevant = "solar energy " * 75
+    partial = "solar " + "filler " * 300
+    unrelated = "gardening " * 50
+    budget = 150 + MIN_PARTIAL_SOURCE_TOKENS + 20
+    packed = pack_sources([unrelated, partial, relevant], "solar energy", budget, WordCounter())
+
+    assert packed.sources[0] == relevant
+    assert packed.sources[1].endswith("... [truncated]")
+    assert len(packed.sources) == 2
+    assert packed.used_tokens == budget
+    assert packed.truncated_sources == 1 and packed.dropped_sources == 1
+    assert packed.dropped_tokens == (301 - (budget - 150)) + 50
+    assert metrics.get_metrics("context.") == {
+        "context.packed_tokens": budget,
+        "context.dropped_tokens": packed.dropped_tokens,
+        "context.dropped_sources": 1,
+        "context.truncated_sources": 1,
+    }
+
+
+def test_pack_sources_negative_budget_drops_all():
+    packed = pack_sources(["a b", "c"], "a", -10, WordCounter())
+    assert packed.sources == []
+    assert (packed.dropped_sources, packed.dropped_tokens) == (2, 3)
+
+
+@pytest.mark.parametrize(
+    "provider, model, configured, expected",
+    [
+        ("openai", "gpt-4o-mini", 0, 128000),
+        ("openai", "gpt-4", 0, 8192),
+        ("ollama", "library/llama3.2:3b", 0, 32768),
+        ("ollama", "unknown-model", 0, 8192),
+        ("ollama", "llama3.2", 4096, 4096),
+    ],
+)
+def test_context_window_for(provider, model, configured, expected):
+    assert context_window_for(provider, model, configured) == expected
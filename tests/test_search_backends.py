@@ -0,0 +1,149 @@
+import asyncio
+import sys
+import time
+import types
+
+import pytest
+
+from Langgraph_deep_researcher import metrics, search_backends
+from Langgraph_deep_researcher.search_backends import (
+    FunctionSearchBackend,
+    RateLimiter,
+    SearchBackend,
+    SearchCapabilities,
+    SearchOptions,
+    get_search_backend,
+    register_search_backend,
+    requests_per_second,
+    search_backend_names,
+)
+
+RESULTS = {"results": [{"title": "t", "url": "https://example.com", "content": "c", "raw_content": None}]}
+
+
+class MockBackend:
+    """Offline backend, as used for load tests."""
+
+    capabilities = SearchCapabilities(raw_content=False, max_results=1)
+
+    def __init__(self, name="mock"):
+        self.name = name
+
+    def search(self, query, options):
+        return RESULTS
+
+    async def asearch(self, query, options):
+        return RESULTS
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    """Isolate the backend registry and the metrics of each test."""
+    monkeypatch.setattr(search_backends, "_BACKENDS", dict(search_backends._BACKENDS))
+    metrics.reset_metrics()
+    yield
+    metrics.reset_metrics()
+
+
+def test_builtin_backends_are_registered():
+    assert {"duckduckgo", "perplexity", "searxng", "tavily"} <= set(search_backend_names())
+    assert all(isinstance(get_search_backend(name), SearchBackend) for name in search_backend_names())
+
+
+def test_register_a_mock_backend():
+    backend = MockBackend()
+    register_search_backend(backend)
+    assert get_search_backend("mock") is backend
+    assert "mock" in search_backend_names()
+    assert get_search_backend("mock").search("q", SearchOptions()) == RESULTS
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match="Unsupported search API: nope"):
+        get_search_backend("nope")
+
+
+def test_backend_loaded_from_a_factory_reference(monkeypatch):
+    calls = []
+    module = types.ModuleType("offline_index")
+    module.make_backend = lambda: calls.append(1) or MockBackend("offline")
+    module.not_a_backend = lambda: object()
+    monkeypatch.setitem(sys.modules, "offline_index", module)
+
+    backend = get_search_backend("offline_index:make_backend")
+    assert backend.name == "offline"
+    assert get_search_backend("offline_index:make_backend") is backend
+    assert calls == [1]
+    assert "offline_index:make_backend" in search_backend_names()
+
+    with pytest.raises(TypeError, match="did not return a SearchBackend"):
+        get_search_backend("offline_index:not_a_backend")
+    assert "offline_index:not_a_backend" not in search_backend_names()
+
+
+def test_function_backend_passes_options_and_rate_limiter():
+    calls = []
+
+    def search(query, **kwargs):
+        calls.append(("sync", query, kwargs))
+        return RESULTS
+
+    async def asearch(query, **kwargs):
+        calls.append(("async", query, kwargs))
+        return RESULTS
+
+    backend = FunctionSearchBackend(
+        "mock",
+        SearchCapabilities(raw_content=True, max_results=2),
+        search,
+        asearch,
+        lambda capabilities, options: {"max_results": capabilities.max_results, "loop": options.research_loop_count},
+    )
+    options = SearchOptions(research_loop_count=3, use_cache=True, cache_dir="/tmp/cache")
+    assert backend.search("q", options) == RESULTS
+    assert asyncio.run(backend.asearch("q", options)) == RESULTS
+    expected = {"max_results": 2, "loop": 3, "use_cache": True, "cache_dir": "/tmp/cache", "rate_limiter": backend.rate_limiter}
+    assert calls == [("sync", "q", expected), ("async", "q", expected)]
+
+
+def test_rate_limit_override(monkeypatch):
+    assert requests_per_second("mock", 2.0) == 2.0
+    monkeypatch.setenv("SEARCH_RATE_LIMIT_MOCK", "0.5")
+    assert requests_per_second("mock", 2.0) == 0.5
+
+    backend = FunctionSearchBackend(
+        "mock", SearchCapabilities(raw_content=False, max_results=1, requests_per_second=10.0), None, None, None
+    )
+    assert backend.rate_limiter.interval == 2.0
+
+
+def test_rate_limiter_spaces_requests(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(search_backends.time, "monotonic", lambda: 100.0)
+    monkeypatch.setattr(search_backends.time, "sleep", sleeps.append)
+
+    limiter = RateLimiter(10.0)
+    for _ in range(3):
+        limiter.acquire()
+    assert sleeps == [pytest.approx(0.1), pytest.approx(0.2)]
+    assert metrics.get_metrics("search.") == {"search.rate_limited": 2}
+
+
+def test_rate_limiter_without_a_limit_never_waits(monkeypatch):
+    monkeypatch.setattr(search_backends.time, "sleep", lambda delay: pytest.fail("must not sleep"))
+    limiter = RateLimiter(0)
+    for _ in range(3):
+        limiter.acquire()
+    assert metrics.get_metrics("search.") == {}
+
+
+def test_async_rate_limiter_is_shared_across_tasks():
+    limiter = RateLimiter(50.0)
+
+    async def run():
+        started = time.monotonic()
+        await asyncio.gather(*(limiter.aacquire() for _ in range(4)))
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) >= 0.06 - 1e-3
+    assert metrics.get_metrics("search.") == {"search.rate_limited": 3}
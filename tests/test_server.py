@@ -0,0 +1,156 @@
+import asyncio
+import json
+
+import pytest
+
+from Langgraph_deep_researcher.configuration import Configuration
+from Langgraph_deep_researcher.server import ResearchServer
+
+
+class FakeGraph:
+    """Research graph whose runs wait for ``release`` before producing a summary."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.configs = []
+
+    async def astream(self, graph_input, config, stream_mode):
+        self.configs.append(config["configurable"])
+        yield "updates", {"generate_query": {}}
+        yield "values", {"research_loop_count": 0, "sources_gathered": []}
+        await self.release.wait()
+        yield "updates", {"finalize_summary": {}}
+        yield "values", {
+            "research_loop_count": 1,
+            "sources_gathered": ["* a : https://a"],
+            "running_summary": f"summary of {graph_input.research_topic}",
+        }
+
+
+async def call(app, method, path, body=None, headers=()):
+    """Send one HTTP request to the ASGI app; returns (status, response headers, body)."""
+    scope = {"type": "http", "method": method, "path": path, "headers": list(headers)}
+    request = [{"type": "http.request", "body": json.dumps(body).encode() if body is not None else b""}]
+    response = {"body": b""}
+
+    async def receive():
+        if request:
+            return request.pop()
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = dict(message["headers"])
+        else:
+            response["body"] += message.get("body", b"")
+
+    await app(scope, receive, send)
+    return response["status"], response["headers"], response["body"]
+
+
+async def call_json(app, method, path, body=None):
+    status, _, payload = await call(app, method, path, body)
+    return status, json.loads(payload)
+
+
+def _sse_ids(payload):
+    return [int(line[4:]) for line in payload.decode().splitlines() if line.startswith("id: ")]
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    for name in ("MAX_WEB_RESEARCH_LOOPS", "LOCAL_LLM", "SEARCH_API"):
+        monkeypatch.delenv(name, raising=False)
+    configuration = Configuration(cache_dir=str(tmp_path), max_concurrent_jobs=1, max_queued_jobs=1)
+    return ResearchServer(configuration, research_graph=FakeGraph())
+
+
+def test_routing(server):
+    async def run():
+        try:
+            status, health = await call_json(server, "GET", "/health")
+            assert status == 200 and health["queued"] == 0
+            assert await call_json(server, "GET", "/jobs") == (200, {"jobs": []})
+            assert (await call_json(server, "GET", "/nope"))[0] == 404
+            assert (await call_json(server, "GET", "/jobs/" + "0" * 32))[0] == 404
+            assert (await call_json(server, "PUT", "/jobs"))[0] == 405
+            assert (await call_json(server, "POST", "/jobs", {"topic": " "}))[0] == 400
+            status, error = await call_json(server, "POST", "/jobs", {"topic": "t", "config": {"openai_api_key": "k"}})
+            assert status == 400 and "openai_api_key" in error["error"]
+        finally:
+            await server.stop()
+
+    asyncio.run(run())
+
+
+def test_job_lifecycle_and_sse_resume(server):
+    async def run():
+        try:
+            status, headers, body = await call(server, "POST", "/jobs", {"topic": "t", "config": {"max_web_research_loops": 1}})
+            job = json.loads(body)
+            assert status == 202 and headers[b"location"] == f"/jobs/{job['id']}".encode()
+
+            server.research_graph.release.set()
+            _, _, events = await call(server, "GET", f"/jobs/{job['id']}/events")
+            ids = _sse_ids(events)
+            assert ids == list(range(len(ids)))
+            assert b"event: completed" in events
+
+            _, _, resumed = await call(server, "GET", f"/jobs/{job['id']}/events", headers=[(b"last-event-id", b"1")])
+            assert _sse_ids(resumed) == ids[2:]
+
+            status, stored = await call_json(server, "GET", f"/jobs/{job['id']}")
+            assert stored["status"] == "completed"
+            assert stored["result"]["running_summary"] == "summary of t"
+            assert server.research_graph.configs == [{"max_web_research_loops": 1}]
+        finally:
+            await server.stop()
+
+    asyncio.run(run())
+
+
+def test_queue_limit_and_cancelled_jobs_free_their_slot(server):
+    async def run():
+        try:
+            _, running = await call_json(server, "POST", "/jobs", {"topic": "running"})
+            await asyncio.sleep(0.01)
+            assert server.get_job(running["id"]).status == "running"
+
+            _, queued = await call_json(server, "POST", "/jobs", {"topic": "queued"})
+            status, error = await call_json(server, "POST", "/jobs", {"topic": "rejected"})
+            assert status == 503, error
+
+            status, cancelled = await call_json(server, "DELETE", f"/jobs/{queued['id']}")
+            assert status == 200 and cancelled["status"] == "cancelled"
+            status, accepted = await call_json(server, "POST", "/jobs", {"topic": "accepted"})
+            assert status == 202
+            assert (await call_json(server, "GET", "/health"))[1]["queued"] == 1
+
+            server.research_graph.release.set()
+            for _ in range(100):
+                if server.get_job(accepted["id"]).status == "completed":
+                    break
+                await asyncio.sleep(0.01)
+            assert server.get_job(accepted["id"]).status == "completed"
+            assert server.get_job(queued["id"]).status == "cancelled"
+            assert server.research_graph.configs == [{}, {}]
+        finally:
+            await server.stop()
+
+    asyncio.run(run())
+
+
+def test_overrides_of_settings_fixed_by_the_environment_are_rejected(server, monkeypatch):
+    monkeypatch.setenv("MAX_WEB_RESEARCH_LOOPS", "3")
+
+    async def run():
+        try:
+            status, error = await call_json(server, "POST", "/jobs", {"topic": "t", "config": {"max_web_research_loops": 1}})
+            assert status == 400 and "max_web_research_loops" in error["error"]
+            status, _ = await call_json(server, "POST", "/jobs", {"topic": "t", "config": {"queries_per_loop": 2}})
+            assert status == 202
+        finally:
+            await server.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,53 @@
+import pytest
+
+from Langgraph_deep_researcher import metrics
+from Langgraph_deep_researcher.extraction import SPA_SCAN_CHARS, detect_javascript_page
+
+SCRIPT = '<script src="/static/app.js"></script>'
+BUNDLE = "<script>" + "window.__DATA__ = {};" * 2000 + "</script>"
+SENTENCE = "Server rendered paragraph text that a reader would actually want to read. "
+
+
+def _page(body, head=SCRIPT):
+    return f"<html><head><title>t</title>{head}</head><body>{body}</body></html>"
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset_metrics()
+    yield
+    metrics.reset_metrics()
+
+
+@pytest.mark.parametrize(
+    "html, reason, is_spa",
+    [
+        (_page('<div id="root"></div>', head=""), "no_scripts", False),
+        ("<html><head>" + BUNDLE * 2 + "</head><body><p>text</p></body></html>", "inconclusive", False),
+        (_page('<div id="root"></div>' + BUNDLE), "empty_mount_point", True),
+        (_page("<app-root></app-root><p>Loading…</p>" + BUNDLE), "empty_mount_point", True),
+        (_page("<p>Loading, please wait…</p>"), "low_visible_text", True),
+        (_page("<p>" + SENTENCE * 6 + "</p>" + BUNDLE), "low_visible_text", True),
+        (_page("<article><p>" + SENTENCE * 20 + "</p></article>"), "static", False),
+        # Real server-rendered text next to an empty widget mount point
+        (_page("<p>" + SENTENCE * 10 + '</p><div id="app"></div>'), "static", False),
+        (_page("<p>" + SENTENCE * 20 + '</p><div id="__next"></div>' + BUNDLE), "static", False),
+    ],
+)
+def test_detect_javascript_page_reasons(html, reason, is_spa):
+    result = detect_javascript_page(html)
+    assert result == (reason if is_spa else None)
+    assert metrics.get_metrics("spa_check.") == {f"spa_check.{reason}": 1}
+
+
+def test_only_the_scanned_prefix_is_inspected():
+    # Text beyond the scanned prefix cannot rescue a shell
+    html = _page('<div id="root"></div>' + BUNDLE * 3 + "<p>" + SENTENCE * 50 + "</p>")
+    assert html.index("<p>") > SPA_SCAN_CHARS
+    assert detect_javascript_page(html) == "empty_mount_point"
+
+
+def test_spa_check_metrics_accumulate():
+    for html in (_page("<p>Loading</p>"), _page("<p>Loading</p>"), _page("x", head="")):
+        detect_javascript_page(html)
+    assert metrics.get_metrics("spa_check.") == {"spa_check.low_visible_text": 2, "spa_check.no_scripts": 1}
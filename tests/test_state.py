@@ -0,0 +1,50 @@
+from langgraph.graph import END, START, StateGraph
+from langgraph.types import Send
+
+from Langgraph_deep_researcher.state import SummaryState, latest_loop_results
+
+
+def _entry(loop, content):
+    return {"loop": loop, "content": content}
+
+
+def test_latest_loop_results_merges_one_loop():
+    assert latest_loop_results([_entry(1, "a")], [_entry(1, "b")]) == [_entry(1, "a"), _entry(1, "b")]
+
+
+def test_latest_loop_results_drops_earlier_loops():
+    current = [_entry(0, "a"), _entry(0, "b")]
+    assert latest_loop_results(current, [_entry(1, "c")]) == [_entry(1, "c")]
+    # A late result of an older loop does not displace the newer one
+    assert latest_loop_results([_entry(2, "d")], [_entry(1, "e")]) == [_entry(2, "d")]
+
+
+def test_latest_loop_results_empty():
+    assert latest_loop_results(None, None) == []
+    assert latest_loop_results([], []) == []
+    assert latest_loop_results(None, [_entry(0, "a")]) == [_entry(0, "a")]
+
+
+def test_state_keeps_only_the_latest_loop():
+    def fan_out(state):
+        return [Send("search", {"loop": state.research_loop_count, "query": query}) for query in ("q1", "q2")]
+
+    def search(payload):
+        return {"web_research_results": [_entry(payload["loop"], payload["query"])]}
+
+    def next_loop(state):
+        return {"research_loop_count": state.research_loop_count + 1}
+
+    builder = StateGraph(SummaryState)
+    builder.add_node("search", search)
+    builder.add_node("next_loop", next_loop)
+    builder.add_conditional_edges(START, fan_out, ["search"])
+    builder.add_edge("search", "next_loop")
+    builder.add_conditional_edges(
+        "next_loop", lambda state: fan_out(state) if state.research_loop_count < 3 else END, ["search", END]
+    )
+
+    final = builder.compile().invoke({"research_topic": "t"})
+    assert final["research_loop_count"] == 3
+    assert sorted(entry["content"] for entry in final["web_research_results"]) == ["q1", "q2"]
+    assert {entry["loop"] for entry in final["web_research_results"]} == {2}
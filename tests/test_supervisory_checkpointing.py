@@ -0,0 +1,64 @@
+import asyncio
+import json
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from Langgraph_deep_researcher import supervisory_architecture
+from Langgraph_deep_researcher.configuration import Configuration
+
+pytest.importorskip("langgraph.checkpoint.sqlite")
+pytest.importorskip("aiosqlite")
+
+DECOMPOSITION = json.dumps({
+    "tasks": [
+        {"id": "a1", "type": "analysis", "description": "compare options", "priority": 4},
+        {"id": "s1", "type": "synthesis", "description": "write the report", "priority": 1, "depends_on": ["a1"]},
+    ]
+})
+
+
+class Crash(BaseException):
+    """Stands in for the process dying mid-run; not caught by the task scheduler."""
+
+
+class FakeModel:
+    def __init__(self, name, calls, crash):
+        self.name = name
+        self.calls = calls
+        self.crash = crash
+
+    async def ainvoke(self, messages):
+        return AIMessage(content=DECOMPOSITION)
+
+    async def astream(self, messages):
+        self.calls.append(self.name)
+        if self.name in self.crash:
+            raise Crash()
+        yield AIMessageChunk(content=f"{self.name} output")
+
+
+def _patch_models(monkeypatch, calls, crash):
+    names = {0.1: "supervisor", 0.2: "analysis", 0.3: "synthesis"}
+    monkeypatch.setattr(
+        supervisory_architecture,
+        "get_chat_model",
+        lambda *args, temperature, **kwargs: FakeModel(names[temperature], calls, crash),
+    )
+
+
+def test_resume_reuses_tasks_finished_before_a_crash(monkeypatch, tmp_path):
+    config = Configuration(checkpointer="sqlite", checkpoint_path=str(tmp_path / "checkpoints.sqlite"))
+    calls = []
+    crash = {"synthesis"}
+    _patch_models(monkeypatch, calls, crash)
+
+    with pytest.raises(Crash):
+        asyncio.run(supervisory_architecture.run_supervisory_research("topic", config, thread_id="run"))
+    assert calls == ["analysis", "synthesis"]
+
+    crash.clear()
+    result = asyncio.run(supervisory_architecture.run_supervisory_research("topic", config, thread_id="run", resume=True))
+    assert calls == ["analysis", "synthesis", "synthesis"]
+    assert result.analysis_results == ["analysis output"]
+    assert result.final_synthesis == "synthesis output"
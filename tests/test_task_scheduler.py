@@ -0,0 +1,130 @@
+import asyncio
+import json
+
+from Langgraph_deep_researcher.supervisory_architecture import (
+    Task,
+    TaskType,
+    parse_task_decomposition,
+    run_task_scheduler,
+)
+
+
+def _decomposition(*tasks):
+    return json.dumps({"tasks": list(tasks)})
+
+
+def _run(tasks, execute, max_concurrency=3):
+    events = []
+    asyncio.run(run_task_scheduler(tasks, execute, max_concurrency, on_event=lambda event, task: events.append((event, task.id))))
+    return events
+
+
+def test_parse_task_decomposition_defaults():
+    tasks = parse_task_decomposition(
+        "<think>planning</think>Here you go: "
+        + _decomposition(
+            {"id": "r1", "type": "research", "description": "topic one", "priority": 9},
+            {"id": "r2", "type": "unknown", "description": "topic two"},
+            {"id": "a", "type": "analysis", "description": "compare"},
+        ),
+        "request",
+    )
+    by_id = {task.id: task for task in tasks}
+    assert by_id["r1"].priority == 5
+    assert by_id["r2"].type == TaskType.RESEARCH
+    assert by_id["a"].depends_on == ["r1", "r2"]
+    synthesis = [task for task in tasks if task.type == TaskType.SYNTHESIS]
+    assert len(synthesis) == 1
+    assert set(synthesis[0].depends_on) == {"r1", "r2", "a"}
+
+
+def test_parse_task_decomposition_drops_dangling_and_cyclic_dependencies():
+    tasks = parse_task_decomposition(
+        _decomposition(
+            {"id": "a", "type": "research", "description": "a", "depends_on": ["b", "missing", "a"]},
+            {"id": "b", "type": "research", "description": "b", "depends_on": ["a"]},
+            {"id": "s", "type": "synthesis", "description": "s", "depends_on": ["a", "b"]},
+        ),
+        "request",
+    )
+    by_id = {task.id: task for task in tasks}
+    assert by_id["a"].depends_on == ["b"]
+    assert by_id["b"].depends_on == []
+    assert by_id["s"].depends_on == ["a", "b"]
+
+
+def test_parse_task_decomposition_invalid():
+    assert parse_task_decomposition("no json here", "request") == []
+    assert parse_task_decomposition("{not json}", "request") == []
+    assert parse_task_decomposition('{"tasks": "nope"}', "request") == []
+
+
+def test_scheduler_respects_dependencies_and_priority():
+    tasks = [
+        Task(id="low", type=TaskType.RESEARCH, description="low", priority=1),
+        Task(id="high", type=TaskType.RESEARCH, description="high", priority=5),
+        Task(id="final", type=TaskType.SYNTHESIS, description="final", depends_on=["low", "high"]),
+    ]
+    order = []
+
+    async def execute(task):
+        order.append(task.id)
+        return f"result {task.id}"
+
+    _run(tasks, execute, max_concurrency=1)
+    assert order == ["high", "low", "final"]
+    assert all(task.status == "completed" for task in tasks)
+    assert tasks[2].result == "result final"
+
+
+def test_scheduler_limits_concurrency():
+    tasks = [Task(id=f"t{i}", type=TaskType.RESEARCH, description="t") for i in range(5)]
+    running = 0
+    peak = 0
+
+    async def execute(task):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return "ok"
+
+    _run(tasks, execute, max_concurrency=2)
+    assert peak == 2
+
+
+def test_scheduler_skips_dependents_of_failed_tasks():
+    tasks = [
+        Task(id="ok", type=TaskType.RESEARCH, description="ok"),
+        Task(id="bad", type=TaskType.RESEARCH, description="bad"),
+        Task(id="analysis", type=TaskType.ANALYSIS, description="a", depends_on=["bad"]),
+        Task(id="final", type=TaskType.SYNTHESIS, description="s", depends_on=["ok", "analysis"]),
+    ]
+    executed = []
+
+    async def execute(task):
+        executed.append(task.id)
+        if task.id == "bad":
+            raise RuntimeError("search failed")
+        return "fine"
+
+    events = _run(tasks, execute)
+    by_id = {task.id: task for task in tasks}
+    assert set(executed) == {"ok", "bad"}
+    assert by_id["bad"].status == "error"
+    assert by_id["bad"].result is None
+    assert by_id["bad"].error == "RuntimeError: search failed"
+    assert by_id["analysis"].status == "skipped"
+    assert by_id["final"].status == "skipped"
+    assert ("skipped", "final") in events
+
+
+def test_scheduler_skips_unsatisfiable_dependencies():
+    tasks = [Task(id="orphan", type=TaskType.ANALYSIS, description="a", depends_on=["missing"])]
+
+    async def execute(task):
+        raise AssertionError("must not run")
+
+    _run(tasks, execute)
+    assert tasks[0].status == "skipped"
@@ -0,0 +1,85 @@
+import asyncio
+import random
+
+import pytest
+from langchain_core.messages import AIMessageChunk
+
+from Langgraph_deep_researcher import supervisory_architecture
+from Langgraph_deep_researcher.configuration import Configuration
+from Langgraph_deep_researcher.utils import (
+    ThinkingTokenStripper,
+    TokenStream,
+    strip_thinking_tokens,
+)
+
+
+def _stream(chunks):
+    stripper = ThinkingTokenStripper()
+    return "".join(stripper.feed(chunk) for chunk in chunks) + stripper.flush()
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("no tags", "no tags"),
+        ("<think>hidden</think>visible", "visible"),
+        ("a<think>x</think>b<think>y</think>c", "abc"),
+        ("before<think>never closed", "before"),
+        ("a < b and <thin", "a < b and <thin"),
+        ("</think>stray close", "</think>stray close"),
+    ],
+)
+def test_strip_thinking_tokens(text, expected):
+    assert strip_thinking_tokens(text) == expected
+
+
+def test_stripper_handles_tags_split_across_chunks():
+    assert _stream(["Hi <thi", "nk>hmm</th", "ink> there"]) == "Hi  there"
+    assert _stream(["<", "t", "h", "i", "n", "k", ">", "x", "<", "/think>", "done"]) == "done"
+    assert _stream(["value <", "b>bold"]) == "value <b>bold"
+
+
+def test_stripper_matches_whole_text_for_any_chunking():
+    text = "intro <think>plan a, plan b</think> answer <think>more</think> end <thi"
+    expected = strip_thinking_tokens(text)
+    rng = random.Random(0)
+    for _ in range(200):
+        cuts = sorted(rng.sample(range(1, len(text)), rng.randint(1, 10)))
+        chunks = [text[start:end] for start, end in zip([0, *cuts], [*cuts, len(text)])]
+        assert _stream(chunks) == expected
+
+
+def test_token_stream_returns_full_text_outside_a_graph():
+    tokens = TokenStream("test", strip_thinking=True)
+    for chunk in ["a<think>", "b</think>", "c"]:
+        tokens.send(chunk)
+    assert tokens.close() == "a<think>b</think>c"
+
+
+class FakeStreamingModel:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def astream(self, messages):
+        for chunk in self.chunks:
+            yield AIMessageChunk(content=chunk)
+
+
+def test_agents_return_stripped_text(monkeypatch):
+    chunks = ["<thi", "nk>internal notes</think>", "Final ", "answer"]
+    monkeypatch.setattr(supervisory_architecture, "get_chat_model", lambda *args, **kwargs: FakeStreamingModel(chunks))
+    config = Configuration(strip_thinking_tokens=True)
+
+    analysis = asyncio.run(supervisory_architecture.AnalysisAgent(config).analyze_results(["r"], "request"))
+    report = asyncio.run(supervisory_architecture.SynthesisAgent(config).synthesize_final_report(["r"], ["a"], "request"))
+    assert analysis == "Final answer"
+    assert report == "Final answer"
+
+
+def test_agents_keep_thinking_when_not_stripping(monkeypatch):
+    chunks = ["<think>notes</think>", "answer"]
+    monkeypatch.setattr(supervisory_architecture, "get_chat_model", lambda *args, **kwargs: FakeStreamingModel(chunks))
+    config = Configuration(strip_thinking_tokens=False)
+
+    analysis = asyncio.run(supervisory_architecture.AnalysisAgent(config).analyze_results(["r"], "request"))
+    assert analysis == "<think>notes</think>answer"
@@ -0,0 +1,93 @@
+import pytest
+
+from Langgraph_deep_researcher import tokens
+from Langgraph_deep_researcher.configuration import Configuration
+from Langgraph_deep_researcher.graph import MIN_TOKENS_PER_SOURCE, source_token_budget
+
+
+class FakeEncoding:
+    """One token per character, like a tiktoken encoding on ASCII text."""
+
+    def encode(self, text, disallowed_special=()):
+        return list(text)
+
+    def decode(self, tokens):
+        return "".join(tokens)
+
+
+def test_approximate_count_latin_and_cjk():
+    counter = tokens.ApproximateTokenCounter()
+    assert counter.count("") == 0
+    assert counter.count("abcd") == 1
+    assert counter.count("abcde") == 2
+    assert counter.count("人工智能") == 4
+    assert counter.count("人工ab") == 3
+
+
+@pytest.mark.parametrize("text", ["word " * 200, "人工智能" * 100, "mixed 中文 text " * 50])
+@pytest.mark.parametrize("max_tokens", [0, 1, 7, 50])
+def test_approximate_truncate_fits_budget(text, max_tokens):
+    counter = tokens.ApproximateTokenCounter()
+    truncated = counter.truncate(text, max_tokens)
+    assert text.startswith(truncated)
+    assert counter.count(truncated) <= max_tokens
+
+
+def test_approximate_truncate_keeps_short_text():
+    counter = tokens.ApproximateTokenCounter()
+    assert counter.truncate("short", 10) == "short"
+
+
+def test_tiktoken_truncate():
+    counter = tokens.TiktokenCounter(FakeEncoding())
+    assert counter.count("hello") == 5
+    assert counter.truncate("hello world", 5) == "hello"
+    assert counter.truncate("hello", 5) == "hello"
+    assert counter.truncate("hello", 0) == ""
+
+
+def test_auto_counter_follows_provider():
+    assert isinstance(tokens.get_token_counter("ollama", "llama3"), tokens.ApproximateTokenCounter)
+    assert tokens.get_token_counter("ollama", "llama3") is tokens.get_token_counter("ollama", "llama3")
+
+
+def test_register_and_unknown_counter():
+    class Fixed(tokens.TokenCounter):
+        def count(self, text):
+            return 1
+
+        def truncate(self, text, max_tokens):
+            return text
+
+    tokens.register_token_counter("fixed-test", lambda model: Fixed())
+    assert tokens.get_token_counter("openai", "any", "fixed-test").count("long text") == 1
+    with pytest.raises(ValueError):
+        tokens.get_token_counter("openai", "any", "missing-test")
+
+
+def test_token_counters_must_implement_count_and_truncate():
+    class CountOnly(tokens.TokenCounter):
+        def count(self, text):
+            return 1
+
+    with pytest.raises(TypeError):
+        CountOnly()
+
+
+def _results(count):
+    return {"results": [{"url": f"https://example.com/{i}"} for i in range(count)]}
+
+
+def test_source_budget_is_capped_by_default():
+    configurable = Configuration(llm_provider="openai", local_llm="gpt-4o", context_window=128000)
+    assert source_token_budget(configurable, _results(3)) == 1000
+
+
+def test_source_budget_shrinks_to_fit_small_windows():
+    configurable = Configuration(llm_provider="ollama", context_window=4096, queries_per_loop=2)
+    assert source_token_budget(configurable, _results(3)) == max(MIN_TOKENS_PER_SOURCE, (4096 - 2048) // 6)
+
+
+def test_source_budget_uses_window_when_uncapped():
+    configurable = Configuration(llm_provider="openai", context_window=128000, max_tokens_per_source=0)
+    assert source_token_budget(configurable, _results(3)) == (128000 - 2048) // 3